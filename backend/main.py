@@ -2,14 +2,20 @@ import asyncio
 import sys
 from contextlib import asynccontextmanager
 
-import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
 from src.api.endpoints import router
-from src.api.middleware import CacheControlMiddleware, LoggingMiddleware, SecurityMiddleware
+from src.api.health import health_monitor
+from src.api.middleware import (
+    AdmissionControlMiddleware,
+    CacheControlMiddleware,
+    LoggingMiddleware,
+    SecurityMiddleware,
+)
 from src.config import settings
+from src.data_fetchers.recent import hbar_recent
 from src.database.connection import db_manager
 from src.schedulers.tasks import start_schedulers, stop_schedulers
 
@@ -28,9 +34,18 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         sys.exit(1)
     
+    # Serve recent HBAR history from memory
+    try:
+        hbar_recent.hydrate()
+    except Exception as e:
+        logger.error(f"Failed to load recent HBAR history: {e}")
+    
+    # Keep the readiness snapshot fresh off the request path
+    health_monitor.start()
+    
     # Start background schedulers
     try:
-        await start_schedulers()
+        await start_schedulers(background_initial_fetch=settings.api.fast_start)
         logger.info("Background schedulers started")
     except Exception as e:
         logger.error(f"Failed to start schedulers: {e}")
@@ -49,6 +64,8 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error stopping schedulers: {e}")
     
+    await health_monitor.stop()
+    
     # Close database connection
     try:
         db_manager.close()
@@ -97,7 +114,15 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
     
-    # Add CORS middleware
+    # Add custom middleware
+    app.add_middleware(SecurityMiddleware)
+    app.add_middleware(CacheControlMiddleware, cache_max_age=300)
+    app.add_middleware(LoggingMiddleware)
+    # Ahead of the other middleware, so a request holds its slot from the
+    # moment it arrives, but inside CORS so rejections carry CORS headers
+    app.add_middleware(AdmissionControlMiddleware)
+    
+    # Add CORS middleware (outermost, answering preflights itself)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.api.cors_origins,
@@ -106,11 +131,6 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
-    # Add custom middleware
-    app.add_middleware(SecurityMiddleware)
-    app.add_middleware(CacheControlMiddleware, cache_max_age=300)
-    app.add_middleware(LoggingMiddleware)
-    
     # Include API routes
     app.include_router(router, prefix="/api/v1")
     
@@ -131,6 +151,8 @@ app = create_app()
 
 
 if __name__ == "__main__":
+    import uvicorn
+    
     uvicorn.run(
         "main:app",
         host=settings.api.host,
@@ -0,0 +1,221 @@
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Pattern, Tuple
+
+from ..config import settings
+
+# Served from memory and polled by load balancers; never queued or limited
+EXEMPT_PATHS = {"/api/v1/livez", "/api/v1/readyz"}
+
+# First matching pattern decides a request's class; anything else is "standard".
+# The history patterns must come first, since tokens/[^/]+$ also matches
+# /tokens/history. There are no export endpoints yet, so "bulk" covers the
+# long history reads.
+ROUTE_CLASSES: List[Tuple[Pattern[str], str]] = [
+    (re.compile(r"^/api/v1/(hbar|tokens)/history$"), "bulk"),
+    (re.compile(r"^/api/v1/tokens/[^/]+/history$"), "bulk"),
+    (re.compile(r"^/api/v1/hbar/analytics$"), "bulk"),
+    (re.compile(r"^/api/v1/(health|hbar/current|market/global|market/trending|tokens/top)$"), "critical"),
+    (re.compile(r"^/api/v1/tokens/[^/]+$"), "critical"),
+]
+
+
+@dataclass(slots=True)
+class PriorityClass:
+    """Concurrency limit, wait queue and counters of one priority class."""
+    name: str
+    concurrency: int
+    cost: float  # Tokens taken from the client's bucket per request
+    in_flight: int = 0
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+    stats: Dict[str, int] = field(default_factory=lambda: {
+        "admitted": 0, "queued": 0, "queue_full": 0, "timed_out": 0, "rate_limited": 0,
+    })
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    """Per-client request budget, refilled continuously."""
+    tokens: float
+    updated_at: float
+
+
+@dataclass(frozen=True, slots=True)
+class Rejection:
+    """Why a request was turned away and when to come back."""
+    status_code: int
+    detail: str
+    retry_after: int
+
+
+class AdmissionController:
+    """Admission control for API requests, by priority class and client.
+
+    Requests are classed as ``critical`` (health and current data),
+    ``standard`` or ``bulk`` (history reads). All share ``max_concurrency``
+    slots. Standard and bulk requests are capped at their own limits and
+    together at ``standard_concurrency``, so the remaining slots are held
+    back for critical ones. A request that can't start waits in its class's
+    bounded queue, and freed slots go to waiting classes in priority order.
+    A full queue or a wait longer than ``queue_timeout`` gets a 503. Each
+    client also has a token bucket refilled at ``client_rate`` tokens per
+    second up to ``client_burst``; bulk requests cost ``bulk_cost`` tokens,
+    and an empty bucket gets a 429. Both responses carry ``Retry-After``.
+
+    Limits are set per class rather than per route: ``ROUTE_CLASSES`` maps
+    each route to a class by cost, which bounds the expensive routes as a
+    group without a limit to tune for every endpoint.
+    """
+
+    def __init__(self, enabled: bool, max_concurrency: int, standard_concurrency: int, bulk_concurrency: int,
+                 max_queue: int, queue_timeout: float, retry_after: int, client_rate: float,
+                 client_burst: float, bulk_cost: float, max_clients: int):
+        self.enabled = enabled
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.client_rate = client_rate  # 0 disables per-client limits
+        self.client_burst = client_burst
+        self.max_clients = max_clients
+        # In priority order
+        self.classes: Dict[str, PriorityClass] = {
+            "critical": PriorityClass("critical", max_concurrency, 1),
+            "standard": PriorityClass("standard", min(standard_concurrency, max_concurrency), 1),
+            "bulk": PriorityClass("bulk", min(bulk_concurrency, max_concurrency), bulk_cost),
+        }
+        self._in_flight = 0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def classify(self, path: str) -> Optional[str]:
+        """Priority class of a request path, or None if it is exempt."""
+        if path in EXEMPT_PATHS:
+            return None
+        for pattern, name in ROUTE_CLASSES:
+            if pattern.match(path):
+                return name
+        return "standard"
+
+    def _take_tokens(self, client: str, cost: float) -> float:
+        """Charge a client's bucket. Returns 0 if allowed, else seconds until it would be."""
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.client_burst, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket.tokens = min(self.client_burst, bucket.tokens + (now - bucket.updated_at) * self.client_rate)
+            bucket.updated_at = now
+
+        if bucket.tokens < cost:
+            return (cost - bucket.tokens) / self.client_rate
+        bucket.tokens -= cost
+        return 0.0
+
+    def _can_admit(self, cls: PriorityClass) -> bool:
+        if self._in_flight >= self.max_concurrency or cls.in_flight >= cls.concurrency:
+            return False
+        if cls.name == "critical":
+            return True
+        # Standard and bulk share what is left after the slots reserved for critical
+        lower_in_flight = self._in_flight - self.classes["critical"].in_flight
+        return lower_in_flight < self.classes["standard"].concurrency
+
+    def _admit(self, cls: PriorityClass) -> None:
+        self._in_flight += 1
+        cls.in_flight += 1
+        cls.stats["admitted"] += 1
+
+    def _wake(self) -> None:
+        """Hand free slots to waiting requests, highest priority first."""
+        for cls in self.classes.values():
+            while cls.waiters and self._can_admit(cls):
+                waiter = cls.waiters.popleft()
+                if not waiter.done():
+                    self._admit(cls)
+                    waiter.set_result(None)
+
+    async def acquire(self, name: str, client: str) -> Optional[Rejection]:
+        """Take a slot for a request of class ``name``, waiting if needed.
+
+        Returns None once admitted, after which ``release`` must be called,
+        or the rejection to send instead.
+        """
+        cls = self.classes[name]
+        if self.client_rate > 0:
+            wait = self._take_tokens(client, cls.cost)
+            if wait:
+                cls.stats["rate_limited"] += 1
+                return Rejection(429, "Too many requests", max(1, math.ceil(wait)))
+
+        if not cls.waiters and self._can_admit(cls):
+            self._admit(cls)
+            return None
+
+        if len(cls.waiters) >= self.max_queue:
+            cls.stats["queue_full"] += 1
+            return Rejection(503, "Server busy", self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        cls.waiters.append(waiter)
+        cls.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            cls.stats["timed_out"] += 1
+            return Rejection(503, "Server busy", self.retry_after)
+        except asyncio.CancelledError:
+            # Admitted just before the client went away
+            if waiter.done() and not waiter.cancelled():
+                self.release(name)
+            raise
+        finally:
+            if waiter in cls.waiters:
+                cls.waiters.remove(waiter)
+        return None
+
+    def release(self, name: str) -> None:
+        """Free the slot of a finished request."""
+        self._in_flight -= 1
+        self.classes[name].in_flight -= 1
+        self._wake()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-class occupancy and rejection counters."""
+        return {
+            "enabled": self.enabled,
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "classes": {
+                name: {
+                    **cls.stats,
+                    "in_flight": cls.in_flight,
+                    "waiting": len(cls.waiters),
+                    "concurrency": cls.concurrency,
+                }
+                for name, cls in self.classes.items()
+            },
+            "tracked_clients": len(self._buckets),
+        }
+
+
+# Global admission controller instance
+admission_control = AdmissionController(
+    enabled=settings.admission.enabled,
+    max_concurrency=settings.admission.max_concurrency,
+    standard_concurrency=settings.admission.standard_concurrency,
+    bulk_concurrency=settings.admission.bulk_concurrency,
+    max_queue=settings.admission.max_queue,
+    queue_timeout=settings.admission.queue_timeout,
+    retry_after=settings.admission.retry_after,
+    client_rate=settings.admission.client_rate,
+    client_burst=settings.admission.client_burst,
+    bulk_cost=settings.admission.bulk_cost,
+    max_clients=settings.admission.max_clients,
+)
@@ -0,0 +1,101 @@
+import math
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict
+
+from ..database.connection import db_manager
+from .cache import result_cache
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ANALYTICS_METRICS = ("returns", "volatility", "sma", "ema", "drawdown")
+
+# Buckets per year, used to annualize volatility
+PERIODS_PER_YEAR = {"hour": 24 * 365, "day": 365}
+
+
+def _ema(values: "np.ndarray", window: int) -> "np.ndarray":
+    """Exponential moving average with the conventional 2 / (window + 1) smoothing, seeded with the first value.
+
+    The recurrence unrolls to a convolution of the deviations from the seed
+    with the kernel ``alpha * (1 - alpha) ** k``, done by FFT. The kernel is
+    cut where its weights drop below float64 precision.
+    """
+    import numpy as np
+
+    if len(values) < 2:
+        return values.astype(np.float64)
+
+    alpha = 2.0 / (window + 1)
+    decay = 1 - alpha
+    terms = min(len(values), math.ceil(math.log(np.finfo(np.float64).eps) / math.log(decay)))
+    kernel = alpha * decay ** np.arange(terms)
+
+    size = 1 << (len(values) + terms - 1).bit_length()
+    deviations = np.fft.rfft(values - values[0], size) * np.fft.rfft(kernel, size)
+    return values[0] + np.fft.irfft(deviations, size)[: len(values)]
+
+
+def _compute(metric: str, window: int, resolution: str, days: int) -> Dict[str, Any]:
+    """Run the rollup query and shape one metric series."""
+    import numpy as np
+
+    since = datetime.utcnow() - timedelta(days=days)
+    columns = db_manager.query_numpy(
+        "hbar_rollup_analytics", resolution=resolution, since=since, preceding=window - 1
+    )
+
+    closes = np.asarray(columns["close"], dtype=np.float64)
+    if metric == "ema":
+        values = _ema(closes, window)
+    elif metric == "returns":
+        values = np.ma.filled(columns["ret"].astype(np.float64), np.nan)
+    elif metric == "volatility":
+        values = np.ma.filled(columns["volatility"].astype(np.float64), np.nan)
+        values = values * np.sqrt(PERIODS_PER_YEAR[resolution])
+    else:
+        values = np.ma.filled(columns[metric].astype(np.float64), np.nan)
+
+    # Leading buckets without a full window carry no meaningful value
+    if metric in ("sma", "ema", "volatility"):
+        values[: window - 1] = np.nan
+
+    valid = values[~np.isnan(values)]
+    points = [
+        {
+            "timestamp": bucket,
+            "price_usd": float(close),
+            "value": None if np.isnan(value) else float(value),
+        }
+        for bucket, close, value in zip(columns["bucket"].tolist(), closes, values, strict=True)
+    ]
+
+    return {
+        "metric": metric,
+        "window": window,
+        "resolution": resolution,
+        "days": days,
+        "points": points,
+        "summary": {
+            "latest": float(valid[-1]) if len(valid) else None,
+            "min": float(valid.min()) if len(valid) else None,
+            "max": float(valid.max()) if len(valid) else None,
+            "mean": float(valid.mean()) if len(valid) else None,
+        },
+    }
+
+
+def compute_hbar_analytics(metric: str, window: int, resolution: str = "hour", days: int = 30) -> Dict[str, Any]:
+    """Compute an HBAR price analytics series over hourly or daily rollups.
+
+    Results are cached until the next write to ``hbar_metrics``, so repeat
+    queries between writes skip the database.
+    """
+    if metric not in ANALYTICS_METRICS:
+        raise ValueError(f"Unknown analytics metric: {metric}")
+
+    return result_cache.get_or_compute(
+        ("hbar_analytics", metric, window, resolution, days),
+        ("hbar_metrics",),
+        lambda: _compute(metric, window, resolution, days),
+    )
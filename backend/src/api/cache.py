@@ -0,0 +1,133 @@
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from ..config import settings
+from ..database.connection import db_manager
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """A cached result with the table versions it was computed from."""
+    value: Any
+    versions: Tuple[int, ...]
+    size: int
+    expires_at: float
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory held by a result, following containers."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    elif isinstance(value, list | tuple | set):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class ResultCache:
+    """Bounded LRU cache of read results, invalidated by table data versions.
+
+    Each entry records the versions of the tables it was read from, as
+    tracked by ``db_manager.bump_version``. A write to any of them makes the
+    entry stale. Entries also expire after ``ttl`` seconds, which bounds how
+    far results relative to "now" can drift. The least recently used entries
+    are evicted once the entry count or estimated size exceeds its limit.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0, "oversized": 0}
+
+    def get(self, key: Hashable, versions: Tuple[int, ...]) -> Optional[Any]:
+        """Get a fresh cached result, or None."""
+        entry = self._entries.get(key)
+        if entry is not None and (entry.versions != versions or entry.expires_at <= time.monotonic()):
+            self._remove(key)
+            self.stats["invalidations"] += 1
+            entry = None
+
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry.value
+
+    def put(self, key: Hashable, versions: Tuple[int, ...], value: Any) -> None:
+        """Cache a result computed from the given table versions."""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            self.stats["oversized"] += 1
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = CacheEntry(value, versions, size, time.monotonic() + self.ttl)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: Hashable) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def get_or_compute(self, key: Hashable, tables: Sequence[str], compute: Callable[[], Any]) -> Any:
+        """Return the cached result for ``key`` or compute and cache it.
+
+        Versions are read before computing, so a write that lands during the
+        computation leaves the entry stale rather than mislabelled. Empty
+        results are not cached, since readers also return them on errors.
+        """
+        versions = db_manager.get_version(*tables)
+        value = self.get(key, versions)
+        if value is None:
+            value = compute()
+            if value:
+                self.put(key, versions, value)
+        return value
+
+    async def aget_or_compute(self, key: Hashable, tables: Sequence[str],
+                              compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of ``get_or_compute``."""
+        versions = db_manager.get_version(*tables)
+        value = self.get(key, versions)
+        if value is None:
+            value = await compute()
+            if value:
+                self.put(key, versions, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else None,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+        }
+
+
+# Global result cache instance
+result_cache = ResultCache(
+    max_entries=settings.cache.max_entries,
+    max_bytes=settings.cache.max_mb * 1024 * 1024,
+    ttl=settings.cache.ttl,
+)
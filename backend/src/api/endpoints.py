@@ -1,16 +1,35 @@
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+from typing import Annotated, Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from loguru import logger
 from pydantic import BaseModel
 
-from ..data_fetchers.coingecko import CoinGeckoFetcher
-from ..data_fetchers.hedera import hedera_token_fetcher
+from ..config import settings
+from ..data_fetchers.coingecko import CoinGeckoFetcher, hbar_runs
+from ..data_fetchers.gaps import hbar_gaps
+from ..data_fetchers.hedera import decode_token_cursor, hedera_token_fetcher, token_runs
+from ..data_fetchers.recent import hbar_recent
+from ..data_fetchers.token_universe import token_universe
 from ..database.connection import db_manager
+from ..schedulers.refresh import refresh_jobs
+from ..schedulers.tasks import get_scheduler_status
+from .admission import admission_control
+from .analytics import compute_hbar_analytics
+from .cache import result_cache
+from .health import health_monitor
 
 router = APIRouter()
 
+# Maximum token IDs accepted by the batched history endpoint
+MAX_HISTORY_TOKENS = 50
+
+# Optional range bounds shared by the token history endpoints
+HistoryStart = Annotated[Optional[datetime], Query(description="Range start (UTC), defaults to 7 days before end")]
+HistoryEnd = Annotated[Optional[datetime], Query(description="Range end (UTC), defaults to now")]
+
 
 class HBARResponse(BaseModel):
     """HBAR metrics response model."""
@@ -38,6 +57,40 @@ class HealthResponse(BaseModel):
     version: str = "1.0.0"
 
 
+class TokenHistoryPoint(BaseModel):
+    """Token history point response model."""
+    timestamp: datetime
+    price_usd: Optional[float]
+    market_cap: Optional[float]
+    volume_24h: Optional[float]
+    total_supply: Optional[int]
+    holders_count: Optional[int]
+
+
+class GlobalMarketResponse(BaseModel):
+    """Global crypto market response model."""
+    timestamp: datetime
+    total_market_cap_usd: float
+    total_volume_usd: float
+    market_cap_change_24h: float
+    btc_dominance: float
+    eth_dominance: float
+    active_cryptocurrencies: int
+    markets: int
+
+
+class TrendingCoinResponse(BaseModel):
+    """Trending coin response model."""
+    timestamp: datetime
+    rank: int
+    coin_id: str
+    name: str
+    symbol: str
+    market_cap_rank: Optional[int]
+    price_btc: Optional[float]
+    thumb: Optional[str]
+
+
 class TokenResponse(BaseModel):
     """Token data response model."""
     token_id: str
@@ -56,6 +109,12 @@ class TokenResponse(BaseModel):
     timestamp: datetime
 
 
+class TokenPageResponse(BaseModel):
+    """One page of the token listing."""
+    tokens: List[TokenResponse]
+    next_cursor: Optional[str]
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
@@ -74,17 +133,41 @@ async def health_check():
     )
 
 
+@router.get("/livez")
+async def liveness_probe():
+    """Liveness probe answered from memory, without touching the database."""
+    return health_monitor.liveness()
+
+
+@router.get("/readyz")
+async def readiness_probe():
+    """Readiness probe serving the snapshot kept fresh by the health monitor.
+    
+    Returns 503 until the first check completes and while the database is
+    unreachable. Stale datasets or open upstream circuits report ``degraded``
+    but stay ready, since existing data can still be served.
+    """
+    snapshot = health_monitor.snapshot
+    if snapshot is None:
+        return JSONResponse({"status": "starting", "ready": False}, status_code=503)
+    return JSONResponse(jsonable_encoder(snapshot), status_code=200 if snapshot["ready"] else 503)
+
+
 @router.get("/hbar/current", response_model=Optional[HBARResponse])
 async def get_current_hbar_data():
     """Get current HBAR market data."""
     try:
-        async with CoinGeckoFetcher() as fetcher:
-            latest_data = await fetcher.get_latest_hbar_data()
-            
-            if latest_data:
-                return HBARResponse(**latest_data)
-            
-            # If no data in database, fetch from API
+        # Database reads don't need an HTTP session, so cache hits skip opening one
+        fetcher = CoinGeckoFetcher()
+        latest_data = await result_cache.aget_or_compute(
+            ("hbar_current",), ("hbar_metrics",), fetcher.get_latest_hbar_data
+        )
+        
+        if latest_data:
+            return HBARResponse(**latest_data)
+        
+        # If no data in database, fetch from API
+        async with fetcher:
             hbar_data = await fetcher.fetch_hbar_data()
             if hbar_data:
                 await fetcher.save_hbar_data(hbar_data)
@@ -111,10 +194,12 @@ async def get_hbar_price_history(
 ):
     """Get HBAR price history."""
     try:
-        async with CoinGeckoFetcher() as fetcher:
-            history = await fetcher.get_hbar_price_history(days)
-            return [PriceHistoryResponse(**item) for item in history]
-            
+        fetcher = CoinGeckoFetcher()
+        history = await result_cache.aget_or_compute(
+            ("hbar_history", days), ("hbar_metrics",), lambda: fetcher.get_hbar_price_history(days)
+        )
+        return [PriceHistoryResponse(**item) for item in history]
+        
     except Exception as e:
         logger.error(f"Failed to get HBAR price history: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch price history")
@@ -124,19 +209,11 @@ async def get_hbar_price_history(
 async def get_hbar_stats():
     """Get HBAR statistics and analytics."""
     try:
-        query = """
-            SELECT 
-                COUNT(*) as total_records,
-                MIN(price_usd) as min_price,
-                MAX(price_usd) as max_price,
-                AVG(price_usd) as avg_price,
-                MIN(timestamp) as first_record,
-                MAX(timestamp) as last_record
-            FROM hbar_metrics
-            WHERE timestamp >= (current_timestamp - interval '30 days')
-        """
-        
-        result = db_manager.fetchone(query)
+        result = result_cache.get_or_compute(
+            ("hbar_stats",),
+            ("hbar_metrics",),
+            lambda: db_manager.query_one("hbar_stats", since=datetime.utcnow() - timedelta(days=30)),
+        )
         if result:
             return {
                 "total_records": result[0],
@@ -159,30 +236,43 @@ async def get_hbar_stats():
         raise HTTPException(status_code=500, detail="Failed to fetch statistics")
 
 
-@router.post("/hbar/refresh")
-async def refresh_hbar_data():
-    """Manually refresh HBAR data from API."""
+@router.get("/hbar/analytics")
+async def get_hbar_analytics(
+    metric: str = Query(default="volatility", pattern="^(returns|volatility|sma|ema|drawdown)$",
+                        description="Analytics series to compute"),
+    window: int = Query(default=24, ge=2, le=1000, description="Window length in buckets"),
+    resolution: str = Query(default="hour", pattern="^(hour|day)$", description="Rollup bucket size"),
+    days: int = Query(default=30, ge=1, le=365, description="Number of days of history to analyse"),
+):
+    """Get rolling HBAR price analytics computed in the database."""
     try:
-        async with CoinGeckoFetcher() as fetcher:
-            hbar_data = await fetcher.fetch_hbar_data()
-            if hbar_data:
-                success = await fetcher.save_hbar_data(hbar_data)
-                if success:
-                    return {
-                        "message": "HBAR data refreshed successfully",
-                        "timestamp": datetime.utcnow(),
-                        "data": {
-                            "price_usd": hbar_data.price_usd,
-                            "market_cap": hbar_data.market_cap,
-                            "market_cap_rank": hbar_data.market_cap_rank,
-                        },
-                    }
-            
-            raise HTTPException(status_code=500, detail="Failed to refresh data")
-            
+        result = compute_hbar_analytics(metric, window, resolution, days)
+        return {**result, "timestamp": datetime.utcnow()}
+        
     except Exception as e:
-        logger.error(f"Failed to refresh HBAR data: {e}")
-        raise HTTPException(status_code=500, detail="Failed to refresh HBAR data")
+        logger.error(f"Failed to compute HBAR analytics: {e}")
+        raise HTTPException(status_code=500, detail="Failed to compute analytics")
+
+
+def _refresh_accepted(request: Request, kind: str, label: str) -> JSONResponse:
+    """Queue a refresh job and answer 202 with where to poll its status."""
+    job, created = refresh_jobs.submit(kind)
+    status_url = str(request.url_for("get_refresh_job", job_id=job.job_id))
+    return JSONResponse(
+        status_code=202,
+        headers={"Location": status_url},
+        content=jsonable_encoder({
+            "message": f"{label} refresh queued" if created else f"{label} refresh already in progress",
+            "job": job.to_dict(),
+            "status_url": status_url,
+        }),
+    )
+
+
+@router.post("/hbar/refresh", status_code=202)
+async def refresh_hbar_data(request: Request):
+    """Queue a refresh of HBAR data from API; poll ``/jobs/{job_id}`` for the result."""
+    return _refresh_accepted(request, "hbar", "HBAR")
 
 
 @router.get("/metrics/summary")
@@ -190,15 +280,9 @@ async def get_metrics_summary():
     """Get comprehensive metrics summary."""
     try:
         # Get latest HBAR data
-        hbar_query = """
-            SELECT price_usd, market_cap, volume_24h, price_change_24h, 
-                   circulating_supply, market_cap_rank, timestamp
-            FROM hbar_metrics
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """
-        
-        hbar_result = db_manager.fetchone(hbar_query)
+        hbar_result = result_cache.get_or_compute(
+            ("hbar_latest",), ("hbar_metrics",), lambda: db_manager.query_one("hbar_latest")
+        )
         
         summary = {
             "timestamp": datetime.utcnow(),
@@ -216,13 +300,13 @@ async def get_metrics_summary():
         
         if hbar_result:
             summary["hbar"] = {
-                "price_usd": hbar_result[0],
-                "market_cap": hbar_result[1],
-                "volume_24h": hbar_result[2],
-                "price_change_24h": hbar_result[3],
-                "circulating_supply": hbar_result[4],
-                "market_cap_rank": hbar_result[5],
-                "last_updated": hbar_result[6],
+                "price_usd": hbar_result[1],
+                "market_cap": hbar_result[2],
+                "volume_24h": hbar_result[3],
+                "price_change_24h": hbar_result[4],
+                "circulating_supply": hbar_result[5],
+                "market_cap_rank": hbar_result[6],
+                "last_updated": hbar_result[0],
             }
         
         return summary
@@ -232,58 +316,312 @@ async def get_metrics_summary():
         raise HTTPException(status_code=500, detail="Failed to fetch metrics summary")
 
 
+@router.get("/metrics/queries")
+async def get_query_metrics():
+    """Get call counts and timings of the registered database queries."""
+    return {
+        "queries": db_manager.get_query_stats(),
+        "timestamp": datetime.utcnow(),
+    }
+
+
+@router.get("/metrics/cache")
+async def get_cache_metrics():
+    """Get hit/miss counters and occupancy of the API result cache and recent HBAR buffer."""
+    return {
+        "cache": result_cache.get_stats(),
+        "hbar_recent_buffer": hbar_recent.get_stats(),
+        "timestamp": datetime.utcnow(),
+    }
+
+
+@router.get("/metrics/admission")
+async def get_admission_metrics():
+    """Get in-flight, waiting and rejected requests per priority class."""
+    return {
+        "admission": admission_control.get_stats(),
+        "timestamp": datetime.utcnow(),
+    }
+
+
+@router.get("/metrics/ingest")
+async def get_ingest_metrics():
+    """Get snapshot rows inserted versus unchanged runs extended since startup."""
+    return {
+        "dedup_enabled": settings.updates.dedup,
+        "hbar_metrics": hbar_runs.stats,
+        "hedera_tokens": token_runs.stats,
+        "timestamp": datetime.utcnow(),
+    }
+
+
+@router.get("/jobs")
+async def list_refresh_jobs():
+    """Get recent manual refresh jobs, newest first."""
+    return {
+        "jobs": [job.to_dict() for job in refresh_jobs.recent()],
+        "timestamp": datetime.utcnow(),
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_refresh_job(job_id: str):
+    """Get status, progress and result of a manual refresh job."""
+    job = refresh_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+
+@router.get("/admin/scheduler")
+async def get_scheduler_admin(
+    hours: int = Query(default=24, ge=1, le=720, description="Hours of run history to summarise"),
+    recent: int = Query(default=20, ge=0, le=500, description="Number of recent runs to include"),
+):
+    """Get scheduler state, per-job duration percentiles, overruns and recent runs."""
+    try:
+        status = get_scheduler_status()
+        
+        stats_rows = db_manager.query_all("scheduler_job_stats", since=datetime.utcnow() - timedelta(hours=hours))
+        jobs = []
+        for row in stats_rows:
+            jobs.append({
+                "job_id": row[0],
+                "interval": row[12],
+                "runs": row[1],
+                "failures": row[2],
+                "skipped": row[3],
+                "p50_ms": row[4],
+                "p95_ms": row[5],
+                "max_ms": row[6],
+                "overruns": row[7],
+                "rows_written": row[8],
+                "upstream_calls": row[9],
+                "last_started_at": row[10],
+                "last_error": row[11],
+                # p95 runs no longer fit the job's current interval
+                "falling_behind": row[5] is not None and row[5] > row[12] * 1000,
+            })
+        
+        recent_runs = [
+            {
+                "job_id": row[0],
+                "started_at": row[1],
+                "finished_at": row[2],
+                "duration_ms": row[3],
+                "interval_seconds": row[4],
+                "status": row[5],
+                "rows_written": row[6],
+                "upstream_calls": row[7],
+                "error": row[8],
+                "overrun": row[3] > row[4] * 1000,
+            }
+            for row in (db_manager.query_all("scheduler_recent_runs", limit=recent) if recent else [])
+        ]
+        
+        return {
+            "scheduler": status,
+            "window_hours": hours,
+            "jobs": jobs,
+            "recent_runs": recent_runs,
+            "timestamp": datetime.utcnow(),
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get scheduler status: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch scheduler status")
+
+
+@router.get("/admin/tokens")
+async def get_token_universe_admin():
+    """Get tracked token tiers and token discovery progress."""
+    try:
+        return {**token_universe.summary(), "timestamp": datetime.utcnow()}
+        
+    except Exception as e:
+        logger.error(f"Failed to get token universe summary: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch token universe summary")
+
+
+@router.get("/admin/gaps")
+async def get_hbar_gaps_admin(
+    recent: int = Query(default=20, ge=0, le=500, description="Number of recent gaps to include"),
+):
+    """Get detected HBAR history gaps, their repair status and scan coverage."""
+    try:
+        return {**hbar_gaps.summary(recent), "timestamp": datetime.utcnow()}
+        
+    except Exception as e:
+        logger.error(f"Failed to get HBAR gap summary: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch HBAR gap summary")
+
+
+@router.get("/market/global", response_model=Optional[GlobalMarketResponse])
+async def get_global_market_data():
+    """Get the latest global crypto market snapshot collected by the scheduler."""
+    try:
+        fetcher = CoinGeckoFetcher()
+        global_data = await result_cache.aget_or_compute(
+            ("market_global",), ("market_global",), fetcher.get_latest_global_data
+        )
+        return GlobalMarketResponse(**global_data) if global_data else None
+        
+    except Exception as e:
+        logger.error(f"Failed to get global market data: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch global market data")
+
+
+@router.get("/market/trending", response_model=List[TrendingCoinResponse])
+async def get_trending_coins():
+    """Get the latest trending coins snapshot collected by the scheduler."""
+    try:
+        fetcher = CoinGeckoFetcher()
+        trending = await result_cache.aget_or_compute(
+            ("market_trending",), ("market_trending",), fetcher.get_latest_trending
+        )
+        return [TrendingCoinResponse(**coin) for coin in trending]
+        
+    except Exception as e:
+        logger.error(f"Failed to get trending coins: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch trending coins")
+
+
+@router.get("/tokens", response_model=TokenPageResponse)
+async def list_tokens(
+    sort: str = Query(default="holders", pattern="^(holders|supply|market_cap|symbol)$", description="Sort key"),
+    order: Optional[str] = Query(
+        default=None, pattern="^(asc|desc)$", description="Sort direction, defaults to desc (asc for symbol)"
+    ),
+    limit: int = Query(default=50, ge=1, le=200, description="Tokens per page"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    token_type: Optional[str] = Query(default=None, alias="type", description="Only tokens of this type"),
+    min_holders: int = Query(default=0, ge=0, description="Only tokens with at least this many holders"),
+):
+    """List tracked tokens page by page.
+    
+    Pages follow on with ``cursor`` rather than an offset, so deep pages
+    cost the same as the first.
+    """
+    order = order or ("asc" if sort == "symbol" else "desc")
+    if cursor:
+        try:
+            decode_token_cursor(cursor, sort, order)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}") from None
+    
+    try:
+        page = await result_cache.aget_or_compute(
+            ("tokens_page", sort, order, limit, cursor, token_type, min_holders),
+            ("hedera_tokens", "tokens"),
+            lambda: hedera_token_fetcher.get_token_page(sort, order, limit, cursor, token_type, min_holders),
+        )
+        return TokenPageResponse(**page)
+        
+    except Exception as e:
+        logger.error(f"Failed to list tokens: {e}")
+        raise HTTPException(status_code=500, detail="Failed to list tokens")
+
+
 @router.get("/tokens/top", response_model=List[TokenResponse])
 async def get_top_tokens(
     limit: int = Query(default=10, ge=1, le=50, description="Number of top tokens to return")
 ):
     """Get top Hedera DeFi tokens."""
     try:
-        async with hedera_token_fetcher:
-            tokens = await hedera_token_fetcher.get_top_tokens(limit)
-            return [TokenResponse(**token) for token in tokens]
-            
+        tokens = await result_cache.aget_or_compute(
+            ("tokens_top", limit), ("hedera_tokens", "tokens"), lambda: hedera_token_fetcher.get_top_tokens(limit)
+        )
+        return [TokenResponse(**token) for token in tokens]
+        
     except Exception as e:
         logger.error(f"Failed to get top tokens: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch top tokens")
 
 
-@router.post("/tokens/refresh")
-async def refresh_token_data():
-    """Manually refresh token data from Hedera mirror node."""
+@router.post("/tokens/refresh", status_code=202)
+async def refresh_token_data(request: Request):
+    """Queue a refresh of the tracked tokens due an update; poll ``/jobs/{job_id}`` for progress."""
+    return _refresh_accepted(request, "tokens", "Token")
+
+
+async def _cached_token_history(
+    token_ids: List[str], start: datetime, end: datetime, resolution: str, fixed_range: bool
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Token history, cached when the range doesn't move with the clock."""
+    if not fixed_range:
+        return await hedera_token_fetcher.get_token_history(token_ids, start, end, resolution)
+    return await result_cache.aget_or_compute(
+        ("token_history", tuple(token_ids), start, end, resolution),
+        ("hedera_tokens",),
+        lambda: hedera_token_fetcher.get_token_history(token_ids, start, end, resolution),
+    )
+
+
+def _history_range(start: Optional[datetime], end: Optional[datetime]) -> tuple:
+    """Resolve an optional history range, defaulting to the last 7 days."""
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=7)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return start, end
+
+
+@router.get("/tokens/history", response_model=Dict[str, List[TokenHistoryPoint]])
+async def get_tokens_history(
+    ids: str = Query(description="Comma-separated token IDs"),
+    start: HistoryStart = None,
+    end: HistoryEnd = None,
+    resolution: str = Query(default="hour", pattern="^(raw|hour|day)$", description="Downsampling bucket size"),
+):
+    """Get history for several tokens at once, fetched with one grouped query."""
+    token_ids = list(dict.fromkeys(token_id.strip() for token_id in ids.split(",") if token_id.strip()))
+    if not token_ids:
+        raise HTTPException(status_code=400, detail="At least one token ID is required")
+    if len(token_ids) > MAX_HISTORY_TOKENS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_HISTORY_TOKENS} token IDs per request")
+    
+    fixed_range = end is not None
+    start, end = _history_range(start, end)
     try:
-        async with hedera_token_fetcher:
-            tokens_data = await hedera_token_fetcher.fetch_data()
-            if tokens_data:
-                success = await hedera_token_fetcher.save_token_data(tokens_data)
-                if success:
-                    return {
-                        "message": "Token data refreshed successfully",
-                        "timestamp": datetime.utcnow(),
-                        "tokens_count": len(tokens_data),
-                    }
-            
-            raise HTTPException(status_code=500, detail="Failed to refresh token data")
-            
+        history = await _cached_token_history(token_ids, start, end, resolution, fixed_range)
+        return {
+            token_id: [TokenHistoryPoint(**point) for point in points]
+            for token_id, points in history.items()
+        }
+        
     except Exception as e:
-        logger.error(f"Failed to refresh token data: {e}")
-        raise HTTPException(status_code=500, detail="Failed to refresh token data")
+        logger.error(f"Failed to get token history for {token_ids}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch token history")
+
+
+@router.get("/tokens/{token_id}/history", response_model=List[TokenHistoryPoint])
+async def get_token_history(
+    token_id: str,
+    start: HistoryStart = None,
+    end: HistoryEnd = None,
+    resolution: str = Query(default="hour", pattern="^(raw|hour|day)$", description="Downsampling bucket size"),
+):
+    """Get history for a single token."""
+    fixed_range = end is not None
+    start, end = _history_range(start, end)
+    try:
+        history = await _cached_token_history([token_id], start, end, resolution, fixed_range)
+        return [TokenHistoryPoint(**point) for point in history[token_id]]
+        
+    except Exception as e:
+        logger.error(f"Failed to get token history for {token_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch token history")
 
 
 @router.get("/tokens/{token_id}", response_model=Optional[TokenResponse])
 async def get_token_by_id(token_id: str):
     """Get specific token data by token ID."""
     try:
-        query = """
-            SELECT token_id, name, symbol, price_usd, market_cap, volume_24h,
-                   price_change_24h, decimals, total_supply, holders_count,
-                   transfers_24h, token_type, memo, timestamp
-            FROM hedera_tokens 
-            WHERE token_id = ?
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """
-        
-        result = db_manager.fetchone(query, (token_id,))
+        result = result_cache.get_or_compute(
+            ("token_latest", token_id),
+            ("hedera_tokens", "tokens"),
+            lambda: db_manager.query_one("token_latest", token_id=token_id),
+        )
         
         if result:
             return TokenResponse(
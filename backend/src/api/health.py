@@ -0,0 +1,129 @@
+import asyncio
+import contextlib
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from ..config import settings
+from ..data_fetchers.base_fetcher import get_circuit_breaker_states
+from ..database.connection import db_manager
+
+# Ingested tables checked for freshness, with the interval setting of the job writing them
+DATASETS = {
+    "hbar_metrics": "hbar_interval",
+    "hedera_tokens": "tokens_interval",
+    "market_global": "market_interval",
+    "market_trending": "market_interval",
+}
+
+# Snapshot tables extend their latest row on unchanged fetches, so the last
+# ingest is its valid_to rather than its timestamp
+FRESHNESS_COLUMNS = {
+    "hbar_metrics": "valid_to",
+    "hedera_tokens": "valid_to",
+}
+
+
+class HealthMonitor:
+    """Keeps a readiness snapshot refreshed in the background.
+    
+    Probes only read the cached snapshot, so they never queue behind
+    database work on the shared connection. Checks run on a separate
+    connection in a worker thread.
+    """
+    
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def liveness(self) -> Dict[str, Any]:
+        """Liveness answered from memory only."""
+        return {"status": "alive", "uptime_seconds": round(time.monotonic() - self.started_at, 3)}
+    
+    @staticmethod
+    def _check_database(cursor) -> Dict[str, Optional[datetime]]:
+        """Latest ingest timestamp per dataset, read on a dedicated connection."""
+        try:
+            return {
+                table: cursor.execute(f"SELECT MAX({FRESHNESS_COLUMNS.get(table, 'timestamp')}) FROM {table}").fetchone()[0]
+                for table in DATASETS
+            }
+        finally:
+            cursor.close()
+    
+    async def refresh(self) -> Dict[str, Any]:
+        """Re-check the database, dataset freshness and upstream breakers."""
+        checked_at = datetime.utcnow()
+        database: Dict[str, Any] = {"reachable": False, "latency_ms": None, "error": None}
+        latest: Dict[str, Optional[datetime]] = {}
+        
+        start = time.perf_counter()
+        try:
+            cursor = db_manager.cursor()
+            latest = await asyncio.wait_for(
+                asyncio.to_thread(self._check_database, cursor), settings.health.db_timeout
+            )
+            database["reachable"] = True
+            database["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        except asyncio.TimeoutError:
+            database["error"] = f"No response within {settings.health.db_timeout}s"
+        except Exception as e:
+            database["error"] = str(e)
+        
+        datasets = {}
+        for table, interval_setting in DATASETS.items():
+            # Adaptive scheduling can stretch a job's interval up to max_backoff times
+            stale_after = getattr(settings.updates, interval_setting) * (settings.updates.max_backoff + 1)
+            last_ingest = latest.get(table)
+            age = (checked_at - last_ingest).total_seconds() if last_ingest else None
+            datasets[table] = {
+                "last_ingest": last_ingest,
+                "age_seconds": round(age, 3) if age is not None else None,
+                "stale_after_seconds": stale_after,
+                "stale": age is None or age > stale_after,
+            }
+        
+        upstreams = get_circuit_breaker_states()
+        ready = database["reachable"]
+        degraded = (
+            any(dataset["stale"] for dataset in datasets.values())
+            or any(breaker["state"] != "closed" for breaker in upstreams.values())
+        )
+        
+        self.snapshot = {
+            "status": "ok" if ready and not degraded else ("degraded" if ready else "unavailable"),
+            "ready": ready,
+            "checked_at": checked_at,
+            "database": database,
+            "datasets": datasets,
+            "upstreams": upstreams,
+        }
+        return self.snapshot
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Health refresh failed: {e}")
+            await asyncio.sleep(settings.health.refresh_interval)
+    
+    def start(self) -> None:
+        """Start refreshing the snapshot in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the background refresh."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+# Global health monitor instance
+health_monitor = HealthMonitor()
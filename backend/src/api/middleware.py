@@ -2,9 +2,12 @@ import time
 from typing import Callable
 
 from fastapi import Request, Response
+from fastapi.responses import JSONResponse
 from loguru import logger
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from .admission import admission_control
+
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     """Middleware for request/response logging."""
@@ -97,4 +100,39 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         response.headers["X-XSS-Protection"] = "1; mode=block"
         response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
         
-        return response
\ No newline at end of file
+        return response
+
+
+class AdmissionControlMiddleware(BaseHTTPMiddleware):
+    """Middleware that sheds load by priority class and per-client rate."""
+    
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        # OPTIONS requests are CORS preflights or cheap probes, never queued or limited
+        name = None
+        if admission_control.enabled and request.method != "OPTIONS":
+            name = admission_control.classify(request.url.path)
+        if name is None:
+            return await call_next(request)
+        
+        client = request.client.host if request.client else "unknown"
+        rejection = await admission_control.acquire(name, client)
+        if rejection is not None:
+            logger.warning(
+                "Request rejected",
+                extra={
+                    "url": str(request.url),
+                    "client_ip": client,
+                    "priority_class": name,
+                    "status_code": rejection.status_code,
+                }
+            )
+            return JSONResponse(
+                {"detail": rejection.detail},
+                status_code=rejection.status_code,
+                headers={"Retry-After": str(rejection.retry_after)},
+            )
+        
+        try:
+            return await call_next(request)
+        finally:
+            admission_control.release(name)
@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+
+from loguru import logger
+
+from .data_fetchers.coingecko import CoinGeckoFetcher
+from .data_fetchers.gaps import hbar_gaps
+from .database.connection import db_manager
+from .database.migrations import LATEST_VERSION, get_schema_version
+
+
+async def run_backfill(args: argparse.Namespace) -> None:
+    """Backfill HBAR history from CoinGecko."""
+    async with CoinGeckoFetcher() as fetcher:
+        inserted = await fetcher.backfill_hbar_history(
+            days=args.days,
+            chunk_days=args.chunk_days,
+            max_concurrency=args.concurrency,
+        )
+    logger.info(f"Backfill finished: {inserted} rows inserted")
+
+
+async def run_gaps(args: argparse.Namespace) -> None:
+    """Scan HBAR history for gaps and refill the open ones from CoinGecko."""
+    found = hbar_gaps.scan(full=args.full)
+    logger.info(f"Gap scan finished: {found} new gaps")
+    if args.scan_only:
+        return
+    async with CoinGeckoFetcher() as fetcher:
+        inserted = await hbar_gaps.repair(fetcher, max_gaps=args.max_gaps)
+    logger.info(f"Gap repair finished: {inserted} rows inserted")
+
+
+async def run_migrate(args: argparse.Namespace) -> None:
+    """Apply pending schema migrations and report the schema version."""
+    # Connecting applies any pending migrations
+    version = get_schema_version(db_manager.connect())
+    logger.info(f"Schema at version {version} (latest {LATEST_VERSION})")
+
+
+def main() -> None:
+    """ChainMetrics maintenance commands."""
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="ChainMetrics maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backfill = subparsers.add_parser("backfill", help="Backfill HBAR history from CoinGecko market_chart ranges")
+    backfill.add_argument("--days", type=int, default=365, help="Days of history to backfill")
+    backfill.add_argument("--chunk-days", type=int, default=None, help="Days per market_chart/range request")
+    backfill.add_argument("--concurrency", type=int, default=None, help="Maximum windows fetched concurrently")
+    backfill.set_defaults(handler=run_backfill)
+
+    gaps = subparsers.add_parser("gaps", help="Find gaps in HBAR history and refill them from CoinGecko")
+    gaps.add_argument("--full", action="store_true", help="Rescan the whole history, not just rows since the last scan")
+    gaps.add_argument("--scan-only", action="store_true", help="Record gaps without fetching")
+    gaps.add_argument("--max-gaps", type=int, default=None, help="Maximum open gaps to repair")
+    gaps.set_defaults(handler=run_gaps)
+
+    migrate = subparsers.add_parser("migrate", help="Apply pending database schema migrations")
+    migrate.set_defaults(handler=run_migrate)
+
+    args = parser.parse_args()
+    try:
+        asyncio.run(args.handler(args))
+    finally:
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,8 @@ class APIConfig(BaseModel):
     host: str = os.getenv("API_HOST", "0.0.0.0")
     port: int = int(os.getenv("API_PORT", "8000"))
     cors_origins: List[str] = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+    # Serve requests right away and run the initial data fetch in the background
+    fast_start: bool = os.getenv("FAST_START", "true").lower() == "true"
 
 
 class DatabaseConfig(BaseModel):
@@ -24,12 +26,66 @@ class CoinGeckoConfig(BaseModel):
     """CoinGecko API configuration."""
     api_key: str = os.getenv("COINGECKO_API_KEY", "")
     requests_per_minute: int = int(os.getenv("COINGECKO_REQUESTS_PER_MINUTE", "25"))
-    base_url: str = "https://api.coingecko.com/api/v3"
+    base_url: str = os.getenv("COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3")
+    # market_chart/range returns hourly points for windows of 1-90 days
+    backfill_chunk_days: int = int(os.getenv("COINGECKO_BACKFILL_CHUNK_DAYS", "90"))
+    backfill_concurrency: int = int(os.getenv("COINGECKO_BACKFILL_CONCURRENCY", "3"))
+    # Hedera token to coin ID map from coins/list, refetched after this many seconds
+    coin_list_ttl: int = int(os.getenv("COINGECKO_COIN_LIST_TTL", "86400"))
+    
+    # Gap scanning and repair of hbar_metrics
+    gap_scan_interval: int = int(os.getenv("HBAR_GAP_SCAN_INTERVAL", "3600"))
+    gap_repair_max_gaps: int = int(os.getenv("HBAR_GAP_REPAIR_MAX_GAPS", "50"))
+    gap_repair_window_days: int = int(os.getenv("HBAR_GAP_REPAIR_WINDOW_DAYS", "30"))
+    gap_repair_max_attempts: int = int(os.getenv("HBAR_GAP_REPAIR_MAX_ATTEMPTS", "3"))
 
 
 class HederaConfig(BaseModel):
     """Hedera network configuration."""
     mirror_node_url: str = os.getenv("HEDERA_MIRROR_NODE_URL", "https://mainnet-public.mirrornode.hedera.com")
+    
+    # Token discovery and tiered refresh
+    discovery_interval: int = int(os.getenv("TOKEN_DISCOVERY_INTERVAL", "3600"))
+    discovery_max_pages: int = int(os.getenv("TOKEN_DISCOVERY_MAX_PAGES", "10"))
+    discovery_start_id: str = os.getenv("TOKEN_DISCOVERY_START_ID", "")  # Empty: only tokens created from now on
+    hot_set_size: int = int(os.getenv("TOKEN_HOT_SET_SIZE", "25"))
+    cold_batch_size: int = int(os.getenv("TOKEN_COLD_BATCH_SIZE", "20"))
+    cold_refresh_interval: int = int(os.getenv("TOKEN_COLD_REFRESH_SECONDS", "86400"))
+
+
+class CircuitBreakerConfig(BaseModel):
+    """Upstream circuit breaker configuration."""
+    failure_threshold: int = int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5"))
+    reset_timeout: float = float(os.getenv("UPSTREAM_BREAKER_RESET_SECONDS", "60"))
+
+
+class HealthConfig(BaseModel):
+    """Liveness/readiness probe configuration."""
+    refresh_interval: float = float(os.getenv("HEALTH_REFRESH_INTERVAL", "10"))
+    db_timeout: float = float(os.getenv("HEALTH_DB_TIMEOUT", "5"))
+
+
+class CacheConfig(BaseModel):
+    """API result cache configuration."""
+    max_entries: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024"))
+    max_mb: int = int(os.getenv("RESULT_CACHE_MAX_MB", "64"))
+    ttl: float = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "60"))
+
+
+class AdmissionConfig(BaseModel):
+    """Inbound admission control and load shedding configuration."""
+    enabled: bool = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+    max_concurrency: int = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "16"))
+    standard_concurrency: int = int(os.getenv("ADMISSION_STANDARD_CONCURRENCY", "8"))
+    bulk_concurrency: int = int(os.getenv("ADMISSION_BULK_CONCURRENCY", "2"))
+    max_queue: int = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))  # Waiting requests per class
+    queue_timeout: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2"))
+    retry_after: int = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+    # Per-client token buckets; a rate of 0 disables them
+    client_rate: float = float(os.getenv("ADMISSION_CLIENT_RATE", "20"))
+    client_burst: float = float(os.getenv("ADMISSION_CLIENT_BURST", "60"))
+    bulk_cost: float = float(os.getenv("ADMISSION_BULK_COST", "5"))
+    max_clients: int = int(os.getenv("ADMISSION_MAX_CLIENTS", "10000"))
 
 
 class UpdateConfig(BaseModel):
@@ -37,6 +93,20 @@ class UpdateConfig(BaseModel):
     hbar_interval: int = int(os.getenv("HBAR_UPDATE_INTERVAL", "300"))  # 5 minutes
     network_interval: int = int(os.getenv("NETWORK_UPDATE_INTERVAL", "60"))  # 1 minute
     tokens_interval: int = int(os.getenv("TOKENS_UPDATE_INTERVAL", "600"))  # 10 minutes
+    market_interval: int = int(os.getenv("MARKET_UPDATE_INTERVAL", "900"))  # 15 minutes
+    # Adaptive scheduling: back off on unchanged payloads, speed up on price moves
+    adaptive: bool = os.getenv("SCHEDULER_ADAPTIVE", "true").lower() == "true"
+    max_backoff: int = int(os.getenv("SCHEDULER_MAX_BACKOFF", "4"))  # x base interval
+    min_interval_factor: float = float(os.getenv("SCHEDULER_MIN_INTERVAL_FACTOR", "0.5"))
+    volatility_threshold_pct: float = float(os.getenv("SCHEDULER_VOLATILITY_THRESHOLD_PCT", "1.0"))
+    jitter_fraction: float = float(os.getenv("SCHEDULER_JITTER_FRACTION", "0.1"))
+    stagger_seconds: int = int(os.getenv("SCHEDULER_STAGGER_SECONDS", "20"))
+    # Low-priority jobs skip runs while fewer CoinGecko requests than this remain
+    low_budget_threshold: int = int(os.getenv("SCHEDULER_LOW_BUDGET_THRESHOLD", "5"))
+    # Extend the last stored row instead of inserting when a fetch repeats it
+    dedup: bool = os.getenv("INGEST_DEDUP", "true").lower() == "true"
+    # Days of HBAR runs kept in memory to answer recent history reads
+    recent_buffer_days: int = int(os.getenv("HBAR_RECENT_BUFFER_DAYS", "7"))
 
 
 class LoggingConfig(BaseModel):
@@ -51,6 +121,10 @@ class Settings(BaseModel):
     database: DatabaseConfig = DatabaseConfig()
     coingecko: CoinGeckoConfig = CoinGeckoConfig()
     hedera: HederaConfig = HederaConfig()
+    breaker: CircuitBreakerConfig = CircuitBreakerConfig()
+    health: HealthConfig = HealthConfig()
+    cache: CacheConfig = CacheConfig()
+    admission: AdmissionConfig = AdmissionConfig()
     updates: UpdateConfig = UpdateConfig()
     logging: LoggingConfig = LoggingConfig()
 
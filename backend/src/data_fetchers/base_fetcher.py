@@ -1,11 +1,186 @@
 import asyncio
+import time
 from abc import ABC, abstractmethod
+from collections import Counter, deque
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
 
-import httpx
+import orjson
 from loguru import logger
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from ..config import settings
+
+# httpx is imported on first request to keep startup fast
+if TYPE_CHECKING:
+    import httpx
+
+
+# Upstream request counter for the current task and the tasks it spawns
+_upstream_calls: ContextVar[Optional[Counter]] = ContextVar("upstream_calls", default=None)
+
+# Longest part of an upstream error body written to the log
+MAX_LOGGED_BODY = 500
+
+# Progress of the current task's fetch, for job status reporting
+_progress: ContextVar[Optional[Dict[str, Any]]] = ContextVar("progress", default=None)
+
+
+@contextmanager
+def count_upstream_calls() -> Iterator[Counter]:
+    """Count upstream requests made within the block, per upstream base URL.
+    
+    Tasks created inside the block share the same counter.
+    """
+    counter: Counter = Counter()
+    token = _upstream_calls.set(counter)
+    try:
+        yield counter
+    finally:
+        _upstream_calls.reset(token)
+
+
+@contextmanager
+def track_progress() -> Iterator[Dict[str, Any]]:
+    """Collect progress reported with ``report_progress`` within the block."""
+    progress: Dict[str, Any] = {"done": 0, "total": None}
+    token = _progress.set(progress)
+    try:
+        yield progress
+    finally:
+        _progress.reset(token)
+
+
+def report_progress(done: int, total: Optional[int] = None) -> None:
+    """Report how many items of a fetch are done, if progress is being tracked."""
+    progress = _progress.get()
+    if progress is not None:
+        progress["done"] = done
+        if total is not None:
+            progress["total"] = total
+
+
+def decode_json(content: bytes) -> Any:
+    """Decode a JSON body straight from the response bytes.
+    
+    Skips the intermediate text copy ``response.json()`` makes; orjson is
+    also several times faster than the stdlib decoder on large documents.
+    """
+    return orjson.loads(content)
+
+
+def error_body(response: "httpx.Response") -> str:
+    """Start of an error response body, for logging."""
+    body = response.content[:MAX_LOGGED_BODY].decode("utf-8", errors="replace")
+    return body + "..." if len(response.content) > MAX_LOGGED_BODY else body
+
+
+@dataclass(frozen=True, slots=True)
+class Page:
+    """One page of a paginated listing."""
+    data: Dict[str, Any]
+    items: List[Any]
+    next: Optional[str]  # Link to the following page; pass it back to iter_pages to resume
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker shared by every fetcher for one upstream.
+    
+    After ``failure_threshold`` failed requests in a row the circuit opens and
+    requests fail fast for ``reset_timeout`` seconds. Then one trial request is
+    let through (half-open): success closes the circuit, failure reopens it,
+    and a cancelled trial frees the slot for the next request.
+    """
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_failure: Optional[datetime] = None
+        self._trial_in_flight = False
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+    
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now; claims the trial slot when half-open."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.last_failure = datetime.utcnow()
+        # A failed trial reopens the circuit; stragglers from before it opened don't extend it
+        if self._trial_in_flight or (self.opened_at is None and self.failures >= self.failure_threshold):
+            logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+    
+    def release_trial(self) -> None:
+        """Give back the trial slot of a request that ended without an outcome, e.g. cancelled."""
+        self._trial_in_flight = False
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "last_failure": self.last_failure,
+        }
+
+
+# Circuit breakers keyed by upstream base URL, shared across fetcher instances
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(key: str) -> CircuitBreaker:
+    """Get the shared circuit breaker for an upstream."""
+    if key not in _circuit_breakers:
+        _circuit_breakers[key] = CircuitBreaker(
+            settings.breaker.failure_threshold, settings.breaker.reset_timeout
+        )
+    return _circuit_breakers[key]
+
+
+def get_circuit_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Status of every upstream circuit breaker created so far."""
+    return {key: breaker.status() for key, breaker in _circuit_breakers.items()}
 
 
 class BaseFetcher(ABC):
@@ -15,7 +190,8 @@ class BaseFetcher(ABC):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.timeout = timeout
-        self._session: Optional[httpx.AsyncClient] = None
+        self.circuit_breaker = get_circuit_breaker(self.base_url)
+        self._session: Optional["httpx.AsyncClient"] = None
     
     async def __aenter__(self):
         await self._create_session()
@@ -26,6 +202,8 @@ class BaseFetcher(ABC):
     
     async def _create_session(self) -> None:
         """Create HTTP session with proper headers."""
+        import httpx
+        
         headers = {
             "User-Agent": "ChainMetrics/1.0 (Hedera Dashboard)",
             "Accept": "application/json",
@@ -51,30 +229,67 @@ class BaseFetcher(ABC):
         """Get authentication headers for API requests."""
         pass
     
-    @retry(
-        retry=retry_if_exception_type((httpx.RequestError, httpx.HTTPStatusError)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True,
-    )
     async def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Make HTTP request with retry logic."""
+        """Make HTTP request with retry logic, failing fast while the upstream's circuit is open."""
+        import httpx
+        
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {self.base_url}")
+        
+        retrying = AsyncRetrying(
+            retry=retry_if_exception_type((httpx.RequestError, httpx.HTTPStatusError)),
+            stop=stop_after_attempt(3),
+            wait=wait_exponential(multiplier=1, min=4, max=10),
+            reraise=True,
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    data = await self._request_once(endpoint, params)
+        except Exception as e:
+            # Client errors such as 404 mean the upstream itself is answering
+            client_error = (
+                isinstance(e, httpx.HTTPStatusError)
+                and e.response.status_code < 500
+                and e.response.status_code != 429
+            )
+            if client_error:
+                self.circuit_breaker.record_success()
+            else:
+                self.circuit_breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled: says nothing about the upstream, but must not hold the trial slot
+            self.circuit_breaker.release_trial()
+            raise
+        
+        self.circuit_breaker.record_success()
+        return data
+    
+    async def _request_once(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make a single HTTP request."""
+        import httpx
+        
         if not self._session:
             await self._create_session()
         
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         
+        counter = _upstream_calls.get()
+        if counter is not None:
+            counter[self.base_url] += 1
+        
         try:
             logger.debug(f"Making request to: {url}")
             response = await self._session.get(url, params=params)
             response.raise_for_status()
             
-            data = response.json()
+            data = decode_json(response.content)
             logger.debug(f"Request successful: {url}")
             return data
             
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code} for {url}: {e.response.text}")
+            logger.error(f"HTTP error {e.response.status_code} for {url}: {error_body(e.response)}")
             raise
         except httpx.RequestError as e:
             logger.error(f"Request error for {url}: {e}")
@@ -83,6 +298,48 @@ class BaseFetcher(ABC):
             logger.error(f"Unexpected error for {url}: {e}")
             raise
     
+    async def iter_pages(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                         items_key: Optional[str] = None, max_pages: Optional[int] = None,
+                         prefetch: bool = True) -> AsyncIterator[Page]:
+        """Walk a listing that paginates through ``links.next``.
+        
+        While the caller processes page k, page k+1 is already being fetched.
+        Requests go through ``_make_request``, so rate limits, retries and the
+        circuit breaker apply to every page. Leaving the loop early cancels the
+        prefetched request. To resume a walk later, keep the last page's
+        ``next`` link and pass it as ``endpoint`` without ``params``.
+        """
+        pages = 0
+        pending: Optional[asyncio.Future] = asyncio.ensure_future(self._make_request(endpoint, params))
+        try:
+            while pending is not None:
+                data = await pending
+                pages += 1
+                next_link = (data.get("links") or {}).get("next")
+                more = bool(next_link) and (max_pages is None or pages < max_pages)
+                pending = asyncio.ensure_future(self._make_request(next_link)) if more and prefetch else None
+                
+                yield Page(data, (data.get(items_key) or []) if items_key else [], next_link)
+                
+                if more and not prefetch:
+                    pending = asyncio.ensure_future(self._make_request(next_link))
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+                with suppress(asyncio.CancelledError, Exception):
+                    await pending
+    
+    async def iter_items(self, endpoint: str, items_key: str, params: Optional[Dict[str, Any]] = None,
+                         max_pages: Optional[int] = None) -> AsyncIterator[Any]:
+        """Items under ``items_key`` across all pages of a listing, see ``iter_pages``."""
+        pages = self.iter_pages(endpoint, params, items_key, max_pages)
+        try:
+            async for page in pages:
+                for item in page.items:
+                    yield item
+        finally:
+            await pages.aclose()
+    
     @abstractmethod
     async def fetch_data(self) -> Dict[str, Any]:
         """Fetch data from the API. Must be implemented by subclasses."""
@@ -132,30 +389,84 @@ class BaseFetcher(ABC):
             return default
 
 
+class RateLimiter:
+    """Sliding-window request budget shared by every fetcher for one upstream.
+    
+    Acquisition is serialized with a lock so concurrent requests cannot all
+    slip through the check at once.
+    """
+    
+    def __init__(self, window: float = 60.0):
+        self.window = window
+        self._request_times: Deque[float] = deque()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _get_lock(self) -> asyncio.Lock:
+        """Get the acquisition lock, recreating it if the event loop changed."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+    
+    def _prune(self, now: float) -> None:
+        """Drop request timestamps that fell out of the window."""
+        while self._request_times and now - self._request_times[0] >= self.window:
+            self._request_times.popleft()
+    
+    def remaining(self, requests_per_minute: int) -> int:
+        """Number of requests still available in the current window."""
+        self._prune(time.monotonic())
+        return max(requests_per_minute - len(self._request_times), 0)
+    
+    async def acquire(self, requests_per_minute: int) -> None:
+        """Wait until a request fits into the budget, then record it."""
+        async with self._get_lock():
+            now = time.monotonic()
+            self._prune(now)
+            
+            while len(self._request_times) >= requests_per_minute:
+                wait_time = self.window - (now - self._request_times[0])
+                logger.info(f"Rate limit reached, waiting {wait_time:.1f} seconds")
+                await asyncio.sleep(wait_time)
+                now = time.monotonic()
+                self._prune(now)
+            
+            self._request_times.append(now)
+
+
+# Rate limiters keyed by upstream base URL, shared across fetcher instances
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(key: str) -> RateLimiter:
+    """Get the shared rate limiter for an upstream."""
+    if key not in _rate_limiters:
+        _rate_limiters[key] = RateLimiter()
+    return _rate_limiters[key]
+
+
 class RateLimitedFetcher(BaseFetcher):
-    """Base fetcher with rate limiting support."""
+    """Base fetcher with rate limiting support.
+    
+    All instances pointing at the same base URL draw from one shared budget,
+    so per-request fetchers and concurrent tasks cannot overrun the upstream.
+    """
     
     def __init__(self, base_url: str, api_key: Optional[str] = None, 
                  timeout: int = 30, requests_per_minute: int = 60):
         super().__init__(base_url, api_key, timeout)
         self.requests_per_minute = requests_per_minute
-        self._request_times: list[float] = []
+        self.rate_limiter = get_rate_limiter(self.base_url)
     
     async def _wait_for_rate_limit(self) -> None:
         """Wait if necessary to respect rate limits."""
-        now = asyncio.get_event_loop().time()
-        
-        # Remove requests older than 1 minute
-        self._request_times = [t for t in self._request_times if now - t < 60]
-        
-        # If we're at the limit, wait
-        if len(self._request_times) >= self.requests_per_minute:
-            wait_time = 60 - (now - self._request_times[0])
-            if wait_time > 0:
-                logger.info(f"Rate limit reached, waiting {wait_time:.1f} seconds")
-                await asyncio.sleep(wait_time)
-        
-        self._request_times.append(now)
+        await self.rate_limiter.acquire(self.requests_per_minute)
+    
+    def remaining_budget(self) -> int:
+        """Requests left in the shared budget for the current minute."""
+        return self.rate_limiter.remaining(self.requests_per_minute)
     
     async def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make rate-limited HTTP request."""
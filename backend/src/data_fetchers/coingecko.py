@@ -1,23 +1,55 @@
+import asyncio
 import os
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from bisect import bisect_left
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, List, Optional, Tuple
 
 from loguru import logger
 
+from ..config import settings
 from ..database.connection import db_manager
 from ..database.models import HBARMetrics
 from .base_fetcher import RateLimitedFetcher
+from .recent import hbar_recent
+from .runs import Run, RunTracker
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+def _load_hbar_run(keys) -> Dict[str, Run]:
+    """Load the latest stored HBAR run."""
+    row = db_manager.fetchone(
+        """
+        SELECT timestamp, valid_to, price_usd, market_cap, volume_24h, price_change_24h,
+               circulating_supply, market_cap_rank
+        FROM hbar_metrics
+        ORDER BY timestamp DESC
+        LIMIT 1
+        """
+    )
+    return {"hbar": Run(row[0], row[1], tuple(row[2:]))} if row else {}
+
+
+# Last stored HBAR run; a fetch can be skipped for up to one backed-off interval
+hbar_runs = RunTracker(
+    _load_hbar_run,
+    lambda: timedelta(seconds=settings.updates.hbar_interval * (settings.updates.max_backoff + 1)),
+)
 
 
 class CoinGeckoFetcher(RateLimitedFetcher):
     """Fetches HBAR data from CoinGecko API."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    # Maximum coins per coins/markets request (CoinGecko's per_page limit)
+    MARKETS_BATCH_SIZE = 250
+    
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         api_key = api_key or os.getenv("COINGECKO_API_KEY")
-        base_url = "https://api.coingecko.com/api/v3"
+        base_url = base_url or settings.coingecko.base_url
         
         # CoinGecko free tier: 30 requests/minute
-        super().__init__(base_url, api_key, requests_per_minute=25)
+        super().__init__(base_url, api_key, requests_per_minute=settings.coingecko.requests_per_minute)
         
         self.hbar_id = "hedera-hashgraph"
     
@@ -58,6 +90,63 @@ class CoinGeckoFetcher(RateLimitedFetcher):
             logger.error(f"Failed to fetch HBAR data from CoinGecko: {e}")
             return None
     
+    async def fetch_platform_coin_ids(self, platform: str) -> Dict[str, str]:
+        """Map contract addresses on ``platform`` to coin IDs via ``coins/list``.
+        
+        One request covers every listed coin. Raises if the request fails.
+        """
+        coins = await self._make_request("coins/list", params={"include_platform": "true"})
+        return {
+            address.strip(): coin["id"]
+            for coin in coins
+            if (address := (coin.get("platforms") or {}).get(platform))
+        }
+    
+    async def fetch_market_data(self, coin_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch USD market data for many coins via batched ``coins/markets`` calls.
+        
+        Up to ``MARKETS_BATCH_SIZE`` coins are priced per request, so N coins
+        cost ceil(N / MARKETS_BATCH_SIZE) requests. Batches run concurrently
+        under the shared rate limiter; a failed batch is logged and skipped.
+        Returns market data keyed by CoinGecko coin ID.
+        """
+        unique_ids = sorted(set(coin_ids))
+        batches = [
+            unique_ids[i:i + self.MARKETS_BATCH_SIZE]
+            for i in range(0, len(unique_ids), self.MARKETS_BATCH_SIZE)
+        ]
+        
+        async def fetch_batch(batch: List[str]) -> List[Dict[str, Any]]:
+            try:
+                return await self._make_request(
+                    "coins/markets",
+                    params={
+                        "vs_currency": "usd",
+                        "ids": ",".join(batch),
+                        "per_page": self.MARKETS_BATCH_SIZE,
+                        "page": 1,
+                        "sparkline": "false",
+                    }
+                )
+            except Exception as e:
+                logger.error(f"Failed to fetch market data for {len(batch)} coins: {e}")
+                return []
+        
+        results = await asyncio.gather(*(fetch_batch(batch) for batch in batches))
+        
+        market_data = {}
+        for batch_result in results:
+            for coin in batch_result or []:
+                market_data[coin["id"]] = {
+                    "price_usd": coin.get("current_price"),
+                    "market_cap": coin.get("market_cap"),
+                    "volume_24h": coin.get("total_volume"),
+                    "price_change_24h": coin.get("price_change_percentage_24h"),
+                }
+        
+        logger.debug(f"Fetched market data for {len(market_data)} of {len(unique_ids)} coins in {len(batches)} requests")
+        return market_data
+    
     async def fetch_global_crypto_data(self) -> Optional[Dict[str, Any]]:
         """Fetch global cryptocurrency market data."""
         try:
@@ -76,39 +165,73 @@ class CoinGeckoFetcher(RateLimitedFetcher):
             logger.error(f"Failed to fetch trending coins: {e}")
             return None
     
+    async def _gather_parts(self, parts: Dict[str, Awaitable[Any]]) -> Dict[str, Any]:
+        """Await independent upstream calls concurrently; a failed call's part is ``None``."""
+        results = await asyncio.gather(*parts.values(), return_exceptions=True)
+        data = {
+            name: None if isinstance(result, Exception) else result
+            for name, result in zip(parts, results, strict=True)
+        }
+        data["timestamp"] = self._get_current_timestamp()
+        return data
+    
     async def fetch_data(self) -> Dict[str, Any]:
-        """Fetch comprehensive HBAR and market data."""
-        hbar_data = await self.fetch_hbar_data()
-        global_data = await self.fetch_global_crypto_data()
-        trending_data = await self.fetch_trending_coins()
+        """Fetch comprehensive HBAR and market data.
         
-        return {
-            "hbar": hbar_data,
-            "global": global_data,
-            "trending": trending_data,
-            "timestamp": self._get_current_timestamp(),
-        }
+        The three upstream calls are independent, so they run concurrently
+        under the shared rate limiter. Each part is ``None`` if its call
+        failed; the others are still returned.
+        """
+        return await self._gather_parts({
+            "hbar": self.fetch_hbar_data(),
+            "global": self.fetch_global_crypto_data(),
+            "trending": self.fetch_trending_coins(),
+        })
+    
+    async def fetch_market_snapshots(self) -> Dict[str, Any]:
+        """Fetch the global market and trending snapshots, as ``fetch_data`` does without HBAR."""
+        return await self._gather_parts({
+            "global": self.fetch_global_crypto_data(),
+            "trending": self.fetch_trending_coins(),
+        })
     
     async def save_hbar_data(self, hbar_data: HBARMetrics) -> bool:
-        """Save HBAR data to database."""
+        """Save HBAR data to database.
+        
+        A snapshot identical to the last stored one extends that row's
+        validity interval instead of adding a row.
+        """
         try:
-            query = """
-                INSERT OR REPLACE INTO hbar_metrics 
-                (timestamp, price_usd, market_cap, volume_24h, price_change_24h, 
-                 circulating_supply, market_cap_rank)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            
-            db_manager.execute(query, (
-                hbar_data.timestamp,
+            values = (
                 hbar_data.price_usd,
                 hbar_data.market_cap,
                 hbar_data.volume_24h,
                 hbar_data.price_change_24h,
                 hbar_data.circulating_supply,
                 hbar_data.market_cap_rank,
-            ))
+            )
+            
+            run = hbar_runs.extendable("hbar", values, hbar_data.timestamp)
+            if run is not None:
+                db_manager.execute(
+                    "UPDATE hbar_metrics SET valid_to = ?, samples = samples + 1 WHERE timestamp = ?",
+                    (hbar_data.timestamp, run.started_at),
+                )
+            else:
+                query = """
+                    INSERT OR REPLACE INTO hbar_metrics 
+                    (timestamp, price_usd, market_cap, volume_24h, price_change_24h, 
+                     circulating_supply, market_cap_rank, valid_to, samples)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
+                """
+                db_manager.execute(query, (hbar_data.timestamp, *values, hbar_data.timestamp))
             
+            hbar_runs.record("hbar", values, hbar_data.timestamp, run)
+            version = db_manager.bump_version("hbar_metrics")
+            hbar_recent.record(
+                run.started_at if run is not None else hbar_data.timestamp, hbar_data.timestamp,
+                hbar_data.price_usd, hbar_data.volume_24h, version,
+            )
             logger.info("HBAR data saved to database")
             return True
             
@@ -116,18 +239,119 @@ class CoinGeckoFetcher(RateLimitedFetcher):
             logger.error(f"Failed to save HBAR data: {e}")
             return False
     
-    async def get_latest_hbar_data(self) -> Optional[Dict[str, Any]]:
-        """Get the latest HBAR data from database."""
+    async def save_global_data(self, global_data: Dict[str, Any], timestamp: Optional[datetime] = None) -> bool:
+        """Save a global crypto market snapshot to database."""
+        try:
+            query = """
+                INSERT OR REPLACE INTO market_global
+                (timestamp, total_market_cap_usd, total_volume_usd, market_cap_change_24h,
+                 btc_dominance, eth_dominance, active_cryptocurrencies, markets)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """
+            
+            db_manager.execute(query, (
+                timestamp or self._get_current_timestamp(),
+                self._safe_float(self._safe_get(global_data, "total_market_cap.usd")),
+                self._safe_float(self._safe_get(global_data, "total_volume.usd")),
+                self._safe_float(global_data.get("market_cap_change_percentage_24h_usd")),
+                self._safe_float(self._safe_get(global_data, "market_cap_percentage.btc")),
+                self._safe_float(self._safe_get(global_data, "market_cap_percentage.eth")),
+                self._safe_int(global_data.get("active_cryptocurrencies")),
+                self._safe_int(global_data.get("markets")),
+            ))
+            
+            db_manager.bump_version("market_global")
+            logger.info("Global market data saved to database")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to save global market data: {e}")
+            return False
+    
+    async def save_trending_data(self, trending_data: List[Dict[str, Any]], timestamp: Optional[datetime] = None) -> bool:
+        """Save a trending coins snapshot to database."""
+        if not trending_data:
+            logger.warning("No trending data to save")
+            return False
+        
         try:
+            timestamp = timestamp or self._get_current_timestamp()
+            values = []
+            for rank, entry in enumerate(trending_data, start=1):
+                item = entry.get("item", entry)
+                values.append((
+                    timestamp,
+                    rank,
+                    item.get("id"),
+                    item.get("name"),
+                    item.get("symbol"),
+                    item.get("market_cap_rank"),
+                    item.get("price_btc"),
+                    item.get("thumb"),
+                ))
+            
             query = """
-                SELECT timestamp, price_usd, market_cap, volume_24h, price_change_24h,
-                       circulating_supply, market_cap_rank
-                FROM hbar_metrics
-                ORDER BY timestamp DESC
-                LIMIT 1
+                INSERT INTO market_trending
+                (timestamp, rank, coin_id, name, symbol, market_cap_rank, price_btc, thumb)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """
+            db_manager.execute_many(query, values)
+            
+            db_manager.bump_version("market_trending")
+            logger.info(f"Trending data saved: {len(values)} coins")
+            return True
             
-            result = db_manager.fetchone(query)
+        except Exception as e:
+            logger.error(f"Failed to save trending data: {e}")
+            return False
+    
+    async def get_latest_global_data(self) -> Optional[Dict[str, Any]]:
+        """Get the latest global crypto market snapshot from database."""
+        try:
+            result = db_manager.query_one("market_global_latest")
+            if result:
+                return {
+                    "timestamp": result[0],
+                    "total_market_cap_usd": result[1],
+                    "total_volume_usd": result[2],
+                    "market_cap_change_24h": result[3],
+                    "btc_dominance": result[4],
+                    "eth_dominance": result[5],
+                    "active_cryptocurrencies": result[6],
+                    "markets": result[7],
+                }
+            return None
+            
+        except Exception as e:
+            logger.error(f"Failed to get latest global market data: {e}")
+            return None
+    
+    async def get_latest_trending(self) -> List[Dict[str, Any]]:
+        """Get the latest trending coins snapshot from database."""
+        try:
+            results = db_manager.query_all("market_trending_latest")
+            return [
+                {
+                    "timestamp": row[0],
+                    "rank": row[1],
+                    "coin_id": row[2],
+                    "name": row[3],
+                    "symbol": row[4],
+                    "market_cap_rank": row[5],
+                    "price_btc": row[6],
+                    "thumb": row[7],
+                }
+                for row in results
+            ]
+            
+        except Exception as e:
+            logger.error(f"Failed to get trending coins: {e}")
+            return []
+    
+    async def get_latest_hbar_data(self) -> Optional[Dict[str, Any]]:
+        """Get the latest HBAR data from database."""
+        try:
+            result = db_manager.query_one("hbar_latest")
             if result:
                 return {
                     "timestamp": result[0],
@@ -145,16 +369,14 @@ class CoinGeckoFetcher(RateLimitedFetcher):
             return None
     
     async def get_hbar_price_history(self, days: int = 7) -> List[Dict[str, Any]]:
-        """Get HBAR price history from database."""
+        """Get HBAR price history, from the recent history buffer when it covers the window."""
         try:
-            query = """
-                SELECT timestamp, price_usd, volume_24h
-                FROM hbar_metrics
-                WHERE timestamp >= (current_timestamp - interval '{} days')
-                ORDER BY timestamp ASC
-            """.format(days)
+            since = datetime.utcnow() - timedelta(days=days)
+            history = hbar_recent.history(since)
+            if history is not None:
+                return history
             
-            results = db_manager.fetchall(query)
+            results = db_manager.query_all("hbar_price_history", since=since)
             return [
                 {
                     "timestamp": row[0],
@@ -166,4 +388,188 @@ class CoinGeckoFetcher(RateLimitedFetcher):
             
         except Exception as e:
             logger.error(f"Failed to get HBAR price history: {e}")
-            return []
\ No newline at end of file
+            return []
+    
+    async def fetch_hbar_market_chart_range(self, start: datetime, end: datetime) -> Dict[str, Any]:
+        """Fetch raw HBAR price, market cap and volume series between two UTC datetimes."""
+        return await self._make_request(
+            f"coins/{self.hbar_id}/market_chart/range",
+            params={
+                "vs_currency": "usd",
+                "from": int(start.replace(tzinfo=UTC).timestamp()),
+                "to": int(end.replace(tzinfo=UTC).timestamp()),
+            }
+        )
+    
+    def _market_chart_to_arrow(self, data: Dict[str, Any], start: datetime) -> "pa.Table":
+        """Convert a market_chart payload into an Arrow table of hbar_metrics columns.
+        
+        Points before ``start`` are only used as the 24h reference for
+        ``price_change_24h`` and are not part of the result.
+        """
+        import pyarrow as pa
+        
+        prices = [(int(ts), price) for ts, price in data.get("prices") or [] if price]
+        market_caps = {int(ts): value for ts, value in data.get("market_caps") or []}
+        volumes = {int(ts): value for ts, value in data.get("total_volumes") or []}
+        
+        start_ms = int(start.replace(tzinfo=UTC).timestamp() * 1000)
+        day_ms = 24 * 60 * 60 * 1000
+        times = [ts for ts, _ in prices]
+        
+        columns: Dict[str, list] = {
+            "timestamp": [],
+            "price_usd": [],
+            "market_cap": [],
+            "volume_24h": [],
+            "price_change_24h": [],
+            "circulating_supply": [],
+        }
+        for i, (ts, price) in enumerate(prices):
+            if ts < start_ms:
+                continue
+            
+            price = self._safe_float(price)
+            reference = bisect_left(times, ts - day_ms)
+            reference_price = self._safe_float(prices[reference][1])
+            market_cap = self._safe_float(market_caps.get(ts))
+            
+            columns["timestamp"].append(ts)
+            columns["price_usd"].append(price)
+            columns["market_cap"].append(market_cap)
+            columns["volume_24h"].append(self._safe_float(volumes.get(ts)))
+            columns["price_change_24h"].append(
+                (price - reference_price) / reference_price * 100
+                if reference < i and reference_price else 0.0
+            )
+            columns["circulating_supply"].append(market_cap / price if price else 0.0)
+        
+        return pa.table({
+            "timestamp": pa.array(columns["timestamp"], type=pa.timestamp("ms")),
+            "price_usd": pa.array(columns["price_usd"], type=pa.float64()),
+            "market_cap": pa.array(columns["market_cap"], type=pa.float64()),
+            "volume_24h": pa.array(columns["volume_24h"], type=pa.float64()),
+            "price_change_24h": pa.array(columns["price_change_24h"], type=pa.float64()),
+            "circulating_supply": pa.array(columns["circulating_supply"], type=pa.float64()),
+        })
+    
+    def _backfill_windows(self, start: datetime, end: datetime, chunk_days: int) -> List[Tuple[datetime, datetime]]:
+        """Split ``[start, end]`` into windows aligned to multiples of ``chunk_days``.
+        
+        Alignment keeps window boundaries stable between runs, so windows
+        completed by an earlier run can be recognised and skipped.
+        """
+        chunk = timedelta(days=chunk_days)
+        epoch = datetime(1970, 1, 1)
+        window_start = epoch + ((start - epoch) // chunk) * chunk
+        
+        windows = []
+        while window_start < end:
+            window_end = window_start + chunk
+            windows.append((max(window_start, start), min(window_end, end)))
+            window_start = window_end
+        return windows
+    
+    def _is_backfilled(self, start: datetime, end: datetime) -> bool:
+        """Check whether a completed backfill chunk covers the given window."""
+        query = """
+            SELECT 1 FROM hbar_backfill_chunks
+            WHERE chunk_start <= ? AND chunk_end >= ?
+            LIMIT 1
+        """
+        return db_manager.fetchone(query, (start, end)) is not None
+    
+    def _first_live_snapshot(self) -> Optional[datetime]:
+        """Earliest HBAR snapshot at or after the end of the completed backfill chunks."""
+        query = """
+            SELECT MIN(timestamp) FROM hbar_metrics
+            WHERE timestamp >= COALESCE((SELECT MAX(chunk_end) FROM hbar_backfill_chunks), '-infinity'::TIMESTAMP)
+        """
+        return db_manager.fetchone(query)[0]
+    
+    async def _backfill_window(self, start: datetime, end: datetime) -> int:
+        """Fetch, load and record a single backfill window."""
+        try:
+            # Fetch one extra day so price_change_24h is defined for the first points
+            data = await self.fetch_hbar_market_chart_range(start - timedelta(days=1), end)
+            table = self._market_chart_to_arrow(data, start)
+            
+            # Backfilled points carry the latest known rank; CoinGecko has no history for it
+            query = """
+                INSERT OR IGNORE INTO hbar_metrics
+                (timestamp, price_usd, market_cap, volume_24h, price_change_24h,
+                 circulating_supply, market_cap_rank, valid_to, samples)
+                SELECT
+                    timestamp,
+                    any_value(price_usd),
+                    any_value(market_cap),
+                    any_value(volume_24h),
+                    any_value(price_change_24h),
+                    any_value(circulating_supply),
+                    COALESCE((SELECT market_cap_rank FROM hbar_metrics ORDER BY timestamp DESC LIMIT 1), 0),
+                    timestamp,
+                    1
+                FROM hbar_backfill_chunk
+                GROUP BY timestamp
+            """
+            inserted = db_manager.execute_arrow(query, "hbar_backfill_chunk", table)
+            if inserted:
+                # Backfilled rows may be newer than the run tracked in memory
+                hbar_runs.invalidate()
+                db_manager.bump_version("hbar_metrics")
+            
+            db_manager.execute(
+                "INSERT OR IGNORE INTO hbar_backfill_chunks VALUES (?, ?, ?, ?)",
+                (start, end, inserted, self._get_current_timestamp()),
+            )
+            
+            logger.info(f"Backfilled {inserted} HBAR rows for {start:%Y-%m-%d} - {end:%Y-%m-%d}")
+            return inserted
+            
+        except Exception as e:
+            logger.error(f"Failed to backfill HBAR window {start} - {end}: {e}")
+            return 0
+    
+    async def backfill_hbar_history(
+        self,
+        days: int = 365,
+        chunk_days: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> int:
+        """Backfill ``hbar_metrics`` from CoinGecko ``market_chart/range``.
+        
+        Windows are fetched concurrently up to ``max_concurrency`` while the
+        shared rate limiter keeps the whole run within the request budget.
+        Windows already recorded in ``hbar_backfill_chunks`` are skipped, so
+        re-running after an interruption resumes where it stopped. The
+        backfill stops at the first live snapshot, so hourly points never
+        interleave with live runs; holes after it are left to gap repair.
+        Returns the number of rows inserted.
+        """
+        chunk_days = chunk_days or settings.coingecko.backfill_chunk_days
+        max_concurrency = max_concurrency or settings.coingecko.backfill_concurrency
+        
+        now = self._get_current_timestamp()
+        start = now - timedelta(days=days)
+        end = min(now, self._first_live_snapshot() or now)
+        windows = self._backfill_windows(start, end, chunk_days) if start < end else []
+        pending = [window for window in windows if not self._is_backfilled(*window)]
+        
+        logger.info(
+            f"HBAR backfill: {len(pending)} of {len(windows)} windows pending "
+            f"({days} days, {chunk_days}-day chunks, concurrency {max_concurrency})"
+        )
+        if not pending:
+            return 0
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_window(window: Tuple[datetime, datetime]) -> int:
+            async with semaphore:
+                return await self._backfill_window(*window)
+        
+        results = await asyncio.gather(*(run_window(window) for window in pending))
+        inserted = sum(results)
+        
+        logger.info(f"HBAR backfill complete: {inserted} rows inserted")
+        return inserted
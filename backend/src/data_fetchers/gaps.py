@@ -0,0 +1,262 @@
+import asyncio
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from ..config import settings
+from ..database.connection import db_manager
+from .coingecko import CoinGeckoFetcher, hbar_runs
+
+# coverage_scans row of the HBAR gap scan
+DATASET = "hbar_metrics"
+
+# market_chart/range only returns 5-minute points for ranges starting within
+# the last day; older ranges come back hourly
+RECENT_WINDOW = timedelta(days=1)
+
+Gap = Tuple[datetime, datetime]
+
+
+class HbarGapScanner:
+    """Finds holes in ``hbar_metrics`` and refills them from CoinGecko history.
+
+    A gap is a stretch between the end of one run and the start of the next
+    that is longer than one backed-off HBAR fetch interval, so adaptive
+    backoff alone never counts as missing data. Scans resume from the newest
+    row checked last time, kept in ``coverage_scans``, and found gaps are
+    recorded in ``hbar_gaps``. Gaps inside backfilled windows or inside gaps
+    already recorded are skipped; their resolution is whatever the upstream
+    history offers.
+    """
+
+    def scan(self, full: bool = False) -> int:
+        """Record gaps among rows added since the last scan. Returns the number of new gaps."""
+        since = None if full else self._scanned_through()
+        if since is None:
+            since = db_manager.fetchone("SELECT MIN(timestamp) FROM hbar_metrics")[0]
+            if since is None:
+                return 0
+
+        gaps = db_manager.query_all(
+            "hbar_gaps", since=since, threshold_seconds=int(hbar_runs.max_gap().total_seconds())
+        )
+        recorded = self._record_gaps(gaps) if gaps else 0
+
+        latest = db_manager.fetchone("SELECT MAX(timestamp) FROM hbar_metrics WHERE timestamp >= ?", (since,))[0]
+        db_manager.execute(
+            """
+            INSERT OR REPLACE INTO coverage_scans (dataset, scanned_through, gaps_found, scanned_at)
+            SELECT ?, ?, COALESCE((SELECT gaps_found FROM coverage_scans WHERE dataset = ?), 0) + ?, ?
+            """,
+            (DATASET, latest, DATASET, recorded, datetime.utcnow()),
+        )
+        if recorded:
+            db_manager.bump_version("hbar_gaps")
+        logger.info(f"HBAR gap scan from {since}: {recorded} new gaps")
+        return recorded
+
+    def _scanned_through(self) -> Optional[datetime]:
+        row = db_manager.fetchone("SELECT scanned_through FROM coverage_scans WHERE dataset = ?", (DATASET,))
+        return row[0] if row else None
+
+    def _record_gaps(self, gaps: List[Gap]) -> int:
+        # Numbered parameters, as DuckDB binds ? in nested subqueries out of order
+        return db_manager.execute(
+            """
+            INSERT OR IGNORE INTO hbar_gaps (gap_start, gap_end, detected_at)
+            SELECT n.gap_start, n.gap_end, $3
+            FROM (SELECT unnest($1::TIMESTAMP[]) AS gap_start, unnest($2::TIMESTAMP[]) AS gap_end) n
+            WHERE NOT EXISTS (
+                SELECT 1 FROM hbar_gaps g
+                WHERE g.gap_start <= n.gap_start AND g.gap_end >= n.gap_end
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM hbar_backfill_chunks c
+                WHERE c.chunk_start <= n.gap_start AND c.chunk_end >= n.gap_end
+            )
+            """,
+            ([gap[0] for gap in gaps], [gap[1] for gap in gaps], datetime.utcnow()),
+        ).fetchone()[0]
+
+    def open_gaps(self, limit: int) -> List[Gap]:
+        """Open gaps, newest first."""
+        rows = db_manager.fetchall(
+            "SELECT gap_start, gap_end FROM hbar_gaps WHERE status = 'open' ORDER BY gap_end DESC LIMIT ?",
+            (limit,),
+        )
+        return [(row[0], row[1]) for row in rows]
+
+    def _repair_windows(self, gaps: List[Gap], now: datetime) -> List[Tuple[datetime, datetime, List[Gap]]]:
+        """Batch gaps into market_chart/range requests.
+
+        Gaps from the last day share one window ending now, the only shape
+        CoinGecko answers at 5-minute resolution. Older gaps are merged in
+        time order into windows of at most ``gap_repair_window_days``.
+        """
+        recent = [gap for gap in gaps if gap[0] >= now - RECENT_WINDOW]
+        windows = []
+        if recent:
+            windows.append((min(gap[0] for gap in recent), now, recent))
+
+        span = timedelta(days=settings.coingecko.gap_repair_window_days)
+        older: List[Tuple[datetime, datetime, List[Gap]]] = []
+        for gap in sorted(gap for gap in gaps if gap[0] < now - RECENT_WINDOW):
+            if older and gap[1] - older[-1][0] <= span:
+                start, _, batch = older[-1]
+                older[-1] = (start, gap[1], batch + [gap])
+            else:
+                older.append((gap[0], gap[1], [gap]))
+        return windows + older
+
+    async def repair(self, fetcher: CoinGeckoFetcher, max_gaps: Optional[int] = None) -> int:
+        """Refill open gaps from CoinGecko market_chart/range. Returns rows inserted.
+
+        Windows are fetched concurrently up to the backfill concurrency, within
+        the shared CoinGecko rate budget.
+        """
+        gaps = self.open_gaps(max_gaps or settings.coingecko.gap_repair_max_gaps)
+        if not gaps:
+            return 0
+
+        windows = self._repair_windows(gaps, fetcher._get_current_timestamp())
+        logger.info(f"Repairing {len(gaps)} HBAR gaps in {len(windows)} requests")
+        semaphore = asyncio.Semaphore(settings.coingecko.backfill_concurrency)
+
+        async def run_window(window: Tuple[datetime, datetime, List[Gap]]) -> int:
+            async with semaphore:
+                return await self._repair_window(fetcher, *window)
+
+        inserted = sum(await asyncio.gather(*(run_window(window) for window in windows)))
+        if inserted:
+            # Refilled rows all predate the next run, so the tracked run stays valid
+            db_manager.bump_version("hbar_metrics")
+        db_manager.bump_version("hbar_gaps")
+        return inserted
+
+    async def _repair_window(self, fetcher: CoinGeckoFetcher, start: datetime, end: datetime,
+                             gaps: List[Gap]) -> int:
+        """Fetch one window and insert the points that fall inside its gaps."""
+        now = datetime.utcnow()
+        try:
+            data = await fetcher.fetch_hbar_market_chart_range(start, end)
+            table = fetcher._market_chart_to_arrow(data, start)
+        except Exception as e:
+            logger.error(f"Failed to fetch HBAR history for gaps {start} - {end}: {e}")
+            db_manager.execute_many(
+                """
+                UPDATE hbar_gaps
+                SET attempts = attempts + 1,
+                    status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE status END
+                WHERE gap_start = ? AND gap_end = ?
+                """,
+                [(settings.coingecko.gap_repair_max_attempts, *gap) for gap in gaps],
+            )
+            return 0
+
+        # price_change_24h comes from the stored price a day earlier when there
+        # is one, since the window itself rarely reaches back a day
+        query = """
+            INSERT OR IGNORE INTO hbar_metrics
+            (timestamp, price_usd, market_cap, volume_24h, price_change_24h,
+             circulating_supply, market_cap_rank, valid_to, samples)
+            SELECT
+                p.timestamp,
+                p.price_usd,
+                p.market_cap,
+                p.volume_24h,
+                CASE WHEN r.valid_to + to_seconds($3) >= p.timestamp - INTERVAL 1 DAY AND r.price_usd > 0
+                     THEN (p.price_usd - r.price_usd) / r.price_usd * 100
+                     ELSE p.price_change_24h END,
+                p.circulating_supply,
+                COALESCE((SELECT market_cap_rank FROM hbar_metrics ORDER BY timestamp DESC LIMIT 1), 0),
+                p.timestamp,
+                1
+            FROM (
+                SELECT
+                    timestamp::TIMESTAMP AS timestamp,
+                    any_value(price_usd) AS price_usd,
+                    any_value(market_cap) AS market_cap,
+                    any_value(volume_24h) AS volume_24h,
+                    any_value(price_change_24h) AS price_change_24h,
+                    any_value(circulating_supply) AS circulating_supply
+                FROM hbar_gap_points
+                WHERE EXISTS (
+                    SELECT 1
+                    FROM (SELECT unnest($1::TIMESTAMP[]) AS gap_start, unnest($2::TIMESTAMP[]) AS gap_end) g
+                    WHERE timestamp > g.gap_start AND timestamp < g.gap_end
+                )
+                GROUP BY timestamp
+            ) p
+            ASOF LEFT JOIN hbar_metrics r ON p.timestamp - INTERVAL 1 DAY >= r.timestamp
+        """
+        inserted = db_manager.execute_arrow(
+            query, "hbar_gap_points", table,
+            ([gap[0] for gap in gaps], [gap[1] for gap in gaps], int(hbar_runs.max_gap().total_seconds())),
+        )
+
+        # Per-gap point counts decide between filled and no_data
+        points = sorted(table.column("timestamp").to_pylist())
+        db_manager.execute_many(
+            """
+            UPDATE hbar_gaps
+            SET status = ?, attempts = attempts + 1, rows_inserted = ?, repaired_at = ?
+            WHERE gap_start = ? AND gap_end = ?
+            """,
+            [
+                ("filled" if count else "no_data", count, now, *gap)
+                for gap in gaps
+                for count in [max(0, bisect_left(points, gap[1]) - bisect_right(points, gap[0]))]
+            ],
+        )
+        logger.info(f"Refilled {inserted} HBAR rows in {len(gaps)} gaps between {start} and {end}")
+        return inserted
+
+    def summary(self, recent: int = 20) -> Dict[str, Any]:
+        """Gap counts by status, scan progress and the newest gaps."""
+        statuses = {
+            row[0]: {"gaps": row[1], "rows_inserted": row[2], "missing_seconds": row[3]}
+            for row in db_manager.fetchall(
+                """
+                SELECT status, COUNT(*), SUM(rows_inserted),
+                       SUM(epoch(gap_end) - epoch(gap_start))
+                FROM hbar_gaps
+                GROUP BY status
+                ORDER BY status
+                """
+            )
+        }
+        scan = db_manager.fetchone(
+            "SELECT scanned_through, gaps_found, scanned_at FROM coverage_scans WHERE dataset = ?", (DATASET,)
+        )
+        gaps = db_manager.fetchall(
+            """
+            SELECT gap_start, gap_end, status, attempts, rows_inserted, detected_at, repaired_at
+            FROM hbar_gaps
+            ORDER BY gap_end DESC
+            LIMIT ?
+            """,
+            (recent,),
+        )
+        return {
+            "threshold_seconds": int(hbar_runs.max_gap().total_seconds()),
+            "statuses": statuses,
+            "scan": {"scanned_through": scan[0], "gaps_found": scan[1], "scanned_at": scan[2]} if scan else None,
+            "recent_gaps": [
+                {
+                    "gap_start": row[0],
+                    "gap_end": row[1],
+                    "status": row[2],
+                    "attempts": row[3],
+                    "rows_inserted": row[4],
+                    "detected_at": row[5],
+                    "repaired_at": row[6],
+                }
+                for row in gaps
+            ],
+        }
+
+
+# Global instance
+hbar_gaps = HbarGapScanner()
@@ -1,12 +1,111 @@
 import asyncio
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import base64
+import binascii
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 from loguru import logger
 
 from ..config import settings
 from ..database.connection import db_manager
-from .base_fetcher import BaseFetcher
+from ..database.models import HederaTokenBatch, HederaTokenMetrics
+from ..database.queries import TOKEN_SORT_KEYS
+from .base_fetcher import BaseFetcher, report_progress
+from .coingecko import CoinGeckoFetcher
+from .runs import Run, RunTracker
+from .token_metadata import token_metadata
+
+# Snapshot columns compared to detect unchanged tokens
+TOKEN_METRICS = (
+    "price_usd", "market_cap", "volume_24h", "price_change_24h",
+    "total_supply", "holders_count", "transfers_24h",
+)
+
+
+def _load_token_runs(token_ids) -> Dict[str, Run]:
+    """Load the latest stored run of each token."""
+    rows = db_manager.fetchall(
+        f"""
+        SELECT token_id, MAX(timestamp), arg_max(valid_to, timestamp),
+               {", ".join(f"arg_max({column}, timestamp)" for column in TOKEN_METRICS)}
+        FROM hedera_tokens
+        WHERE token_id IN (SELECT unnest(?))
+        GROUP BY token_id
+        """,
+        (list(token_ids),),
+    )
+    return {row[0]: Run(row[1], row[2], tuple(row[3:])) for row in rows}
+
+
+def encode_token_cursor(sort: str, order: str, key: Any, token_num: int) -> str:
+    """Opaque cursor pointing just past a listing row."""
+    return base64.urlsafe_b64encode(orjson.dumps([sort, order, key, token_num])).rstrip(b"=").decode()
+
+
+def decode_token_cursor(cursor: str, sort: str, order: str) -> Tuple[Any, int]:
+    """Keyset position of a cursor made for the same sort key and direction.
+
+    Raises ValueError for malformed cursors and cursors from another ordering.
+    """
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, orjson.JSONDecodeError, ValueError):
+        raise ValueError("Malformed cursor") from None
+
+    if not isinstance(values, list) or len(values) != 4:
+        raise ValueError("Malformed cursor")
+    cursor_sort, cursor_order, key, token_num = values
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise ValueError("Cursor was issued for a different sort order")
+
+    key_types = {"BIGINT": (int,), "DOUBLE": (int, float), "VARCHAR": (str,)}[TOKEN_SORT_KEYS[sort][1]]
+    if isinstance(key, bool) or not isinstance(key, key_types):
+        raise ValueError("Malformed cursor")
+    if not isinstance(token_num, int) or isinstance(token_num, bool):
+        raise ValueError("Malformed cursor")
+    return key, token_num
+
+
+# Last stored run per token; hot tokens are refreshed every interval, so a
+# gap longer than one backed-off interval starts a new run
+token_runs = RunTracker(
+    _load_token_runs,
+    lambda: timedelta(seconds=settings.updates.tokens_interval * (settings.updates.max_backoff + 1)),
+)
+
+
+# CoinGecko platform whose contract addresses are Hedera token IDs
+HEDERA_PLATFORM = "hedera-hashgraph"
+
+
+class CoinIdMap:
+    """Hedera token ID to CoinGecko coin ID map, built from ``coins/list``.
+    
+    The listing is refetched once ``coin_list_ttl`` has passed. While it
+    can't be fetched the last map is kept, or ``fallback`` before the first
+    successful fetch.
+    """
+    
+    def __init__(self, fallback: Dict[str, str]):
+        self.fallback = fallback
+        self._ids: Optional[Dict[str, str]] = None
+        self._fetched_at = 0.0
+    
+    async def get(self, coingecko: CoinGeckoFetcher) -> Dict[str, str]:
+        if self._ids is not None and time.monotonic() - self._fetched_at < settings.coingecko.coin_list_ttl:
+            return self._ids
+        
+        try:
+            ids = await coingecko.fetch_platform_coin_ids(HEDERA_PLATFORM)
+        except Exception as e:
+            logger.warning(f"Failed to fetch CoinGecko coin list: {e}")
+            return self._ids if self._ids is not None else self.fallback
+        
+        self._ids, self._fetched_at = ids, time.monotonic()
+        logger.info(f"Mapped {len(ids)} Hedera tokens to CoinGecko coins")
+        return ids
 
 
 class HederaTokenFetcher(BaseFetcher):
@@ -26,62 +125,140 @@ class HederaTokenFetcher(BaseFetcher):
         "0.0.9297325",  # Tuca - Tuca token
     ]
     
-    def __init__(self):
+    # Largest page the mirror node returns from list endpoints
+    LIST_PAGE_SIZE = 100
+    
+    # CoinGecko coin IDs of the popular tokens, used until coins/list is fetched
+    COINGECKO_IDS = {
+        "0.0.456858": "usd-coin",
+        "0.0.1456986": "hedera-hashgraph",  # WHBAR tracks HBAR 1:1
+        "0.0.731861": "saucerswap",
+    }
+    
+    def __init__(self, base_url: Optional[str] = None, coingecko_base_url: Optional[str] = None):
         super().__init__(
-            base_url=settings.hedera.mirror_node_url,
+            base_url=base_url or settings.hedera.mirror_node_url,
             api_key=None,  # Mirror node doesn't require API key
             timeout=30
         )
+        self.coingecko_base_url = coingecko_base_url
     
     def _get_auth_headers(self) -> Dict[str, str]:
         """Mirror node doesn't require authentication."""
         return {}
     
-    async def fetch_data(self) -> List[Dict[str, Any]]:
-        """Fetch data for popular Hedera tokens."""
+    async def fetch_data(self, token_ids: Optional[List[str]] = None) -> HederaTokenBatch:
+        """Fetch data for the given tokens, defaulting to the popular tokens."""
         logger.info("Fetching Hedera token data...")
         
-        tokens_data = []
+        tokens_data = HederaTokenBatch()
+        token_ids = token_ids or self.POPULAR_TOKENS
+        report_progress(0, len(token_ids))
         
-        # Fetch data for each popular token
-        for token_id in self.POPULAR_TOKENS:
+        for done, token_id in enumerate(token_ids, 1):
             try:
-                token_info = await self._fetch_token_info(token_id)
-                if token_info:
+                # Token info carries the current supply, so it is only skipped
+                # for tokens whose supply can't change
+                if token_metadata.needs_info(token_id):
+                    token_info = await self._fetch_token_info(token_id)
+                    metadata = token_metadata.update(token_info) if token_info else None
+                else:
+                    metadata = token_metadata.get(token_id)
+                
+                if metadata:
                     # Get additional market data if available
                     token_stats = await self._fetch_token_stats(token_id)
                     
-                    # Combine token info with stats
-                    token_data = {
-                        "token_id": token_id,
-                        "name": token_info.get("name", "Unknown"),
-                        "symbol": token_info.get("symbol", "UNK"),
-                        "decimals": token_info.get("decimals", 0),
-                        "total_supply": self._safe_int(token_info.get("total_supply", 0)),
-                        "treasury_account": token_info.get("treasury_account_id"),
-                        "created_timestamp": token_info.get("created_timestamp"),
-                        "type": token_info.get("type", "FUNGIBLE_COMMON"),
-                        "deleted": token_info.get("deleted", False),
-                        "memo": token_info.get("memo", ""),
-                        # Market data (placeholder for now, can be enhanced with DEX data)
-                        "price_usd": None,
-                        "market_cap": None,
-                        "volume_24h": None,
-                        "price_change_24h": None,
-                        "holders_count": token_stats.get("holders_count") if token_stats else None,
-                        "transfers_24h": token_stats.get("transfers_24h") if token_stats else None,
-                    }
+                    # Combine token info with stats; market data is filled from
+                    # CoinGecko for listed tokens below
+                    token = HederaTokenMetrics(
+                        token_id=token_id,
+                        name=metadata.name,
+                        symbol=metadata.symbol,
+                        decimals=metadata.decimals,
+                        total_supply=metadata.total_supply,
+                        holders_count=token_stats.get("holders_count") if token_stats else None,
+                        transfers_24h=token_stats.get("transfers_24h") if token_stats else None,
+                        token_type=metadata.token_type,
+                        memo=metadata.memo,
+                        deleted=metadata.deleted,
+                        treasury_account=metadata.treasury_account,
+                        created_timestamp=metadata.created_timestamp,
+                    )
                     
-                    tokens_data.append(token_data)
-                    logger.debug(f"Fetched data for token {token_id}: {token_data['symbol']}")
+                    tokens_data.append(token)
+                    logger.debug(f"Fetched data for token {token_id}: {token.symbol}")
                     
             except Exception as e:
                 logger.warning(f"Failed to fetch data for token {token_id}: {e}")
-                continue
+            
+            report_progress(done)
+        
+        await self._enrich_market_data(tokens_data)
         
         logger.info(f"Successfully fetched data for {len(tokens_data)} tokens")
         return tokens_data
     
+    async def fetch_latest_token_id(self) -> Optional[str]:
+        """Get the ID of the most recently created fungible token."""
+        data = await self._make_request(
+            "/api/v1/tokens", {"type": "FUNGIBLE_COMMON", "order": "desc", "limit": 1}
+        )
+        tokens = data.get("tokens") or []
+        return tokens[0]["token_id"] if tokens else None
+    
+    async def discover_tokens(self, after: str, max_pages: int) -> Tuple[List[str], str]:
+        """List fungible tokens with IDs above ``after``, in ID order.
+        
+        Token IDs are assigned sequentially, so the highest ID seen is a
+        cursor to new tokens. Reads at most ``max_pages`` pages and returns
+        the discovered IDs with the cursor to resume from; a failed page
+        ends the scan early without losing the pages already read.
+        """
+        token_ids: List[str] = []
+        cursor = after
+        params = {
+            "type": "FUNGIBLE_COMMON",
+            "order": "asc",
+            "limit": self.LIST_PAGE_SIZE,
+            "token.id": f"gt:{after}",
+        }
+        
+        try:
+            async for token in self.iter_items("/api/v1/tokens", "tokens", params, max_pages):
+                token_ids.append(token["token_id"])
+                cursor = token["token_id"]
+        except Exception as e:
+            logger.warning(f"Token discovery stopped after {cursor}: {e}")
+        
+        return token_ids, cursor
+    
+    async def _enrich_market_data(self, tokens_data: HederaTokenBatch) -> None:
+        """Fill price and market fields from CoinGecko in batched requests.
+        
+        Tokens are matched to coins by their Hedera address in CoinGecko's
+        coin list, so discovered tokens are priced as soon as they are listed.
+        """
+        token_ids = tokens_data.columns["token_id"]
+        if not token_ids:
+            return
+        
+        try:
+            async with CoinGeckoFetcher(base_url=self.coingecko_base_url) as coingecko:
+                listed = await coingecko_ids.get(coingecko)
+                coin_ids = {token_id: listed[token_id] for token_id in token_ids if token_id in listed}
+                if not coin_ids:
+                    return
+                market_data = await coingecko.fetch_market_data(list(coin_ids.values()))
+        except Exception as e:
+            logger.warning(f"Failed to fetch token market data: {e}")
+            return
+        
+        for index, token_id in enumerate(token_ids):
+            coin_id = coin_ids.get(token_id)
+            if coin_id in market_data:
+                tokens_data.update(index, **market_data[coin_id])
+    
     async def _fetch_token_info(self, token_id: str) -> Optional[Dict[str, Any]]:
         """Fetch basic token information."""
         try:
@@ -103,7 +280,7 @@ class HederaTokenFetcher(BaseFetcher):
             
             if balances_data and "balances" in balances_data:
                 balances = balances_data["balances"]
-                holders_count = len([b for b in balances if self._safe_int(b.get("balance", 0)) > 0])
+                holders_count = sum(1 for b in balances if self._safe_int(b.get("balance", 0)) > 0)
                 
                 return {
                     "holders_count": holders_count,
@@ -114,8 +291,12 @@ class HederaTokenFetcher(BaseFetcher):
         
         return None
     
-    async def save_token_data(self, tokens_data: List[Dict[str, Any]]) -> bool:
-        """Save token data to database."""
+    async def save_token_data(self, tokens_data: HederaTokenBatch) -> bool:
+        """Save token data to database.
+        
+        Tokens whose metrics equal their last stored snapshot extend that
+        row's validity interval; only changed tokens get a new row.
+        """
         if not tokens_data:
             logger.warning("No token data to save")
             return False
@@ -123,47 +304,92 @@ class HederaTokenFetcher(BaseFetcher):
         try:
             current_time = self._get_current_timestamp()
             
-            # Prepare data for batch insertion
-            values = []
-            for token in tokens_data:
-                # Skip deleted tokens
-                if token.get("deleted", False):
-                    continue
-                
-                values.append((
-                    current_time,
-                    token["token_id"],
-                    token["name"],
-                    token["symbol"],
-                    token.get("price_usd"),
-                    token.get("market_cap"),
-                    token.get("volume_24h"),
-                    token.get("price_change_24h"),
-                    token.get("decimals", 0),
-                    token.get("total_supply", 0),
-                    token.get("holders_count"),
-                    token.get("transfers_24h"),
-                    token.get("type", "FUNGIBLE_COMMON"),
-                    token.get("memo", ""),
-                ))
-            
-            if not values:
-                logger.warning("No valid tokens to save after filtering")
-                return False
+            # Changed metadata goes to the tokens dimension; snapshots only
+            # carry the metrics
+            token_metadata.flush()
+            
+            columns = tokens_data.columns
+            snapshots = [
+                (token_id, tuple(columns[name][index] for name in TOKEN_METRICS))
+                for index, token_id in enumerate(columns["token_id"])
+                if not columns["deleted"][index]
+            ]
+            token_runs.prefetch(token_id for token_id, _ in snapshots)
+            extended = {
+                token_id: run
+                for token_id, values in snapshots
+                if (run := token_runs.extendable(token_id, values, current_time)) is not None
+            }
+            
+            if extended:
+                # The constant lower bound lets the scan skip older row groups.
+                # Numbered parameters, as DuckDB binds ? in UPDATE ... FROM out of order
+                db_manager.execute(
+                    """
+                    UPDATE hedera_tokens
+                    SET valid_to = $1, samples = samples + 1
+                    FROM (SELECT unnest($2::VARCHAR[]) AS token_id, unnest($3::TIMESTAMP[]) AS started_at) runs
+                    WHERE hedera_tokens.token_id = runs.token_id
+                      AND hedera_tokens.timestamp = runs.started_at
+                      AND hedera_tokens.timestamp >= $4
+                    """,
+                    (
+                        current_time,
+                        list(extended),
+                        [run.started_at for run in extended.values()],
+                        min(run.started_at for run in extended.values()),
+                    ),
+                )
             
-            # Insert data
+            # Insert changed tokens straight from the Arrow view of the batch,
+            # skipping deleted tokens
             query = """
                 INSERT INTO hedera_tokens 
-                (timestamp, token_id, name, symbol, price_usd, market_cap, volume_24h, 
-                 price_change_24h, decimals, total_supply, holders_count, transfers_24h, 
-                 token_type, memo)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                (timestamp, token_id, price_usd, market_cap, volume_24h, 
+                 price_change_24h, total_supply, holders_count, transfers_24h, valid_to, samples)
+                SELECT
+                    ?::TIMESTAMP, token_id, price_usd, market_cap, volume_24h,
+                    price_change_24h, total_supply, holders_count, transfers_24h, ?::TIMESTAMP, 1
+                FROM token_batch
+                WHERE NOT deleted AND NOT list_contains(?, token_id)
             """
             
-            # Execute batch insert
-            db_manager.execute_many(query, values)
+            batch = tokens_data.to_arrow()
+            saved = db_manager.execute_arrow(
+                query, "token_batch", batch, (current_time, current_time, list(extended))
+            )
+            
+            # Deleted tokens drop out of the listing table
+            deleted = [
+                token_id for token_id, gone in zip(columns["token_id"], columns["deleted"], strict=True) if gone
+            ]
+            if deleted:
+                db_manager.execute("DELETE FROM token_state WHERE list_contains(?, token_id)", (deleted,))
+                db_manager.bump_version("hedera_tokens")
+            
+            if not saved and not extended:
+                logger.warning("No valid tokens to save after filtering")
+                return False
+            
+            # Keep the listing table at each token's latest snapshot
+            db_manager.execute_arrow(
+                """
+                INSERT OR REPLACE INTO token_state
+                SELECT b.token_id, CAST(split_part(b.token_id, '.', 3) AS BIGINT), t.symbol, t.token_type,
+                       b.price_usd, b.market_cap, b.volume_24h, b.price_change_24h,
+                       b.total_supply, b.holders_count, b.transfers_24h, ?::TIMESTAMP
+                FROM token_batch b
+                JOIN tokens t ON t.token_id = b.token_id
+                WHERE NOT b.deleted
+                """,
+                "token_batch", batch, (current_time,),
+            )
+            
+            for token_id, values in snapshots:
+                token_runs.record(token_id, values, current_time, extended.get(token_id))
             
-            logger.info(f"Successfully saved {len(values)} token records to database")
+            db_manager.bump_version("hedera_tokens")
+            logger.info(f"Saved {saved} new token records, extended {len(extended)} unchanged")
             return True
             
         except Exception as e:
@@ -171,20 +397,9 @@ class HederaTokenFetcher(BaseFetcher):
             return False
     
     async def get_top_tokens(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get top tokens from database, ordered by holders count or other metrics."""
+        """Get the live tokens with the most holders, then the largest supply."""
         try:
-            query = """
-                SELECT DISTINCT ON (token_id)
-                    token_id, name, symbol, price_usd, market_cap, volume_24h,
-                    price_change_24h, decimals, total_supply, holders_count,
-                    transfers_24h, token_type, memo, timestamp
-                FROM hedera_tokens 
-                WHERE timestamp >= (SELECT MAX(timestamp) FROM hedera_tokens) - INTERVAL '1 hour'
-                ORDER BY token_id, timestamp DESC
-                LIMIT ?
-            """
-            
-            results = db_manager.fetchall(query, (limit,))
+            results = db_manager.query_all("tokens_top", limit=limit)
             
             tokens = []
             if results:
@@ -206,15 +421,109 @@ class HederaTokenFetcher(BaseFetcher):
                         "timestamp": row[13],
                     })
             
-            # Sort by holders count if available, otherwise by total supply
-            tokens.sort(key=lambda x: (x.get("holders_count") or 0, x.get("total_supply") or 0), reverse=True)
-            
-            return tokens[:limit]
+            return tokens
             
         except Exception as e:
             logger.error(f"Failed to get top tokens: {e}")
             return []
+    
+    async def get_token_page(
+        self,
+        sort: str = "holders",
+        order: str = "desc",
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        token_type: Optional[str] = None,
+        min_holders: int = 0,
+    ) -> Dict[str, Any]:
+        """Get one page of the token listing, ordered by ``sort`` with token number as tie-breaker.
+        
+        Pages are keyset-paginated: ``cursor`` is the ``next_cursor`` of the
+        previous page. Raises ValueError for a cursor that doesn't belong to
+        this ordering; query errors propagate to the caller.
+        """
+        after_key, after_num = decode_token_cursor(cursor, sort, order) if cursor else (None, 0)
+        if after_key is None:
+            # Placeholder of the right type; has_cursor=0 disables the keyset filter
+            after_key = "" if TOKEN_SORT_KEYS[sort][1] == "VARCHAR" else 0
+        
+        # One extra row tells whether another page follows
+        results = db_manager.query_all(
+            f"tokens_page_{sort}_{order}",
+            token_type=token_type or "",
+            min_holders=min_holders,
+            has_cursor=1 if cursor else 0,
+            after_key=after_key,
+            after_num=after_num,
+            limit=limit + 1,
+        )
+        
+        tokens = [
+            {
+                "token_id": row[0],
+                "name": row[1],
+                "symbol": row[2],
+                "price_usd": row[3],
+                "market_cap": row[4],
+                "volume_24h": row[5],
+                "price_change_24h": row[6],
+                "decimals": row[7],
+                "total_supply": row[8],
+                "holders_count": row[9],
+                "transfers_24h": row[10],
+                "token_type": row[11],
+                "memo": row[12],
+                "timestamp": row[13],
+            }
+            for row in results[:limit]
+        ]
+        next_cursor = None
+        if len(results) > limit:
+            last = results[limit - 1]
+            next_cursor = encode_token_cursor(sort, order, last[14], last[15])
+        
+        return {"tokens": tokens, "next_cursor": next_cursor}
+    
+    async def get_token_history(
+        self,
+        token_ids: List[str],
+        start: datetime,
+        end: datetime,
+        resolution: str = "raw",
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get snapshot history for one or more tokens from a single grouped query.
+        
+        ``resolution`` is ``raw`` for every stored snapshot, or ``hour``/``day``
+        to downsample to the last snapshot in each bucket. Returns series keyed
+        by token ID; tokens without data map to an empty list.
+        """
+        try:
+            if resolution == "raw":
+                results = db_manager.query_all("token_history_raw", token_ids=token_ids, start=start, end=end)
+            else:
+                results = db_manager.query_all(
+                    "token_history_bucketed", resolution=resolution, token_ids=token_ids, start=start, end=end
+                )
+            
+            history: Dict[str, List[Dict[str, Any]]] = {token_id: [] for token_id in token_ids}
+            for row in results:
+                history[row[0]].append({
+                    "timestamp": row[1],
+                    "price_usd": row[2],
+                    "market_cap": row[3],
+                    "volume_24h": row[4],
+                    "total_supply": row[5],
+                    "holders_count": row[6],
+                })
+            return history
+            
+        except Exception as e:
+            logger.error(f"Failed to get token history for {token_ids}: {e}")
+            return {token_id: [] for token_id in token_ids}
 
 
 # Global instance
-hedera_token_fetcher = HederaTokenFetcher()
\ No newline at end of file
+hedera_token_fetcher = HederaTokenFetcher()
+
+# Shared by every fetcher instance, so coins/list is fetched once per TTL
+coingecko_ids = CoinIdMap(HederaTokenFetcher.COINGECKO_IDS)
\ No newline at end of file
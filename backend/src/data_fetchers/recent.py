@@ -0,0 +1,169 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from ..config import settings
+from ..database.connection import db_manager
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_us(timestamp: datetime) -> int:
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+class _RingView:
+    """Read-only sequence over a ring buffer column, oldest first, for ``bisect``."""
+
+    __slots__ = ("column", "head", "size")
+
+    def __init__(self, column: array, head: int, size: int):
+        self.column = column
+        self.head = head
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int):
+        return self.column[(self.head + index) % len(self.column)]
+
+
+class HbarRecentBuffer:
+    """Fixed-size ring buffer of recent ``hbar_metrics`` runs for history reads.
+
+    Each slot holds one run's start, ``valid_to``, price and volume in typed
+    arrays, so recent-window history is a binary search and a slice with no
+    database round trip. ``save_hbar_data`` feeds it as it writes. Writes
+    made elsewhere, such as backfill and gap repair, only bump the table
+    version, and the buffer reloads from the database on its next read.
+    When full, the oldest run is dropped and windows reaching back past it
+    fall through to the database.
+    """
+
+    def __init__(self):
+        self._capacity = 0
+        self._starts = array("q")
+        self._ends = array("q")
+        self._prices = array("d")
+        self._volumes = array("d")
+        self._head = 0
+        self._size = 0
+        self._floor = 0  # Windows starting at or after this (us since epoch) are fully held
+        self._version: Optional[int] = None  # hbar_metrics version the buffer matches
+        self._db_path: Optional[str] = None
+        self.stats = {"hits": 0, "fallbacks": 0, "loads": 0}
+
+    def capacity(self) -> int:
+        """Slots needed for the configured days at the fastest HBAR cadence."""
+        fastest = max(1, int(settings.updates.hbar_interval * settings.updates.min_interval_factor))
+        # Headroom for manual refreshes saved between scheduled runs
+        return 2 * settings.updates.recent_buffer_days * 86400 // fastest
+
+    def _in_sync(self) -> bool:
+        return (
+            self._version is not None
+            and self._version == db_manager.get_version("hbar_metrics")[0]
+            and self._db_path == db_manager.db_path
+        )
+
+    def hydrate(self) -> None:
+        """Load the configured days of runs from the database."""
+        version = db_manager.get_version("hbar_metrics")[0]
+        since = datetime.utcnow() - timedelta(days=settings.updates.recent_buffer_days)
+        rows = db_manager.query_all("hbar_recent_runs", since=since)
+
+        self._capacity = self.capacity()
+        self._starts = array("q", bytes(8 * self._capacity))
+        self._ends = array("q", bytes(8 * self._capacity))
+        self._prices = array("d", bytes(8 * self._capacity))
+        self._volumes = array("d", bytes(8 * self._capacity))
+        self._head = self._size = 0
+        self._floor = _to_us(since)
+        for start, end, price, volume in rows[-self._capacity:]:
+            self._append(start, end, price, volume)
+        if len(rows) > self._capacity:
+            self._floor = rows[-self._capacity - 1][1] + 1
+
+        self._version = version
+        self._db_path = db_manager.db_path
+        self.stats["loads"] += 1
+        logger.info(f"Loaded {self._size} recent HBAR runs into the history buffer")
+
+    def _append(self, start: int, end: int, price: float, volume: float) -> None:
+        if self._size == self._capacity:
+            self._floor = self._ends[self._head] + 1
+            self._head = (self._head + 1) % self._capacity
+            self._size -= 1
+        index = (self._head + self._size) % self._capacity
+        self._starts[index] = start
+        self._ends[index] = end
+        self._prices[index] = price
+        self._volumes[index] = volume
+        self._size += 1
+
+    def record(self, started_at: datetime, valid_to: datetime, price: float, volume: float, version: int) -> None:
+        """Apply a run saved by ``save_hbar_data``, which bumped the version to ``version``.
+
+        Writes the buffer can't follow in place leave it out of sync, so the
+        next read reloads it.
+        """
+        if self._version != version - 1 or self._db_path != db_manager.db_path:
+            self._version = None
+            return
+
+        start = _to_us(started_at)
+        last = (self._head + self._size - 1) % self._capacity if self._size else None
+        if last is not None and self._starts[last] == start:
+            self._ends[last] = _to_us(valid_to)
+            self._prices[last] = price
+            self._volumes[last] = volume
+        elif last is None or self._ends[last] < start:
+            self._append(start, _to_us(valid_to), price, volume)
+        else:
+            self._version = None
+            return
+        self._version = version
+
+    def history(self, since: datetime) -> Optional[List[Dict[str, Any]]]:
+        """Price points since ``since``, as the ``hbar_price_history`` query returns them.
+
+        Returns None when the window reaches back past the buffer.
+        """
+        if not self._in_sync():
+            self.hydrate()
+
+        since_us = _to_us(since)
+        if since_us < self._floor:
+            self.stats["fallbacks"] += 1
+            return None
+        self.stats["hits"] += 1
+
+        ends = _RingView(self._ends, self._head, self._size)
+        points = []
+        for offset in range(bisect_left(ends, since_us), self._size):
+            index = (self._head + offset) % self._capacity
+            start, end = max(self._starts[index], since_us), self._ends[index]
+            price, volume = self._prices[index], self._volumes[index]
+            if end > start:
+                points.append({"timestamp": EPOCH + start * MICROSECOND, "price_usd": price, "volume_24h": volume})
+            points.append({"timestamp": EPOCH + end * MICROSECOND, "price_usd": price, "volume_24h": volume})
+        return points
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Occupancy and hit counters."""
+        return {
+            **self.stats,
+            "runs": self._size,
+            "capacity": self._capacity,
+            "bytes": 32 * self._capacity,
+            "covers_from": EPOCH + self._floor * MICROSECOND if self._version is not None else None,
+        }
+
+
+# Global instance
+hbar_recent = HbarRecentBuffer()
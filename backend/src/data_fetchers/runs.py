@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from ..config import settings
+from ..database.connection import db_manager
+
+
+@dataclass(frozen=True, slots=True)
+class Run:
+    """A stored row standing for consecutive identical snapshots."""
+    started_at: datetime  # Row timestamp, i.e. when the values were first seen
+    valid_to: datetime  # Last fetch that confirmed the values
+    values: Tuple[Any, ...]
+
+
+class RunTracker:
+    """Last stored run per key, kept in memory for change detection.
+
+    A snapshot whose values equal the key's last run, fetched within
+    ``max_gap`` of that run's last confirmation, extends the run instead of
+    adding a row. Longer gaps start a new run so outages stay visible.
+    Runs are loaded from the database the first time a key is seen.
+    """
+
+    def __init__(self, loader: Callable[[Iterable[Hashable]], Dict[Hashable, Run]],
+                 max_gap: Callable[[], timedelta]):
+        self.loader = loader
+        self.max_gap = max_gap
+        self._runs: Dict[Hashable, Optional[Run]] = {}
+        self._db_path: Optional[str] = None
+        self.stats = {"rows_inserted": 0, "runs_extended": 0}
+
+    def _ensure_loaded(self, keys: Iterable[Hashable]) -> None:
+        if self._db_path != db_manager.db_path:
+            self._runs.clear()
+            self._db_path = db_manager.db_path
+
+        missing = [key for key in keys if key not in self._runs]
+        if missing:
+            loaded = self.loader(missing)
+            for key in missing:
+                self._runs[key] = loaded.get(key)
+
+    def extendable(self, key: Hashable, values: Tuple[Any, ...], timestamp: datetime) -> Optional[Run]:
+        """The run a snapshot extends, or None if it needs a new row."""
+        if not settings.updates.dedup:
+            return None
+        self._ensure_loaded([key])
+        run = self._runs[key]
+        if (
+            run is not None
+            and run.values == values
+            and run.valid_to < timestamp <= run.valid_to + self.max_gap()
+        ):
+            return run
+        return None
+
+    def prefetch(self, keys: Iterable[Hashable]) -> None:
+        """Load the last runs of several keys in one go."""
+        if settings.updates.dedup:
+            self._ensure_loaded(list(keys))
+
+    def record(self, key: Hashable, values: Tuple[Any, ...], timestamp: datetime,
+               extended: Optional[Run] = None) -> None:
+        """Remember a stored snapshot as the key's last run."""
+        if extended is not None:
+            self._runs[key] = Run(extended.started_at, timestamp, values)
+            self.stats["runs_extended"] += 1
+        else:
+            self._runs[key] = Run(timestamp, timestamp, values)
+            self.stats["rows_inserted"] += 1
+
+    def invalidate(self) -> None:
+        """Forget all runs, e.g. after rows were written elsewhere."""
+        self._runs.clear()
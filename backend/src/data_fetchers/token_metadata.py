@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from ..database.connection import db_manager
+
+
+def _safe_int(value: Any, default: int = 0) -> int:
+    """Safely convert value to int."""
+    try:
+        return int(value) if value is not None else default
+    except (ValueError, TypeError):
+        return default
+
+
+@dataclass(frozen=True, slots=True)
+class TokenMetadata:
+    """Static token attributes stored in the ``tokens`` dimension table."""
+    token_id: str
+    name: str
+    symbol: str
+    decimals: int = 0
+    token_type: str = "FUNGIBLE_COMMON"
+    memo: str = ""
+    treasury_account: Optional[str] = None
+    created_timestamp: Optional[str] = None
+    modified_timestamp: Optional[str] = None
+    static_supply: bool = False  # No admin, supply or wipe key, so supply never changes
+    deleted: bool = False
+    total_supply: Optional[int] = None  # Last fetched supply, kept in memory only
+
+    @classmethod
+    def from_token_info(cls, token_info: Dict[str, Any]) -> "TokenMetadata":
+        """Build metadata from a mirror node ``/api/v1/tokens/{id}`` response.
+        
+        Fields the mirror node returns as null get their defaults, since the
+        ``tokens`` columns are NOT NULL and one bad row fails the whole flush.
+        """
+        return cls(
+            token_id=token_info["token_id"],
+            name=token_info.get("name") or "Unknown",
+            symbol=token_info.get("symbol") or "UNK",
+            decimals=_safe_int(token_info.get("decimals", 0)),
+            token_type=token_info.get("type") or "FUNGIBLE_COMMON",
+            memo=token_info.get("memo") or "",
+            treasury_account=token_info.get("treasury_account_id"),
+            created_timestamp=token_info.get("created_timestamp"),
+            modified_timestamp=token_info.get("modified_timestamp"),
+            # Keys can't be added after creation, so without these the supply is fixed
+            static_supply=not any(token_info.get(key) for key in ("admin_key", "supply_key", "wipe_key")),
+            deleted=bool(token_info.get("deleted")),
+            total_supply=_safe_int(token_info.get("total_supply", 0)),
+        )
+
+
+class TokenMetadataCache:
+    """In-memory view of the ``tokens`` table, written back only on change.
+
+    A token's row is rewritten only when the mirror node reports a different
+    ``modified_timestamp``. Tokens whose supply can't change need no further
+    token info requests once their supply has been fetched in this process.
+    """
+
+    def __init__(self):
+        self._entries: Optional[Dict[str, TokenMetadata]] = None
+        self._db_path: Optional[str] = None
+        self._dirty: Dict[str, TokenMetadata] = {}
+        self.stats = {"info_requests_skipped": 0, "metadata_writes": 0}
+
+    def _load(self) -> Dict[str, TokenMetadata]:
+        if self._entries is None or self._db_path != db_manager.db_path:
+            self._dirty.clear()
+            self._db_path = db_manager.db_path
+            rows = db_manager.fetchall(
+                """
+                SELECT token_id, name, symbol, decimals, token_type, memo, treasury_account,
+                       created_timestamp, modified_timestamp, static_supply, deleted
+                FROM tokens
+                """
+            )
+            self._entries = {row[0]: TokenMetadata(*row) for row in rows}
+        return self._entries
+
+    def get(self, token_id: str) -> Optional[TokenMetadata]:
+        """Cached metadata for a token, if any."""
+        return self._load().get(token_id)
+
+    def needs_info(self, token_id: str) -> bool:
+        """Whether the token info request is needed this cycle."""
+        cached = self.get(token_id)
+        if cached is not None and cached.static_supply and cached.total_supply is not None:
+            self.stats["info_requests_skipped"] += 1
+            return False
+        return True
+
+    def update(self, token_info: Dict[str, Any]) -> TokenMetadata:
+        """Merge a token info response, marking the token dirty if its metadata changed."""
+        metadata = TokenMetadata.from_token_info(token_info)
+        cached = self.get(metadata.token_id)
+        if cached is None or cached.modified_timestamp != metadata.modified_timestamp:
+            self._dirty[metadata.token_id] = metadata
+        self._load()[metadata.token_id] = metadata
+        return metadata
+
+    def flush(self) -> int:
+        """Write changed metadata to the ``tokens`` table."""
+        if not self._dirty:
+            return 0
+
+        now = datetime.utcnow()
+        dirty = list(self._dirty.values())
+        try:
+            db_manager.execute_many(
+                """
+                INSERT OR REPLACE INTO tokens
+                (token_id, name, symbol, decimals, token_type, memo, treasury_account,
+                 created_timestamp, modified_timestamp, static_supply, deleted, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        m.token_id, m.name, m.symbol, m.decimals, m.token_type, m.memo, m.treasury_account,
+                        m.created_timestamp, m.modified_timestamp, m.static_supply, m.deleted, now,
+                    )
+                    for m in dirty
+                ],
+            )
+        except Exception as e:
+            logger.error(f"Failed to save token metadata: {e}")
+            return 0
+
+        self._dirty.clear()
+        self.stats["metadata_writes"] += len(dirty)
+        db_manager.bump_version("tokens")
+        return len(dirty)
+
+    def invalidate(self) -> None:
+        """Drop the in-memory view, e.g. after switching databases."""
+        self._entries = None
+        self._dirty.clear()
+
+
+# Global instance
+token_metadata = TokenMetadataCache()
+
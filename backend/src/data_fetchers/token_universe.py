@@ -0,0 +1,210 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from ..database.connection import db_manager
+from ..database.models import HederaTokenBatch
+
+# Discovery state row for the mirror node token listing
+DISCOVERY_SOURCE = "mirror_node_tokens"
+
+# Weight of a change in holders relative to the holder count itself
+HOLDER_CHANGE_WEIGHT = 10
+
+
+def token_num(token_id: str) -> int:
+    """Entity number of a ``shard.realm.num`` token ID."""
+    return int(token_id.rsplit(".", 1)[-1])
+
+
+def activity_score(holders_count: Optional[int], previous_holders: Optional[int]) -> float:
+    """Rank a token by holders, weighting changes since the last refresh.
+
+    Tokens gaining or losing holders outrank static tokens of similar size.
+    """
+    holders = holders_count or 0
+    change = abs(holders - previous_holders) if previous_holders is not None else 0
+    return float(holders + HOLDER_CHANGE_WEIGHT * change)
+
+
+class TokenUniverse:
+    """Tiered set of tracked tokens stored in ``tracked_tokens``.
+
+    Hot tokens (pinned ones plus the ``hot_set_size`` most active) are
+    refreshed on every token job run. Cold tokens, including newly discovered
+    ones, are refreshed at most ``cold_batch_size`` per run and then wait
+    ``cold_refresh_interval`` seconds, so ingestion cost follows activity
+    rather than the size of the token universe.
+    """
+
+    def seed(self, token_ids: List[str]) -> None:
+        """Track the given tokens as pinned hot tokens."""
+        now = datetime.utcnow()
+        db_manager.execute_many(
+            """
+            INSERT OR IGNORE INTO tracked_tokens
+            (token_id, token_num, tier, pinned, discovered_at, next_refresh_at)
+            VALUES (?, ?, 'hot', TRUE, ?, ?)
+            """,
+            [(token_id, token_num(token_id), now, now) for token_id in token_ids],
+        )
+
+    def get_cursor(self) -> Optional[str]:
+        """Highest token ID discovered so far, or None before the first scan."""
+        row = db_manager.fetchone(
+            "SELECT last_token_id FROM token_discovery_state WHERE source = ?", (DISCOVERY_SOURCE,)
+        )
+        return row[0] if row else None
+
+    def add_discovered(self, token_ids: List[str], cursor: str) -> int:
+        """Track newly discovered tokens as cold candidates and advance the cursor."""
+        now = datetime.utcnow()
+        if token_ids:
+            db_manager.execute_many(
+                """
+                INSERT OR IGNORE INTO tracked_tokens
+                (token_id, token_num, tier, discovered_at, next_refresh_at)
+                VALUES (?, ?, 'cold', ?, ?)
+                """,
+                [(token_id, token_num(token_id), now, now) for token_id in token_ids],
+            )
+
+        db_manager.execute(
+            """
+            INSERT OR REPLACE INTO token_discovery_state
+            (source, last_token_id, last_created_timestamp, tokens_discovered, updated_at)
+            SELECT ?, ?,
+                   (SELECT last_created_timestamp FROM token_discovery_state WHERE source = ?),
+                   COALESCE((SELECT tokens_discovered FROM token_discovery_state WHERE source = ?), 0) + ?,
+                   ?
+            """,
+            (DISCOVERY_SOURCE, cursor, DISCOVERY_SOURCE, DISCOVERY_SOURCE, len(token_ids), now),
+        )
+        db_manager.bump_version("tracked_tokens")
+        return len(token_ids)
+
+    def due_tokens(self) -> List[str]:
+        """Token IDs to refresh this run: all hot tokens and the most overdue cold ones."""
+        rows = db_manager.query_all(
+            "tracked_tokens_due", now=datetime.utcnow(), cold_limit=settings.hedera.cold_batch_size
+        )
+        return [row[0] for row in rows]
+
+    def record_refresh(self, requested: List[str], tokens_data: HederaTokenBatch) -> None:
+        """Score refreshed tokens, schedule their next refresh and re-rank tiers.
+
+        Deleted tokens stop being tracked. Tokens that failed to fetch keep
+        their score and are retried after the cold interval.
+        """
+        now = datetime.utcnow()
+        next_refresh = now + timedelta(seconds=settings.hedera.cold_refresh_interval)
+        columns = tokens_data.columns
+        previous = dict(db_manager.fetchall(
+            "SELECT token_id, holders_count FROM tracked_tokens WHERE token_id IN (SELECT unnest(?))",
+            (requested,),
+        ))
+
+        deleted = [
+            token_id for token_id, gone in zip(columns["token_id"], columns["deleted"], strict=True) if gone
+        ]
+        refreshed = [
+            (
+                activity_score(holders, previous.get(token_id)),
+                holders,
+                created,
+                now,
+                next_refresh,
+                token_id,
+            )
+            for token_id, holders, created, gone in zip(
+                columns["token_id"], columns["holders_count"], columns["created_timestamp"], columns["deleted"],
+                strict=True,
+            )
+            if not gone
+        ]
+        failed = sorted(set(requested) - set(columns["token_id"]))
+
+        if refreshed:
+            db_manager.execute_many(
+                """
+                UPDATE tracked_tokens
+                SET activity_score = ?, holders_count = ?, created_timestamp = COALESCE(?, created_timestamp),
+                    last_refreshed_at = ?, next_refresh_at = ?
+                WHERE token_id = ?
+                """,
+                refreshed,
+            )
+        if failed:
+            db_manager.execute_many(
+                "UPDATE tracked_tokens SET next_refresh_at = ? WHERE token_id = ?",
+                [(next_refresh, token_id) for token_id in failed],
+            )
+        if deleted:
+            db_manager.execute(
+                "DELETE FROM tracked_tokens WHERE token_id IN (SELECT unnest(?)) AND NOT pinned", (deleted,)
+            )
+
+        created = [value for value in columns["created_timestamp"] if value]
+        if created:
+            db_manager.execute(
+                """
+                UPDATE token_discovery_state
+                SET last_created_timestamp = GREATEST(COALESCE(last_created_timestamp, ''), ?)
+                WHERE source = ?
+                """,
+                (max(created), DISCOVERY_SOURCE),
+            )
+
+        self.rerank()
+
+    def rerank(self) -> None:
+        """Promote the most active tokens to the hot tier and demote the rest."""
+        db_manager.execute(
+            """
+            UPDATE tracked_tokens
+            SET tier = CASE
+                WHEN pinned OR token_id IN (
+                    SELECT token_id FROM tracked_tokens
+                    WHERE NOT pinned AND activity_score IS NOT NULL
+                    ORDER BY activity_score DESC, token_num DESC
+                    LIMIT ?
+                ) THEN 'hot'
+                ELSE 'cold'
+            END
+            """,
+            (settings.hedera.hot_set_size,),
+        )
+        db_manager.bump_version("tracked_tokens")
+
+    def summary(self) -> Dict[str, Any]:
+        """Tier sizes and discovery progress."""
+        tiers = {
+            row[0]: {
+                "tokens": row[1],
+                "pinned": row[2],
+                "unprobed": row[3],
+                "due": row[4],
+                "max_activity_score": row[5],
+            }
+            for row in db_manager.query_all("tracked_tokens_summary", now=datetime.utcnow())
+        }
+        state = db_manager.fetchone(
+            """
+            SELECT last_token_id, last_created_timestamp, tokens_discovered, updated_at
+            FROM token_discovery_state WHERE source = ?
+            """,
+            (DISCOVERY_SOURCE,),
+        )
+        return {
+            "tiers": tiers,
+            "discovery": {
+                "last_token_id": state[0],
+                "last_created_timestamp": state[1],
+                "tokens_discovered": state[2],
+                "updated_at": state[3],
+            } if state else None,
+        }
+
+
+# Global instance
+token_universe = TokenUniverse()
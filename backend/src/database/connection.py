@@ -1,11 +1,19 @@
 import os
+import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
 
 import duckdb
 from loguru import logger
 
-from .models import create_tables
+from .migrations import run_migrations
+from .queries import QUERIES, render_execute
+
+if TYPE_CHECKING:
+    import pyarrow
+
+# Statements that can't change data, so don't invalidate prepared plans
+READ_ONLY_PREFIXES = ("SELECT", "WITH", "EXPLAIN", "PRAGMA", "SHOW", "DESCRIBE")
 
 
 class DatabaseManager:
@@ -14,6 +22,11 @@ class DatabaseManager:
     def __init__(self, db_path: Optional[str] = None):
         self.db_path = db_path or os.getenv("DATABASE_PATH", "./data/hedera_metrics.db")
         self._connection: Optional[duckdb.DuckDBPyConnection] = None
+        self._table_versions: Dict[str, int] = {}
+        # Prepared statement -> write generation it was planned under
+        self._prepared: Dict[str, int] = {}
+        self._writes = 0
+        self._query_stats: Dict[str, Dict[str, float]] = {}
         self._ensure_data_directory()
     
     def _ensure_data_directory(self) -> None:
@@ -27,24 +40,45 @@ class DatabaseManager:
             try:
                 self._connection = duckdb.connect(self.db_path)
                 logger.info(f"Connected to database: {self.db_path}")
-                create_tables(self._connection)
-                logger.info("Database tables created/verified")
+                version = run_migrations(self._connection)
+                logger.info(f"Database schema at version {version}")
             except Exception as e:
                 logger.error(f"Failed to connect to database: {e}")
                 raise
         
         return self._connection
     
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """Open a separate connection to the same database.
+        
+        Queries on it don't wait behind the shared connection, so it can be
+        used from another thread, e.g. for health probes.
+        """
+        return self.connect().cursor()
+    
     def close(self) -> None:
         """Close database connection."""
         if self._connection:
             self._connection.close()
             self._connection = None
+            self._prepared.clear()
             logger.info("Database connection closed")
     
+    def _record_write(self) -> None:
+        """Note a write, so registered queries are planned again before their next run.
+        
+        DuckDB 0.9 plans prepared statements against the column statistics of
+        the moment and does not rebind them when later writes widen those
+        statistics. Stale plans prune row groups that now hold matches and
+        truncate values that no longer fit the compressed sort and group keys.
+        """
+        self._writes += 1
+    
     def execute(self, query: str, parameters: Optional[tuple] = None):
         """Execute a query with optional parameters."""
         conn = self.connect()
+        if not query.lstrip()[:8].upper().startswith(READ_ONLY_PREFIXES):
+            self._record_write()
         try:
             if parameters:
                 return conn.execute(query, parameters)
@@ -64,15 +98,100 @@ class DatabaseManager:
         result = self.execute(query, parameters)
         return result.fetchone()
     
+    def fetchnumpy(self, query: str, parameters: Optional[tuple] = None) -> dict:
+        """Execute query and fetch results as a dict of NumPy arrays."""
+        result = self.execute(query, parameters)
+        return result.fetchnumpy()
+    
+    def _run_query(self, name: str, arguments: Dict[str, Any], fetch: Callable[[Any], Any]) -> Any:
+        """Execute a registered query, preparing it on first use, and record its timing."""
+        query = QUERIES.get(name)
+        if query is None:
+            raise ValueError(f"Unknown query: {name}")
+        
+        # Validate and render the arguments before touching the connection
+        statement = render_execute(query, arguments)
+        conn = self.connect()
+        start = time.perf_counter()
+        try:
+            if self._prepared.get(query.statement) != self._writes:
+                conn.execute(f"PREPARE {query.statement} AS {query.sql}")
+                self._prepared[query.statement] = self._writes
+            result = fetch(conn.execute(statement))
+        except Exception as e:
+            logger.error(f"Query {name} failed: {e}")
+            raise
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        stats = self._query_stats.setdefault(name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        return result
+    
+    def query_all(self, name: str, **arguments: Any) -> list:
+        """Run a registered query and fetch all results."""
+        return self._run_query(name, arguments, lambda result: result.fetchall())
+    
+    def query_one(self, name: str, **arguments: Any) -> Optional[tuple]:
+        """Run a registered query and fetch one result."""
+        return self._run_query(name, arguments, lambda result: result.fetchone())
+    
+    def query_numpy(self, name: str, **arguments: Any) -> dict:
+        """Run a registered query and fetch results as a dict of NumPy arrays."""
+        return self._run_query(name, arguments, lambda result: result.fetchnumpy())
+    
+    def get_query_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get call counts and timings of registered queries since startup."""
+        return {
+            name: {
+                "calls": stats["calls"],
+                "total_ms": round(stats["total_ms"], 3),
+                "mean_ms": round(stats["total_ms"] / stats["calls"], 3),
+                "max_ms": round(stats["max_ms"], 3),
+            }
+            for name, stats in self._query_stats.items()
+        }
+    
+    def bump_version(self, table: str) -> int:
+        """Record a write to ``table`` so results derived from it go stale."""
+        self._table_versions[table] = self._table_versions.get(table, 0) + 1
+        return self._table_versions[table]
+    
+    def get_version(self, *tables: str) -> Tuple[int, ...]:
+        """Get the current data versions of the given tables."""
+        return tuple(self._table_versions.get(table, 0) for table in tables)
+    
     def execute_many(self, query: str, parameters_list: list) -> None:
         """Execute a query with multiple parameter sets."""
         conn = self.connect()
+        self._record_write()
         try:
             conn.executemany(query, parameters_list)
         except Exception as e:
             logger.error(f"Batch query execution failed: {e}")
             logger.error(f"Query: {query}")
             raise
+    
+    def execute_arrow(self, query: str, view_name: str, table: "pyarrow.Table",
+                      parameters: Optional[tuple] = None) -> int:
+        """Execute a query that reads an Arrow table exposed as ``view_name``.
+        
+        Used for bulk loads: the Arrow buffers are scanned by DuckDB directly
+        instead of being bound row by row. Returns the affected row count.
+        """
+        conn = self.connect()
+        self._record_write()
+        try:
+            conn.register(view_name, table)
+            result = (conn.execute(query, parameters) if parameters else conn.execute(query)).fetchone()
+            return result[0] if result else 0
+        except Exception as e:
+            logger.error(f"Arrow query execution failed: {e}")
+            logger.error(f"Query: {query}")
+            raise
+        finally:
+            conn.unregister(view_name)
 
 
 # Global database manager instance
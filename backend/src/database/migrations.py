@@ -0,0 +1,443 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Tuple, Union
+
+import duckdb
+from loguru import logger
+
+# A migration step is either a SQL statement or a function applied to the connection
+MigrationStep = Union[str, Callable[[duckdb.DuckDBPyConnection], None]]
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    """A versioned, ordered schema change."""
+    version: int
+    description: str
+    steps: Tuple[MigrationStep, ...]
+
+
+def _add_network_metrics_sequence(conn: duckdb.DuckDBPyConnection) -> None:
+    """Rebuild hedera_network_metrics with a sequence-backed id.
+    
+    DuckDB can't attach a default to an existing primary key column, so the
+    table is copied into a new one whose sequence starts after the current ids.
+    """
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM hedera_network_metrics").fetchone()[0]
+    conn.execute(f"CREATE SEQUENCE IF NOT EXISTS seq_network_metrics_id START {max_id + 1}")
+    conn.execute("""
+        CREATE TABLE hedera_network_metrics_new (
+            id INTEGER PRIMARY KEY DEFAULT nextval('seq_network_metrics_id'),
+            timestamp TIMESTAMP NOT NULL,
+            tps DOUBLE NOT NULL,
+            transactions_24h INTEGER NOT NULL,
+            average_fee DOUBLE NOT NULL,
+            consensus_nodes INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT INTO hedera_network_metrics_new SELECT * FROM hedera_network_metrics")
+    conn.execute("DROP TABLE hedera_network_metrics")
+    conn.execute("ALTER TABLE hedera_network_metrics_new RENAME TO hedera_network_metrics")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        description="Baseline schema",
+        steps=(
+            # HBAR metrics table
+            """
+                CREATE TABLE IF NOT EXISTS hbar_metrics (
+                    timestamp TIMESTAMP NOT NULL,
+                    price_usd DOUBLE NOT NULL,
+                    market_cap DOUBLE NOT NULL,
+                    volume_24h DOUBLE NOT NULL,
+                    price_change_24h DOUBLE NOT NULL,
+                    circulating_supply DOUBLE NOT NULL,
+                    market_cap_rank INTEGER NOT NULL,
+                    PRIMARY KEY (timestamp)
+                )
+            """,
+            # Hedera network metrics table
+            """
+                CREATE TABLE IF NOT EXISTS hedera_network_metrics (
+                    id INTEGER PRIMARY KEY,
+                    timestamp TIMESTAMP NOT NULL,
+                    tps DOUBLE NOT NULL,
+                    transactions_24h INTEGER NOT NULL,
+                    average_fee DOUBLE NOT NULL,
+                    consensus_nodes INTEGER NOT NULL
+                )
+            """,
+            # Hedera tokens table
+            """
+                CREATE TABLE IF NOT EXISTS hedera_tokens (
+                    timestamp TIMESTAMP NOT NULL,
+                    token_id VARCHAR NOT NULL,
+                    name VARCHAR NOT NULL,
+                    symbol VARCHAR NOT NULL,
+                    price_usd DOUBLE,
+                    market_cap DOUBLE,
+                    volume_24h DOUBLE,
+                    price_change_24h DOUBLE,
+                    decimals INTEGER DEFAULT 0,
+                    total_supply BIGINT DEFAULT 0,
+                    holders_count INTEGER,
+                    transfers_24h INTEGER,
+                    token_type VARCHAR DEFAULT 'FUNGIBLE_COMMON',
+                    memo VARCHAR DEFAULT '',
+                    PRIMARY KEY (timestamp, token_id)
+                )
+            """,
+            # Global crypto market snapshots from CoinGecko /global
+            """
+                CREATE TABLE IF NOT EXISTS market_global (
+                    timestamp TIMESTAMP NOT NULL,
+                    total_market_cap_usd DOUBLE NOT NULL,
+                    total_volume_usd DOUBLE NOT NULL,
+                    market_cap_change_24h DOUBLE NOT NULL,
+                    btc_dominance DOUBLE NOT NULL,
+                    eth_dominance DOUBLE NOT NULL,
+                    active_cryptocurrencies INTEGER NOT NULL,
+                    markets INTEGER NOT NULL,
+                    PRIMARY KEY (timestamp)
+                )
+            """,
+            # Trending coin snapshots from CoinGecko /search/trending
+            """
+                CREATE TABLE IF NOT EXISTS market_trending (
+                    timestamp TIMESTAMP NOT NULL,
+                    rank INTEGER NOT NULL,
+                    coin_id VARCHAR NOT NULL,
+                    name VARCHAR NOT NULL,
+                    symbol VARCHAR NOT NULL,
+                    market_cap_rank INTEGER,
+                    price_btc DOUBLE,
+                    thumb VARCHAR,
+                    PRIMARY KEY (timestamp, rank)
+                )
+            """,
+            # Completed HBAR backfill windows, used to resume interrupted backfills
+            """
+                CREATE TABLE IF NOT EXISTS hbar_backfill_chunks (
+                    chunk_start TIMESTAMP NOT NULL,
+                    chunk_end TIMESTAMP NOT NULL,
+                    rows_inserted INTEGER NOT NULL,
+                    completed_at TIMESTAMP NOT NULL,
+                    PRIMARY KEY (chunk_start, chunk_end)
+                )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_hbar_timestamp ON hbar_metrics(timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_network_timestamp ON hedera_network_metrics(timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_tokens_timestamp ON hedera_tokens(timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_tokens_symbol ON hedera_tokens(symbol)",
+            "CREATE INDEX IF NOT EXISTS idx_tokens_token_timestamp ON hedera_tokens(token_id, timestamp)",
+        ),
+    ),
+    Migration(
+        version=2,
+        description="Drop indexes the query planner never uses; sequence-backed network metrics id",
+        steps=(
+            # DuckDB only uses ART indexes for single-column equality lookups. Time
+            # ranges are pruned by per-row-group zone maps, which work because rows
+            # are appended in timestamp order, and composite indexes are never
+            # chosen for scans. These indexes only cost write time and memory:
+            # the hbar_metrics one duplicates its primary key, and nothing
+            # filters tokens by symbol.
+            "DROP INDEX IF EXISTS idx_hbar_timestamp",
+            "DROP INDEX IF EXISTS idx_tokens_timestamp",
+            "DROP INDEX IF EXISTS idx_tokens_symbol",
+            "DROP INDEX IF EXISTS idx_tokens_token_timestamp",
+            "DROP INDEX IF EXISTS idx_network_timestamp",
+            _add_network_metrics_sequence,
+        ),
+    ),
+    Migration(
+        version=3,
+        description="Scheduler run history",
+        steps=(
+            "CREATE SEQUENCE IF NOT EXISTS seq_scheduler_runs_id",
+            """
+                CREATE TABLE IF NOT EXISTS scheduler_runs (
+                    id BIGINT PRIMARY KEY DEFAULT nextval('seq_scheduler_runs_id'),
+                    job_id VARCHAR NOT NULL,
+                    started_at TIMESTAMP NOT NULL,
+                    finished_at TIMESTAMP NOT NULL,
+                    duration_ms DOUBLE NOT NULL,
+                    interval_seconds INTEGER NOT NULL,
+                    status VARCHAR NOT NULL,  -- ok, failed or skipped
+                    rows_written INTEGER NOT NULL DEFAULT 0,
+                    upstream_calls INTEGER NOT NULL DEFAULT 0,
+                    error VARCHAR
+                )
+            """,
+        ),
+    ),
+    Migration(
+        version=4,
+        description="Tracked token universe and discovery cursor",
+        steps=(
+            """
+                CREATE TABLE IF NOT EXISTS tracked_tokens (
+                    token_id VARCHAR PRIMARY KEY,
+                    token_num BIGINT NOT NULL,
+                    tier VARCHAR NOT NULL DEFAULT 'cold',  -- hot or cold
+                    pinned BOOLEAN NOT NULL DEFAULT FALSE,
+                    activity_score DOUBLE,
+                    holders_count INTEGER,
+                    created_timestamp VARCHAR,
+                    discovered_at TIMESTAMP NOT NULL,
+                    last_refreshed_at TIMESTAMP,
+                    next_refresh_at TIMESTAMP NOT NULL
+                )
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS token_discovery_state (
+                    source VARCHAR PRIMARY KEY,
+                    last_token_id VARCHAR NOT NULL,
+                    last_created_timestamp VARCHAR,
+                    tokens_discovered BIGINT NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP NOT NULL
+                )
+            """,
+        ),
+    ),
+    Migration(
+        version=5,
+        description="Token metadata dimension; narrow hedera_tokens snapshots",
+        steps=(
+            # Metadata is only rewritten when the mirror node's modified_timestamp
+            # changes; rows seeded here have none, so the next fetch refreshes them
+            """
+                CREATE TABLE IF NOT EXISTS tokens (
+                    token_id VARCHAR PRIMARY KEY,
+                    name VARCHAR NOT NULL,
+                    symbol VARCHAR NOT NULL,
+                    decimals INTEGER NOT NULL DEFAULT 0,
+                    token_type VARCHAR NOT NULL DEFAULT 'FUNGIBLE_COMMON',
+                    memo VARCHAR NOT NULL DEFAULT '',
+                    treasury_account VARCHAR,
+                    created_timestamp VARCHAR,
+                    modified_timestamp VARCHAR,
+                    static_supply BOOLEAN NOT NULL DEFAULT FALSE,
+                    deleted BOOLEAN NOT NULL DEFAULT FALSE,
+                    updated_at TIMESTAMP NOT NULL
+                )
+            """,
+            """
+                INSERT OR IGNORE INTO tokens (token_id, name, symbol, decimals, token_type, memo, updated_at)
+                SELECT
+                    token_id,
+                    arg_max(name, timestamp),
+                    arg_max(symbol, timestamp),
+                    arg_max(decimals, timestamp),
+                    arg_max(token_type, timestamp),
+                    arg_max(memo, timestamp),
+                    MAX(timestamp)
+                FROM hedera_tokens
+                GROUP BY token_id
+            """,
+            """
+                CREATE TABLE hedera_tokens_new (
+                    timestamp TIMESTAMP NOT NULL,
+                    token_id VARCHAR NOT NULL,
+                    price_usd DOUBLE,
+                    market_cap DOUBLE,
+                    volume_24h DOUBLE,
+                    price_change_24h DOUBLE,
+                    total_supply BIGINT DEFAULT 0,
+                    holders_count INTEGER,
+                    transfers_24h INTEGER,
+                    PRIMARY KEY (timestamp, token_id)
+                )
+            """,
+            # Copied in timestamp order so zone maps keep pruning time ranges
+            """
+                INSERT INTO hedera_tokens_new
+                SELECT timestamp, token_id, price_usd, market_cap, volume_24h, price_change_24h,
+                       total_supply, holders_count, transfers_24h
+                FROM hedera_tokens
+                ORDER BY timestamp
+            """,
+            "DROP TABLE hedera_tokens",
+            "ALTER TABLE hedera_tokens_new RENAME TO hedera_tokens",
+        ),
+    ),
+    Migration(
+        version=6,
+        description="Validity intervals for HBAR and token snapshots",
+        steps=(
+            # Each row becomes a run: values first seen at timestamp and last
+            # confirmed at valid_to, over samples fetches. Existing rows are
+            # single-sample runs.
+            """
+                CREATE TABLE hbar_metrics_new (
+                    timestamp TIMESTAMP NOT NULL,
+                    price_usd DOUBLE NOT NULL,
+                    market_cap DOUBLE NOT NULL,
+                    volume_24h DOUBLE NOT NULL,
+                    price_change_24h DOUBLE NOT NULL,
+                    circulating_supply DOUBLE NOT NULL,
+                    market_cap_rank INTEGER NOT NULL,
+                    valid_to TIMESTAMP NOT NULL,
+                    samples INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (timestamp)
+                )
+            """,
+            """
+                INSERT INTO hbar_metrics_new
+                SELECT timestamp, price_usd, market_cap, volume_24h, price_change_24h,
+                       circulating_supply, market_cap_rank, timestamp, 1
+                FROM hbar_metrics
+                ORDER BY timestamp
+            """,
+            "DROP TABLE hbar_metrics",
+            "ALTER TABLE hbar_metrics_new RENAME TO hbar_metrics",
+            """
+                CREATE TABLE hedera_tokens_new (
+                    timestamp TIMESTAMP NOT NULL,
+                    token_id VARCHAR NOT NULL,
+                    price_usd DOUBLE,
+                    market_cap DOUBLE,
+                    volume_24h DOUBLE,
+                    price_change_24h DOUBLE,
+                    total_supply BIGINT DEFAULT 0,
+                    holders_count INTEGER,
+                    transfers_24h INTEGER,
+                    valid_to TIMESTAMP NOT NULL,
+                    samples INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (timestamp, token_id)
+                )
+            """,
+            """
+                INSERT INTO hedera_tokens_new
+                SELECT timestamp, token_id, price_usd, market_cap, volume_24h, price_change_24h,
+                       total_supply, holders_count, transfers_24h, timestamp, 1
+                FROM hedera_tokens
+                ORDER BY timestamp
+            """,
+            "DROP TABLE hedera_tokens",
+            "ALTER TABLE hedera_tokens_new RENAME TO hedera_tokens",
+        ),
+    ),
+    Migration(
+        version=7,
+        description="HBAR gap tracking and scan coverage",
+        steps=(
+            """
+                CREATE TABLE IF NOT EXISTS hbar_gaps (
+                    gap_start TIMESTAMP NOT NULL,  -- valid_to of the row before the gap
+                    gap_end TIMESTAMP NOT NULL,  -- timestamp of the row after it
+                    status VARCHAR NOT NULL DEFAULT 'open',  -- open, filled, no_data or failed
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    rows_inserted INTEGER NOT NULL DEFAULT 0,
+                    detected_at TIMESTAMP NOT NULL,
+                    repaired_at TIMESTAMP,
+                    PRIMARY KEY (gap_start, gap_end)
+                )
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS coverage_scans (
+                    dataset VARCHAR PRIMARY KEY,
+                    scanned_through TIMESTAMP NOT NULL,  -- start of the newest row checked
+                    gaps_found BIGINT NOT NULL DEFAULT 0,
+                    scanned_at TIMESTAMP NOT NULL
+                )
+            """,
+        ),
+    ),
+    Migration(
+        version=8,
+        description="Current token state for paginated listings",
+        steps=(
+            # One row per live token with its latest metrics and the metadata
+            # it is sorted and filtered on, so listings never scan history
+            """
+                CREATE TABLE IF NOT EXISTS token_state (
+                    token_id VARCHAR PRIMARY KEY,
+                    token_num BIGINT NOT NULL,  -- Entity number, the listing tie-breaker
+                    symbol VARCHAR NOT NULL,
+                    token_type VARCHAR NOT NULL,
+                    price_usd DOUBLE,
+                    market_cap DOUBLE,
+                    volume_24h DOUBLE,
+                    price_change_24h DOUBLE,
+                    total_supply BIGINT,
+                    holders_count INTEGER,
+                    transfers_24h INTEGER,
+                    updated_at TIMESTAMP NOT NULL  -- valid_to of the latest snapshot
+                )
+            """,
+            """
+                INSERT OR IGNORE INTO token_state
+                SELECT s.token_id, CAST(split_part(s.token_id, '.', 3) AS BIGINT), t.symbol, t.token_type,
+                       s.price_usd, s.market_cap, s.volume_24h, s.price_change_24h,
+                       s.total_supply, s.holders_count, s.transfers_24h, s.valid_to
+                FROM (
+                    SELECT DISTINCT ON (token_id) *
+                    FROM hedera_tokens
+                    ORDER BY token_id, timestamp DESC
+                ) s
+                JOIN tokens t ON t.token_id = s.token_id
+                WHERE NOT t.deleted
+            """,
+        ),
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn: duckdb.DuckDBPyConnection) -> int:
+    """Get the highest applied migration version, or 0 for an unversioned database."""
+    exists = conn.execute(
+        "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = 'schema_migrations'"
+    ).fetchone()[0]
+    if not exists:
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations").fetchone()[0]
+
+
+def run_migrations(conn: duckdb.DuckDBPyConnection) -> int:
+    """Apply all pending migrations in order, each in its own transaction.
+    
+    Returns the schema version after migrating. A database already at the
+    latest version is only read, so connecting runs no DDL.
+    """
+    version = get_schema_version(conn)
+    if version >= LATEST_VERSION:
+        return version
+    
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description VARCHAR NOT NULL,
+            applied_at TIMESTAMP NOT NULL
+        )
+    """)
+    
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            for step in migration.steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(
+                "INSERT INTO schema_migrations VALUES (?, ?, ?)",
+                (migration.version, migration.description, datetime.utcnow()),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            logger.error(f"Migration {migration.version} failed, rolled back")
+            raise
+        
+        version = migration.version
+    
+    return version
@@ -1,125 +1,125 @@
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
 
-import duckdb
+if TYPE_CHECKING:
+    import pyarrow as pa
 
 
+@dataclass(frozen=True, slots=True)
 class HBARMetrics:
     """HBAR price and market data model."""
-    
-    def __init__(
-        self,
-        timestamp: datetime,
-        price_usd: float,
-        market_cap: float,
-        volume_24h: float,
-        price_change_24h: float,
-        circulating_supply: float,
-        market_cap_rank: int,
-    ):
-        self.timestamp = timestamp
-        self.price_usd = price_usd
-        self.market_cap = market_cap
-        self.volume_24h = volume_24h
-        self.price_change_24h = price_change_24h
-        self.circulating_supply = circulating_supply
-        self.market_cap_rank = market_cap_rank
+    timestamp: datetime
+    price_usd: float
+    market_cap: float
+    volume_24h: float
+    price_change_24h: float
+    circulating_supply: float
+    market_cap_rank: int
 
 
+@dataclass(frozen=True, slots=True)
 class HederaNetworkMetrics:
     """Hedera network performance metrics."""
-    
-    def __init__(
-        self,
-        timestamp: datetime,
-        tps: float,
-        transactions_24h: int,
-        average_fee: float,
-        consensus_nodes: int,
-    ):
-        self.timestamp = timestamp
-        self.tps = tps
-        self.transactions_24h = transactions_24h
-        self.average_fee = average_fee
-        self.consensus_nodes = consensus_nodes
+    timestamp: datetime
+    tps: float
+    transactions_24h: int
+    average_fee: float
+    consensus_nodes: int
 
 
+@dataclass(frozen=True, slots=True)
 class HederaTokenMetrics:
     """Hedera token data model."""
-    
-    def __init__(
-        self,
-        timestamp: datetime,
-        token_id: str,
-        name: str,
-        symbol: str,
-        price_usd: Optional[float],
-        market_cap: Optional[float],
-        volume_24h: Optional[float],
-        price_change_24h: Optional[float],
-    ):
-        self.timestamp = timestamp
-        self.token_id = token_id
-        self.name = name
-        self.symbol = symbol
-        self.price_usd = price_usd
-        self.market_cap = market_cap
-        self.volume_24h = volume_24h
-        self.price_change_24h = price_change_24h
+    token_id: str
+    name: str
+    symbol: str
+    price_usd: Optional[float] = None
+    market_cap: Optional[float] = None
+    volume_24h: Optional[float] = None
+    price_change_24h: Optional[float] = None
+    decimals: int = 0
+    total_supply: int = 0
+    holders_count: Optional[int] = None
+    transfers_24h: Optional[int] = None
+    token_type: str = "FUNGIBLE_COMMON"
+    memo: str = ""
+    deleted: bool = False
+    treasury_account: Optional[str] = None
+    created_timestamp: Optional[str] = None
+    timestamp: Optional[datetime] = None
 
 
-def create_tables(conn: duckdb.DuckDBPyConnection) -> None:
-    """Create all database tables."""
+class HederaTokenBatch:
+    """Columnar batch of token snapshots.
     
-    # HBAR metrics table
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS hbar_metrics (
-            timestamp TIMESTAMP NOT NULL,
-            price_usd DOUBLE NOT NULL,
-            market_cap DOUBLE NOT NULL,
-            volume_24h DOUBLE NOT NULL,
-            price_change_24h DOUBLE NOT NULL,
-            circulating_supply DOUBLE NOT NULL,
-            market_cap_rank INTEGER NOT NULL,
-            PRIMARY KEY (timestamp)
-        )
-    """)
+    Each field is held in its own list, so a whole batch becomes an Arrow
+    table with one conversion per column instead of one tuple per token.
+    Snapshot timestamps are assigned when the batch is saved.
+    """
     
-    # Hedera network metrics table
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS hedera_network_metrics (
-            id INTEGER PRIMARY KEY,
-            timestamp TIMESTAMP NOT NULL,
-            tps DOUBLE NOT NULL,
-            transactions_24h INTEGER NOT NULL,
-            average_fee DOUBLE NOT NULL,
-            consensus_nodes INTEGER NOT NULL
-        )
-    """)
+    __slots__ = ("columns",)
     
-    # Hedera tokens table  
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS hedera_tokens (
-            timestamp TIMESTAMP NOT NULL,
-            token_id VARCHAR NOT NULL,
-            name VARCHAR NOT NULL,
-            symbol VARCHAR NOT NULL,
-            price_usd DOUBLE,
-            market_cap DOUBLE,
-            volume_24h DOUBLE,
-            price_change_24h DOUBLE,
-            decimals INTEGER DEFAULT 0,
-            total_supply BIGINT DEFAULT 0,
-            holders_count INTEGER,
-            transfers_24h INTEGER,
-            token_type VARCHAR DEFAULT 'FUNGIBLE_COMMON',
-            memo VARCHAR DEFAULT '',
-            PRIMARY KEY (timestamp, token_id)
-        )
-    """)
+    # Column names and pyarrow type factories; pyarrow is only imported by to_arrow
+    FIELDS = (
+        ("token_id", "string"),
+        ("name", "string"),
+        ("symbol", "string"),
+        ("price_usd", "float64"),
+        ("market_cap", "float64"),
+        ("volume_24h", "float64"),
+        ("price_change_24h", "float64"),
+        ("decimals", "int32"),
+        ("total_supply", "int64"),
+        ("holders_count", "int32"),
+        ("transfers_24h", "int32"),
+        ("token_type", "string"),
+        ("memo", "string"),
+        ("deleted", "bool_"),
+        ("treasury_account", "string"),
+        ("created_timestamp", "string"),
+    )
+    
+    def __init__(self) -> None:
+        self.columns: Dict[str, List[Any]] = {name: [] for name, _ in self.FIELDS}
     
-    # Create indexes for performance
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_hbar_timestamp ON hbar_metrics(timestamp)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_network_timestamp ON hedera_network_metrics(timestamp)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_tokens_timestamp ON hedera_tokens(timestamp)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_tokens_symbol ON hedera_tokens(symbol)")
\ No newline at end of file
+    @classmethod
+    def from_records(cls, records: List[HederaTokenMetrics]) -> "HederaTokenBatch":
+        """Build a batch from token records."""
+        batch = cls()
+        for record in records:
+            batch.append(record)
+        return batch
+    
+    def append(self, record: HederaTokenMetrics) -> None:
+        """Append one token record to the batch."""
+        for name, column in self.columns.items():
+            column.append(getattr(record, name))
+    
+    def update(self, index: int, **values: Any) -> None:
+        """Overwrite fields of the token at ``index``."""
+        for name, value in values.items():
+            self.columns[name][index] = value
+    
+    def __len__(self) -> int:
+        return len(self.columns["token_id"])
+    
+    def __iter__(self) -> Iterator[HederaTokenMetrics]:
+        names = [name for name, _ in self.FIELDS]
+        for row in zip(*(self.columns[name] for name in names), strict=True):
+            yield HederaTokenMetrics(**dict(zip(names, row, strict=True)))
+    
+    @classmethod
+    def arrow_schema(cls) -> "pa.Schema":
+        """Arrow schema of the batch columns."""
+        import pyarrow as pa
+        return pa.schema([(name, getattr(pa, type_name)()) for name, type_name in cls.FIELDS])
+    
+    def to_arrow(self) -> "pa.Table":
+        """Convert the batch to an Arrow table without per-row repacking."""
+        import pyarrow as pa
+        schema = self.arrow_schema()
+        return pa.table(
+            [pa.array(self.columns[field.name], type=field.type) for field in schema],
+            schema=schema,
+        )
@@ -0,0 +1,463 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+# Python types accepted for each parameter SQL type
+PARAM_TYPES: Dict[str, Tuple[type, ...]] = {
+    "TIMESTAMP": (datetime,),
+    "INTEGER": (int,),
+    "BIGINT": (int,),
+    "DOUBLE": (int, float),
+    "VARCHAR": (str,),
+    "VARCHAR[]": (list, tuple),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class NamedQuery:
+    """A hot query prepared once per connection and executed by name.
+
+    ``sql`` refers to parameters positionally as ``$1..$n``, in the order of
+    ``params``, which pairs each parameter name with its SQL type.
+    """
+    name: str
+    sql: str
+    params: Tuple[Tuple[str, str], ...] = ()
+
+    @property
+    def statement(self) -> str:
+        """Name of the prepared statement on the connection."""
+        return f"q_{self.name}"
+
+
+QUERIES: Dict[str, NamedQuery] = {}
+
+
+def register_query(name: str, sql: str, params: Tuple[Tuple[str, str], ...] = ()) -> NamedQuery:
+    """Add a query to the registry."""
+    if name in QUERIES:
+        raise ValueError(f"Query already registered: {name}")
+    for param, sql_type in params:
+        if sql_type not in PARAM_TYPES:
+            raise ValueError(f"Unsupported type {sql_type} for parameter {param} of query {name}")
+
+    query = NamedQuery(name=name, sql=sql, params=params)
+    QUERIES[name] = query
+    return query
+
+
+def _quote(value: str) -> str:
+    if "\x00" in value:
+        raise ValueError("String parameters must not contain NUL characters")
+    return "'" + value.replace("'", "''") + "'"
+
+
+def render_literal(value: Any, sql_type: str) -> str:
+    """Render a Python value as a typed SQL literal.
+
+    DuckDB's ``EXECUTE`` does not accept bound parameters, so arguments are
+    inlined. Values are checked against the declared type first; anything
+    else is rejected rather than coerced.
+    """
+    if value is None or isinstance(value, bool) or not isinstance(value, PARAM_TYPES[sql_type]):
+        raise TypeError(f"Expected {sql_type} parameter, got {type(value).__name__}")
+
+    if sql_type == "TIMESTAMP":
+        if value.tzinfo is not None:
+            raise TypeError("TIMESTAMP parameters must be naive UTC datetimes")
+        return f"TIMESTAMP '{value.isoformat(sep=' ')}'"
+    if sql_type in ("INTEGER", "BIGINT"):
+        return f"{int(value)}::{sql_type}"
+    if sql_type == "DOUBLE":
+        if not math.isfinite(value):
+            raise ValueError("DOUBLE parameters must be finite")
+        return f"{float(value)!r}::DOUBLE"
+    if sql_type == "VARCHAR":
+        return _quote(value)
+
+    # VARCHAR[]
+    for item in value:
+        if not isinstance(item, str):
+            raise TypeError(f"Expected VARCHAR[] items, got {type(item).__name__}")
+    return "[" + ", ".join(_quote(item) for item in value) + "]::VARCHAR[]"
+
+
+def render_execute(query: NamedQuery, arguments: Dict[str, Any]) -> str:
+    """Build the ``EXECUTE`` statement for a prepared query."""
+    expected = [param for param, _ in query.params]
+    if set(arguments) != set(expected):
+        missing = sorted(set(expected) - set(arguments))
+        unexpected = sorted(set(arguments) - set(expected))
+        raise ValueError(f"Query {query.name} parameter mismatch: missing {missing}, unexpected {unexpected}")
+
+    if not query.params:
+        return f"EXECUTE {query.statement}"
+
+    literals = ", ".join(render_literal(arguments[param], sql_type) for param, sql_type in query.params)
+    return f"EXECUTE {query.statement}({literals})"
+
+
+# HBAR
+#
+# hbar_metrics and hedera_tokens store one row per run of identical
+# snapshots: ``timestamp`` is when the values were first fetched,
+# ``valid_to`` the last fetch that confirmed them and ``samples`` the number
+# of fetches in between. Readers report the latest confirmation as the
+# current timestamp, emit both ends of each run as raw points and carry runs
+# forward into every bucket they cover.
+
+register_query(
+    "hbar_latest",
+    """
+        SELECT valid_to, price_usd, market_cap, volume_24h, price_change_24h,
+               circulating_supply, market_cap_rank
+        FROM hbar_metrics
+        ORDER BY timestamp DESC
+        LIMIT 1
+    """,
+)
+
+# The cutoff is bound as a constant so it is pushed into the scan
+register_query(
+    "hbar_price_history",
+    """
+        SELECT point AS timestamp, price_usd, volume_24h
+        FROM (
+            SELECT
+                unnest(CASE WHEN valid_to > GREATEST(timestamp, $1)
+                            THEN [GREATEST(timestamp, $1), valid_to]
+                            ELSE [valid_to] END) AS point,
+                price_usd, volume_24h
+            FROM hbar_metrics
+            WHERE valid_to >= $1
+        )
+        ORDER BY point ASC
+    """,
+    (("since", "TIMESTAMP"),),
+)
+
+# Runs loaded into the in-memory recent history buffer
+register_query(
+    "hbar_recent_runs",
+    """
+        SELECT epoch_us(timestamp), epoch_us(valid_to), price_usd, volume_24h
+        FROM hbar_metrics
+        WHERE valid_to >= $1
+        ORDER BY timestamp ASC
+    """,
+    (("since", "TIMESTAMP"),),
+)
+
+register_query(
+    "hbar_stats",
+    """
+        SELECT
+            SUM(samples) as total_records,
+            MIN(price_usd) as min_price,
+            MAX(price_usd) as max_price,
+            SUM(price_usd * samples) / SUM(samples) as avg_price,
+            MIN(timestamp) as first_record,
+            MAX(valid_to) as last_record
+        FROM hbar_metrics
+        WHERE valid_to >= $1
+    """,
+    (("since", "TIMESTAMP"),),
+)
+
+# Rolls hbar_metrics up to one closing price per bucket, then derives every
+# window metric except EMA, which has no DuckDB window function. The close
+# of a bucket is the last run starting before its end, as long as that run
+# still covers the bucket; buckets in fetch gaps are left out.
+register_query(
+    "hbar_rollup_analytics",
+    """
+        WITH runs AS (
+            SELECT timestamp, valid_to, price_usd
+            FROM hbar_metrics
+            WHERE valid_to >= $2
+        ),
+        grid AS (
+            SELECT unnest(generate_series(
+                date_trunc($1, GREATEST(MIN(timestamp), $2)),
+                date_trunc($1, MAX(valid_to)),
+                ('1 ' || $1)::INTERVAL
+            )) AS bucket
+            FROM runs
+        ),
+        buckets AS (
+            SELECT g.bucket, r.price_usd AS close
+            FROM grid g
+            ASOF JOIN runs r ON g.bucket + ('1 ' || $1)::INTERVAL > r.timestamp
+            WHERE r.valid_to >= g.bucket
+        ),
+        returns AS (
+            SELECT
+                bucket,
+                close,
+                close / lag(close) OVER (ORDER BY bucket) - 1 AS ret
+            FROM buckets
+        )
+        SELECT
+            bucket,
+            close,
+            ret,
+            avg(close) OVER w AS sma,
+            stddev_samp(ret) OVER w AS volatility,
+            close / max(close) OVER (ORDER BY bucket ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) - 1 AS drawdown
+        FROM returns
+        WINDOW w AS (ORDER BY bucket ROWS BETWEEN $3 PRECEDING AND CURRENT ROW)
+        ORDER BY bucket
+    """,
+    (("resolution", "VARCHAR"), ("since", "TIMESTAMP"), ("preceding", "INTEGER")),
+)
+
+# A gap is a stretch between the end of one run and the start of the next
+# that is longer than the scheduler could leave while backing off. The scan
+# starts at a constant row timestamp so earlier row groups are skipped.
+register_query(
+    "hbar_gaps",
+    """
+        SELECT gap_start, gap_end
+        FROM (
+            SELECT lag(valid_to) OVER (ORDER BY timestamp) AS gap_start, timestamp AS gap_end
+            FROM hbar_metrics
+            WHERE timestamp >= $1
+        )
+        WHERE gap_end > gap_start + to_seconds($2)
+        ORDER BY gap_start
+    """,
+    (("since", "TIMESTAMP"), ("threshold_seconds", "BIGINT")),
+)
+
+# Market
+
+register_query(
+    "market_global_latest",
+    """
+        SELECT timestamp, total_market_cap_usd, total_volume_usd, market_cap_change_24h,
+               btc_dominance, eth_dominance, active_cryptocurrencies, markets
+        FROM market_global
+        ORDER BY timestamp DESC
+        LIMIT 1
+    """,
+)
+
+register_query(
+    "market_trending_latest",
+    """
+        SELECT timestamp, rank, coin_id, name, symbol, market_cap_rank, price_btc, thumb
+        FROM market_trending
+        WHERE timestamp = (SELECT MAX(timestamp) FROM market_trending)
+        ORDER BY rank ASC
+    """,
+)
+
+# Tokens
+
+# Ranked over token_state, which holds each live token's latest snapshot, so
+# the top-N is exact and taken before the join to metadata
+register_query(
+    "tokens_top",
+    """
+        SELECT s.token_id, t.name, s.symbol, s.price_usd, s.market_cap, s.volume_24h,
+               s.price_change_24h, t.decimals, s.total_supply, s.holders_count,
+               s.transfers_24h, s.token_type, t.memo, s.updated_at
+        FROM (
+            SELECT *
+            FROM token_state
+            ORDER BY COALESCE(holders_count, -1) DESC, COALESCE(total_supply, -1) DESC, token_num
+            LIMIT $1
+        ) s
+        JOIN tokens t ON t.token_id = s.token_id
+        ORDER BY COALESCE(s.holders_count, -1) DESC, COALESCE(s.total_supply, -1) DESC, s.token_num
+    """,
+    (("limit", "INTEGER"),),
+)
+
+# Listing sort keys: SQL expression and parameter type of the keyset value.
+# Missing numbers sort as -1 so every row has a comparable key.
+TOKEN_SORT_KEYS: Dict[str, Tuple[str, str]] = {
+    "holders": ("COALESCE(holders_count, -1)", "BIGINT"),
+    "supply": ("COALESCE(total_supply, -1)", "BIGINT"),
+    "market_cap": ("COALESCE(market_cap, -1)", "DOUBLE"),
+    "symbol": ("COALESCE(symbol, '')", "VARCHAR"),
+}
+
+# Keyset pages over token_state, one query per sort key and direction. The
+# page starts after the (sort key, token_num) of the previous page's last
+# row, so every page is a filtered top-N of the same cost; an empty
+# token_type, min_holders of 0 and has_cursor of 0 disable their filters.
+for _sort, (_key, _key_type) in TOKEN_SORT_KEYS.items():
+    for _order, _cmp in (("asc", ">"), ("desc", "<")):
+        register_query(
+            f"tokens_page_{_sort}_{_order}",
+            f"""
+                SELECT s.token_id, t.name, s.symbol, s.price_usd, s.market_cap, s.volume_24h,
+                       s.price_change_24h, t.decimals, s.total_supply, s.holders_count,
+                       s.transfers_24h, s.token_type, t.memo, s.updated_at, s.sort_key, s.token_num
+                FROM (
+                    SELECT *, {_key} AS sort_key
+                    FROM token_state
+                    WHERE ($1 = '' OR token_type = $1)
+                      AND ($2 <= 0 OR holders_count >= $2)
+                      AND ($3 = 0 OR {_key} {_cmp} $4 OR ({_key} = $4 AND token_num {_cmp} $5))
+                    ORDER BY sort_key {_order}, token_num {_order}
+                    LIMIT $6
+                ) s
+                JOIN tokens t ON t.token_id = s.token_id
+                ORDER BY s.sort_key {_order}, s.token_num {_order}
+            """,
+            (
+                ("token_type", "VARCHAR"),
+                ("min_holders", "BIGINT"),
+                ("has_cursor", "INTEGER"),
+                ("after_key", _key_type),
+                ("after_num", "BIGINT"),
+                ("limit", "INTEGER"),
+            ),
+        )
+
+register_query(
+    "token_latest",
+    """
+        SELECT s.token_id, t.name, t.symbol, s.price_usd, s.market_cap, s.volume_24h,
+               s.price_change_24h, t.decimals, s.total_supply, s.holders_count,
+               s.transfers_24h, t.token_type, t.memo, s.valid_to
+        FROM (
+            SELECT token_id, price_usd, market_cap, volume_24h, price_change_24h,
+                   total_supply, holders_count, transfers_24h, timestamp, valid_to
+            FROM hedera_tokens
+            WHERE token_id = $1
+            ORDER BY timestamp DESC
+            LIMIT 1
+        ) s
+        JOIN tokens t ON t.token_id = s.token_id
+    """,
+    (("token_id", "VARCHAR"),),
+)
+
+register_query(
+    "token_history_raw",
+    """
+        SELECT token_id, point AS timestamp, price_usd, market_cap, volume_24h,
+               total_supply, holders_count
+        FROM (
+            SELECT
+                token_id,
+                unnest(CASE WHEN LEAST(valid_to, $3) > GREATEST(timestamp, $2)
+                            THEN [GREATEST(timestamp, $2), LEAST(valid_to, $3)]
+                            ELSE [LEAST(valid_to, $3)] END) AS point,
+                price_usd, market_cap, volume_24h, total_supply, holders_count
+            FROM hedera_tokens
+            WHERE token_id IN (SELECT unnest($1))
+              AND valid_to >= $2 AND timestamp <= $3
+        )
+        ORDER BY token_id, point
+    """,
+    (("token_ids", "VARCHAR[]"), ("start", "TIMESTAMP"), ("end", "TIMESTAMP")),
+)
+
+# Same bucketing as hbar_rollup_analytics, per token
+register_query(
+    "token_history_bucketed",
+    """
+        WITH runs AS (
+            SELECT token_id, timestamp, valid_to, price_usd, market_cap, volume_24h,
+                   total_supply, holders_count
+            FROM hedera_tokens
+            WHERE token_id IN (SELECT unnest($2))
+              AND valid_to >= $3 AND timestamp <= $4
+        ),
+        grid AS (
+            SELECT token_id, unnest(generate_series(
+                date_trunc($1, GREATEST(MIN(timestamp), $3)),
+                date_trunc($1, LEAST(MAX(valid_to), $4)),
+                ('1 ' || $1)::INTERVAL
+            )) AS bucket
+            FROM runs
+            GROUP BY token_id
+        )
+        SELECT g.token_id, g.bucket, r.price_usd, r.market_cap, r.volume_24h,
+               r.total_supply, r.holders_count
+        FROM grid g
+        ASOF JOIN runs r ON g.token_id = r.token_id AND g.bucket + ('1 ' || $1)::INTERVAL > r.timestamp
+        WHERE r.valid_to >= g.bucket
+        ORDER BY g.token_id, g.bucket
+    """,
+    (("resolution", "VARCHAR"), ("token_ids", "VARCHAR[]"), ("start", "TIMESTAMP"), ("end", "TIMESTAMP")),
+)
+
+# Hot tokens every run, plus the cold tokens that are most overdue
+register_query(
+    "tracked_tokens_due",
+    """
+        SELECT token_id FROM tracked_tokens WHERE tier = 'hot'
+        UNION ALL
+        SELECT token_id FROM (
+            SELECT token_id
+            FROM tracked_tokens
+            WHERE tier = 'cold' AND next_refresh_at <= $1
+            ORDER BY next_refresh_at, token_num DESC
+            LIMIT $2
+        )
+    """,
+    (("now", "TIMESTAMP"), ("cold_limit", "INTEGER")),
+)
+
+register_query(
+    "tracked_tokens_summary",
+    """
+        SELECT
+            tier,
+            COUNT(*) AS tokens,
+            COUNT(*) FILTER (WHERE pinned) AS pinned,
+            COUNT(*) FILTER (WHERE last_refreshed_at IS NULL) AS unprobed,
+            COUNT(*) FILTER (WHERE next_refresh_at <= $1) AS due,
+            MAX(activity_score) AS max_score
+        FROM tracked_tokens
+        GROUP BY tier
+        ORDER BY tier
+    """,
+    (("now", "TIMESTAMP"),),
+)
+
+# Scheduler
+
+# Skipped runs do no work, so they are left out of the duration percentiles
+register_query(
+    "scheduler_job_stats",
+    """
+        SELECT
+            job_id,
+            COUNT(*) AS runs,
+            COUNT(*) FILTER (WHERE status = 'failed') AS failures,
+            COUNT(*) FILTER (WHERE status = 'skipped') AS skipped,
+            quantile_cont(duration_ms, 0.5) FILTER (WHERE status <> 'skipped') AS p50_ms,
+            quantile_cont(duration_ms, 0.95) FILTER (WHERE status <> 'skipped') AS p95_ms,
+            MAX(duration_ms) AS max_ms,
+            COUNT(*) FILTER (WHERE duration_ms > interval_seconds * 1000) AS overruns,
+            SUM(rows_written) AS rows_written,
+            SUM(upstream_calls) AS upstream_calls,
+            MAX(started_at) AS last_started_at,
+            arg_max(error, started_at) FILTER (WHERE status = 'failed') AS last_error,
+            arg_max(interval_seconds, started_at) AS interval_seconds
+        FROM scheduler_runs
+        WHERE started_at >= $1
+        GROUP BY job_id
+        ORDER BY job_id
+    """,
+    (("since", "TIMESTAMP"),),
+)
+
+register_query(
+    "scheduler_recent_runs",
+    """
+        SELECT job_id, started_at, finished_at, duration_ms, interval_seconds, status,
+               rows_written, upstream_calls, error
+        FROM scheduler_runs
+        ORDER BY started_at DESC
+        LIMIT $1
+    """,
+    (("limit", "INTEGER"),),
+)
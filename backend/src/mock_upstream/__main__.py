@@ -0,0 +1,39 @@
+import argparse
+
+import uvicorn
+
+from .app import MockUpstreamConfig, create_mock_upstream_app
+
+
+def main() -> None:
+    """Run the mock upstream server from the command line."""
+    parser = argparse.ArgumentParser(description="Mock CoinGecko / Hedera mirror-node server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--balance-pages", type=int, default=1)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--token-count", type=int, default=250)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = MockUpstreamConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        balance_pages=args.balance_pages,
+        page_size=args.page_size,
+        token_count=args.token_count,
+        seed=args.seed,
+    )
+    uvicorn.run(create_mock_upstream_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import asyncio
+import copy
+import json
+import math
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class MockUpstreamConfig(BaseModel):
+    """Fault injection and pagination knobs for the mock upstream server."""
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0  # Fraction of requests answered with a 500
+    rate_limit_rate: float = 0.0  # Fraction of requests answered with a 429
+    retry_after: int = 1  # Retry-After seconds sent with injected 429s
+    balance_pages: int = 1  # Number of /balances pages per token
+    page_size: int = 100  # Maximum balances per page
+    token_count: int = 250  # Fungible tokens listed by /api/v1/tokens
+    first_token_num: int = 9_300_000  # Entity number of the first listed token
+    seed: int = 0
+
+
+def load_fixture(name: str) -> Dict[str, Any]:
+    """Load a recorded upstream response from the fixtures directory."""
+    with open(FIXTURES_DIR / name) as f:
+        return json.load(f)
+
+
+def create_mock_upstream_app(config: Optional[MockUpstreamConfig] = None) -> FastAPI:
+    """Create an ASGI app replaying recorded CoinGecko and mirror-node responses.
+
+    CoinGecko routes live under ``/api/v3`` and mirror-node routes under
+    ``/api/v1``, so a single server can stand in for both upstreams.
+    """
+    app = FastAPI(title="ChainMetrics mock upstream")
+    app.state.config = config or MockUpstreamConfig()
+    app.state.rng = random.Random(app.state.config.seed)
+    app.state.stats = Counter()
+
+    coin_fixture = load_fixture("coin_hedera-hashgraph.json")
+    token_fixture = load_fixture("token_info.json")
+    balances_fixture = load_fixture("token_balances.json")
+    global_fixture = load_fixture("global.json")
+    trending_fixture = load_fixture("search_trending.json")
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if request.url.path.startswith("/__mock__"):
+            return await call_next(request)
+
+        cfg: MockUpstreamConfig = app.state.config
+        rng: random.Random = app.state.rng
+        app.state.stats["requests"] += 1
+
+        delay_ms = cfg.latency_ms + rng.uniform(0, cfg.latency_jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+        if rng.random() < cfg.rate_limit_rate:
+            app.state.stats["status_429"] += 1
+            return JSONResponse(
+                {"status": {"error_code": 429, "error_message": "Rate limit exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(cfg.retry_after)},
+            )
+
+        if rng.random() < cfg.error_rate:
+            app.state.stats["status_500"] += 1
+            return JSONResponse({"error": "Injected upstream failure"}, status_code=500)
+
+        return await call_next(request)
+
+    @app.get("/api/v3/global")
+    async def global_data():
+        return copy.deepcopy(global_fixture)
+
+    @app.get("/api/v3/search/trending")
+    async def trending():
+        return copy.deepcopy(trending_fixture)
+
+    @app.get("/api/v3/coins/markets")
+    async def coins_markets(
+        vs_currency: str = "usd",
+        ids: str = "",
+        per_page: int = Query(default=100, ge=1, le=250),
+        page: int = Query(default=1, ge=1),
+    ):
+        coin_ids = [coin_id for coin_id in ids.split(",") if coin_id][(page - 1) * per_page:page * per_page]
+        market_data = coin_fixture["market_data"]
+        markets = []
+        for coin_id in coin_ids:
+            # Deterministic per-coin price so batches are reproducible
+            price = (sum(map(ord, coin_id)) % 1000) / 100 or 0.01
+            markets.append({
+                "id": coin_id,
+                "symbol": coin_id[:4],
+                "name": coin_id.replace("-", " ").title(),
+                "current_price": price,
+                "market_cap": price * 1_000_000_000,
+                "market_cap_rank": market_data["market_cap_rank"],
+                "total_volume": price * 10_000_000,
+                "price_change_percentage_24h": market_data["price_change_percentage_24h"],
+                "circulating_supply": 1_000_000_000,
+                "last_updated": market_data["last_updated"],
+            })
+        return markets
+
+    @app.get("/api/v3/coins/list")
+    async def coins_list(include_platform: bool = False):
+        # Every tenth listed token has a coin, as most Hedera tokens aren't on CoinGecko
+        cfg: MockUpstreamConfig = app.state.config
+        coins = [
+            {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "platforms": {}},
+            {"id": "usd-coin", "symbol": "usdc", "name": "USDC",
+             "platforms": {"ethereum": "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48", "hedera-hashgraph": "0.0.456858"}},
+            {"id": "saucerswap", "symbol": "sauce", "name": "SaucerSwap", "platforms": {"hedera-hashgraph": "0.0.731861"}},
+        ]
+        for num in range(cfg.first_token_num, cfg.first_token_num + cfg.token_count, 10):
+            coins.append({
+                "id": f"mock-token-{num}",
+                "symbol": f"mt{num}",
+                "name": f"Mock Token {num}",
+                "platforms": {"hedera-hashgraph": f"0.0.{num}"},
+            })
+        if not include_platform:
+            for coin in coins:
+                del coin["platforms"]
+        return coins
+
+    @app.get("/api/v3/coins/{coin_id}")
+    async def coin(coin_id: str):
+        data = copy.deepcopy(coin_fixture)
+        data["id"] = coin_id
+        return data
+
+    @app.get("/api/v3/coins/{coin_id}/market_chart/range")
+    async def market_chart_range(
+        coin_id: str,
+        vs_currency: str = "usd",
+        from_ts: int = Query(alias="from"),
+        to_ts: int = Query(alias="to"),
+    ):
+        # Like CoinGecko, 5-minute points for ranges within the last day and
+        # hourly ones otherwise; deterministic in the timestamp so re-runs line up
+        step = 300 if from_ts >= time.time() - 86400 else 3600
+        start = from_ts - from_ts % step + step
+        prices, market_caps, total_volumes = [], [], []
+        for ts in range(start, to_ts + 1, step):
+            price = 0.06 + 0.01 * math.sin(ts / 86400)
+            ts_ms = ts * 1000
+            prices.append([ts_ms, price])
+            market_caps.append([ts_ms, price * 35_100_000_000])
+            total_volumes.append([ts_ms, 45_000_000 + 5_000_000 * math.cos(ts / 43200)])
+        return {"prices": prices, "market_caps": market_caps, "total_volumes": total_volumes}
+
+    @app.get("/api/v1/tokens")
+    async def tokens_list(
+        limit: int = Query(default=25, ge=1, le=100),
+        order: str = Query(default="asc", pattern="^(asc|desc)$"),
+        token_filter: Optional[str] = Query(default=None, alias="token.id"),
+    ):
+        cfg: MockUpstreamConfig = app.state.config
+        nums = range(cfg.first_token_num, cfg.first_token_num + cfg.token_count)
+
+        # Only the ``gt:`` filter used for cursors is supported
+        if token_filter and token_filter.startswith("gt:"):
+            after = int(token_filter.rsplit(".", 1)[-1])
+            nums = range(max(after + 1, nums.start), nums.stop)
+        if order == "desc":
+            nums = nums[::-1]
+        page = list(nums[:limit])
+
+        next_link = None
+        if order == "asc" and len(page) == limit and page[-1] + 1 < nums.stop:
+            next_link = f"/api/v1/tokens?limit={limit}&order=asc&token.id=gt:0.0.{page[-1]}"
+
+        return {
+            "tokens": [
+                {
+                    "token_id": f"0.0.{num}",
+                    "name": f"Mock Token {num}",
+                    "symbol": f"MT{str(num)[-4:]}",
+                    "decimals": "6",
+                    "type": "FUNGIBLE_COMMON",
+                    "admin_key": None,
+                }
+                for num in page
+            ],
+            "links": {"next": next_link},
+        }
+
+    @app.get("/api/v1/tokens/{token_id}")
+    async def token_info(token_id: str):
+        data = copy.deepcopy(token_fixture)
+        if token_id != data["token_id"]:
+            suffix = token_id.rsplit(".", 1)[-1]
+            data.update(name=f"Mock Token {suffix}", symbol=f"MT{suffix[-4:]}")
+        data["token_id"] = token_id
+        return data
+
+    @app.get("/api/v1/tokens/{token_id}/balances")
+    async def token_balances(
+        token_id: str,
+        limit: int = Query(default=25, ge=1, le=1000),
+        account_id: Optional[str] = Query(default=None, alias="account.id"),
+    ):
+        cfg: MockUpstreamConfig = app.state.config
+        page_size = min(limit, cfg.page_size)
+
+        # Cursors follow the mirror node's ``account.id=gt:<id>`` convention.
+        start = 0
+        if account_id and account_id.startswith("gt:"):
+            start = int(account_id.rsplit(".", 1)[-1]) - 1000 + 1
+        page = start // page_size if page_size else 0
+
+        template = balances_fixture["balances"]
+        balances = []
+        for i in range(start, start + page_size):
+            entry = dict(template[i % len(template)])
+            entry["account"] = f"0.0.{1000 + i}"
+            balances.append(entry)
+
+        next_link = None
+        if page + 1 < cfg.balance_pages:
+            last_account = balances[-1]["account"]
+            next_link = f"/api/v1/tokens/{token_id}/balances?limit={limit}&account.id=gt:{last_account}"
+
+        return {
+            "timestamp": balances_fixture["timestamp"],
+            "balances": balances,
+            "links": {"next": next_link},
+        }
+
+    @app.get("/__mock__/config")
+    async def get_config():
+        return app.state.config
+
+    @app.post("/__mock__/config")
+    async def update_config(config: MockUpstreamConfig):
+        app.state.config = config
+        app.state.rng = random.Random(config.seed)
+        return config
+
+    @app.get("/__mock__/stats")
+    async def get_stats():
+        return dict(app.state.stats)
+
+    @app.post("/__mock__/reset")
+    async def reset_stats():
+        app.state.stats.clear()
+        app.state.rng = random.Random(app.state.config.seed)
+        return {"message": "Mock upstream stats reset"}
+
+    return app
@@ -0,0 +1,49 @@
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI
+
+
+class MockUpstreamServer:
+    """Runs the mock upstream app with uvicorn on a background thread."""
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port or self._free_port(host)
+        config = uvicorn.Config(app, host=host, port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @staticmethod
+    def _free_port(host: str) -> int:
+        with socket.socket() as sock:
+            sock.bind((host, 0))
+            return sock.getsockname()[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def coingecko_url(self) -> str:
+        """Value for ``COINGECKO_BASE_URL`` pointing at this server."""
+        return f"{self.url}/api/v3"
+
+    @property
+    def mirror_node_url(self) -> str:
+        """Value for ``HEDERA_MIRROR_NODE_URL`` pointing at this server."""
+        return self.url
+
+    def start(self) -> None:
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Mock upstream server failed to start")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
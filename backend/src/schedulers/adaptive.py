@@ -0,0 +1,224 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+from ..config import settings
+from ..data_fetchers.base_fetcher import (
+    count_upstream_calls,
+    get_rate_limiter,
+    track_progress,
+)
+from ..database.connection import db_manager
+
+if TYPE_CHECKING:
+    from apscheduler.triggers.interval import IntervalTrigger
+
+
+@dataclass(frozen=True, slots=True)
+class JobOutcome:
+    """What a scheduled fetch produced, used to adapt its interval."""
+    fingerprint: str  # Digest of the fetched payload, excluding fetch timestamps
+    value: Optional[float] = None  # Tracked price; moves above the threshold speed the job up
+    rows_written: int = 0
+
+
+class JobFailed(Exception):
+    """Raised by a job for a failed run with no underlying exception, e.g. an empty upstream response."""
+
+
+def fingerprint(*parts: Any) -> str:
+    """Digest of a payload's significant fields."""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def coingecko_budget_remaining() -> int:
+    """Requests left in the shared CoinGecko rate window."""
+    limiter = get_rate_limiter(settings.coingecko.base_url.rstrip("/"))
+    return limiter.remaining(settings.coingecko.requests_per_minute)
+
+
+class AdaptiveJob:
+    """Scheduled job wrapper that times runs and adapts the job's interval.
+
+    In adaptive mode the interval doubles (up to ``max_backoff`` times the
+    base interval) while successive runs fetch identical payloads, drops below
+    the base (down to ``min_interval_factor`` of it) when the tracked value
+    moves by more than the volatility threshold, and otherwise returns to the
+    base interval.
+    Exceptions raised by the job fail the run and are recorded as its error.
+    Low-priority jobs skip their run while the CoinGecko budget is low.
+    Runs are single-flight: calling ``run`` while a run is in progress, e.g.
+    for a manual refresh, waits for that run instead of starting another.
+    """
+
+    def __init__(self, job_id: str, func: Callable[[], Awaitable[Optional[JobOutcome]]],
+                 interval: int, low_priority: bool = False):
+        self.job_id = job_id
+        self.func = func
+        self.base_interval = interval
+        self.interval = interval
+        self.low_priority = low_priority
+        self.scheduler = None
+        self.progress: Optional[Dict[str, Any]] = None  # Live progress of the current or last run
+        self.last_error: Optional[str] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._last_fingerprint: Optional[str] = None
+        self._last_value: Optional[float] = None
+        self.stats: Dict[str, Any] = {
+            "runs": 0,
+            "failures": 0,
+            "skipped": 0,
+            "unchanged_runs": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "last_ms": None,
+            "last_run": None,
+        }
+
+    def trigger(self, start_date: Optional[datetime] = None) -> "IntervalTrigger":
+        """Interval trigger for the current interval with jitter."""
+        from apscheduler.triggers.interval import IntervalTrigger
+
+        jitter = int(self.interval * settings.updates.jitter_fraction) or None
+        return IntervalTrigger(seconds=self.interval, start_date=start_date, jitter=jitter)
+
+    @property
+    def running(self) -> bool:
+        """Whether a run is in progress."""
+        return self._inflight is not None and not self._inflight.done()
+
+    async def run(self) -> Optional[JobOutcome]:
+        """Run the job once, or wait for the run already in progress."""
+        if not self.running:
+            self._inflight = asyncio.ensure_future(self._run())
+        # Shielded so a cancelled caller doesn't cancel the run for the others
+        return await asyncio.shield(self._inflight)
+
+    async def _run(self) -> Optional[JobOutcome]:
+        """Run the job once, unless paused for budget, and adapt its interval."""
+        started_at = datetime.utcnow()
+        if self.low_priority and coingecko_budget_remaining() < settings.updates.low_budget_threshold:
+            self.stats["skipped"] += 1
+            logger.info(f"Skipping {self.job_id}: CoinGecko budget low")
+            self.last_error = "CoinGecko budget low"
+            self._record_run(started_at, 0.0, "skipped", error=self.last_error)
+            return None
+
+        interval = self.interval
+        error = None
+        start = time.perf_counter()
+        self.stats["last_run"] = started_at
+        with count_upstream_calls() as upstream_calls, track_progress() as self.progress:
+            try:
+                outcome = await self.func()
+            except Exception as e:
+                error = str(e) if isinstance(e, JobFailed) else f"{type(e).__name__}: {e}"
+                logger.error(f"Scheduled job {self.job_id} failed: {error}")
+                outcome = None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.stats["runs"] += 1
+        self.stats["total_ms"] += elapsed_ms
+        self.stats["max_ms"] = max(self.stats["max_ms"], elapsed_ms)
+        self.stats["last_ms"] = elapsed_ms
+        if elapsed_ms > interval * 1000:
+            logger.warning(f"Job {self.job_id} overran its {interval}s interval: {elapsed_ms / 1000:.1f}s")
+
+        if outcome is None:
+            self.stats["failures"] += 1
+            self.last_error = error or "No data saved"
+            self._record_run(
+                started_at, elapsed_ms, "failed", interval,
+                upstream_calls=sum(upstream_calls.values()), error=self.last_error,
+            )
+            return None
+        self.last_error = None
+
+        self._record_run(
+            started_at, elapsed_ms, "ok", interval,
+            rows_written=outcome.rows_written, upstream_calls=sum(upstream_calls.values()),
+        )
+        if settings.updates.adaptive:
+            self._adapt(outcome)
+        return outcome
+
+    def _record_run(self, started_at: datetime, duration_ms: float, status: str,
+                    interval: Optional[int] = None, rows_written: int = 0, upstream_calls: int = 0,
+                    error: Optional[str] = None) -> None:
+        """Persist one run to ``scheduler_runs``; failures here never fail the job."""
+        try:
+            db_manager.execute(
+                """
+                INSERT INTO scheduler_runs
+                (job_id, started_at, finished_at, duration_ms, interval_seconds, status,
+                 rows_written, upstream_calls, error)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    self.job_id, started_at, datetime.utcnow(), duration_ms, interval or self.interval,
+                    status, rows_written, upstream_calls, error,
+                ),
+            )
+            db_manager.bump_version("scheduler_runs")
+        except Exception as e:
+            logger.error(f"Failed to record run of {self.job_id}: {e}")
+
+    def _adapt(self, outcome: JobOutcome) -> None:
+        """Pick the next interval from the outcome and reschedule if it changed."""
+        if outcome.fingerprint == self._last_fingerprint:
+            self.stats["unchanged_runs"] += 1
+            interval = min(self.interval * 2, self.base_interval * settings.updates.max_backoff)
+        else:
+            self.stats["unchanged_runs"] = 0
+            interval = self.base_interval
+            if outcome.value is not None and self._last_value:
+                change_pct = abs(outcome.value - self._last_value) / self._last_value * 100
+                if change_pct >= settings.updates.volatility_threshold_pct:
+                    interval = max(
+                        min(self.interval, self.base_interval) // 2,
+                        int(self.base_interval * settings.updates.min_interval_factor),
+                    )
+
+        self._last_fingerprint = outcome.fingerprint
+        if outcome.value is not None:
+            self._last_value = outcome.value
+
+        if interval != self.interval:
+            logger.info(f"Rescheduling {self.job_id}: {self.interval}s -> {interval}s")
+            self.interval = interval
+            if self.scheduler is not None:
+                self.scheduler.reschedule_job(self.job_id, trigger=self.trigger())
+
+    def defer_next_run(self) -> None:
+        """Push the next scheduled run a full interval out, e.g. after a manual run."""
+        if self.scheduler is None:
+            return
+        job = self.scheduler.get_job(self.job_id)
+        if job is not None and job.next_run_time is not None:
+            next_run = datetime.now(self.scheduler.timezone) + timedelta(seconds=self.interval)
+            if job.next_run_time < next_run:
+                self.scheduler.modify_job(self.job_id, next_run_time=next_run)
+
+    def status(self) -> Dict[str, Any]:
+        """Timing and interval stats for ``get_scheduler_status``."""
+        runs = self.stats["runs"]
+        return {
+            "func": self.func.__name__,
+            "base_interval": self.base_interval,
+            "interval": self.interval,
+            "low_priority": self.low_priority,
+            "running": self.running,
+            "runs": runs,
+            "failures": self.stats["failures"],
+            "skipped": self.stats["skipped"],
+            "unchanged_runs": self.stats["unchanged_runs"],
+            "last_run": self.stats["last_run"],
+            "last_ms": round(self.stats["last_ms"], 3) if self.stats["last_ms"] is not None else None,
+            "mean_ms": round(self.stats["total_ms"] / runs, 3) if runs else None,
+            "max_ms": round(self.stats["max_ms"], 3),
+        }
@@ -0,0 +1,140 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from ..config import settings
+from .adaptive import AdaptiveJob
+from .tasks import adaptive_jobs, fetch_and_save_hbar_data, fetch_and_save_token_data
+
+# Finished refresh jobs kept for status polling
+MAX_FINISHED_JOBS = 100
+
+
+@dataclass(slots=True)
+class RefreshJob:
+    """A manually requested refresh, polled through ``/jobs/{job_id}``."""
+    job_id: str
+    kind: str
+    target: AdaptiveJob
+    joined_run: bool = False  # Attached to a run that was already in progress
+    status: str = "queued"  # queued, running, succeeded or failed
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: Optional[Dict[str, Any]] = None
+    rows_written: Optional[int] = None
+    value: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Job status as returned by the API."""
+        progress = self.target.progress if self.status == "running" else self.progress
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "ingest_job": self.target.job_id,
+            "status": self.status,
+            "joined_run": self.joined_run,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": dict(progress) if progress and progress["total"] is not None else None,
+            "result": {"rows_written": self.rows_written, "value": self.value}
+            if self.status == "succeeded" else None,
+            "error": self.error,
+        }
+
+
+class RefreshJobManager:
+    """Runs manual refreshes in the background through the ingestion jobs.
+
+    A refresh executes the same ``AdaptiveJob`` the scheduler uses, so it
+    is timed, recorded in ``scheduler_runs`` and joins a scheduled run that
+    is already in progress instead of fetching twice. While a refresh of a
+    kind is queued or running, further requests get the same job. After a
+    successful manual run the next scheduled run is pushed a full interval
+    out.
+    """
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, RefreshJob]" = OrderedDict()
+        self._active: Dict[str, RefreshJob] = {}
+        self._tasks: Set[asyncio.Task] = set()  # Referenced so running jobs aren't garbage collected
+        # Used while the schedulers are not running
+        self._standalone: Dict[str, AdaptiveJob] = {}
+
+    def _target(self, kind: str) -> AdaptiveJob:
+        job_id, func, interval = {
+            "hbar": ("hbar_data_fetch", fetch_and_save_hbar_data, settings.updates.hbar_interval),
+            "tokens": ("token_data_fetch", fetch_and_save_token_data, settings.updates.tokens_interval),
+        }[kind]
+        if job_id in adaptive_jobs:
+            return adaptive_jobs[job_id]
+        if job_id not in self._standalone:
+            self._standalone[job_id] = AdaptiveJob(job_id, func, interval)
+        return self._standalone[job_id]
+
+    def submit(self, kind: str) -> Tuple[RefreshJob, bool]:
+        """Queue a refresh of ``hbar`` or ``tokens``.
+
+        Returns the job and whether it was newly created rather than an
+        already queued or running one.
+        """
+        active = self._active.get(kind)
+        if active is not None:
+            return active, False
+
+        target = self._target(kind)
+        job = RefreshJob(uuid.uuid4().hex, kind, target, joined_run=target.running)
+        self._jobs[job.job_id] = job
+        self._active[kind] = job
+        task = asyncio.create_task(self._execute(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self._prune()
+        logger.info(f"Queued {kind} refresh job {job.job_id}")
+        return job, True
+
+    async def _execute(self, job: RefreshJob) -> None:
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        try:
+            outcome = await job.target.run()
+        except Exception as e:
+            logger.error(f"Refresh job {job.job_id} failed: {e}")
+            outcome, job.error = None, str(e)
+
+        job.finished_at = datetime.utcnow()
+        job.progress = dict(job.target.progress) if job.target.progress else None
+        if outcome is not None:
+            job.status = "succeeded"
+            job.rows_written = outcome.rows_written
+            job.value = outcome.value
+            if not job.joined_run:
+                job.target.defer_next_run()
+        else:
+            job.status = "failed"
+            job.error = job.error or job.target.last_error
+        self._active.pop(job.kind, None)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        """A job by ID, if it is still kept."""
+        return self._jobs.get(job_id)
+
+    def recent(self) -> List[RefreshJob]:
+        """Kept jobs, newest first."""
+        return list(reversed(self._jobs.values()))
+
+
+# Global instance
+refresh_jobs = RefreshJobManager()
@@ -1,56 +1,141 @@
-import asyncio
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Optional
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from loguru import logger
 
 from ..config import settings
 from ..data_fetchers.coingecko import CoinGeckoFetcher
-from ..data_fetchers.hedera import hedera_token_fetcher
+from ..data_fetchers.gaps import hbar_gaps
+from ..data_fetchers.hedera import HederaTokenFetcher, hedera_token_fetcher
+from ..data_fetchers.token_universe import token_universe
+from ..database.models import HBARMetrics
+from .adaptive import AdaptiveJob, JobFailed, JobOutcome, fingerprint
+
+# apscheduler is imported when the schedulers start to keep startup fast
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 # Global scheduler instance  
-scheduler: Optional[AsyncIOScheduler] = None
+scheduler: Optional["AsyncIOScheduler"] = None
+
+# Adaptive wrappers of the data jobs, keyed by job id
+adaptive_jobs: Dict[str, AdaptiveJob] = {}
+
+
+def _hbar_fingerprint(hbar_data: HBARMetrics) -> str:
+    """Fingerprint of an HBAR snapshot, ignoring its fetch timestamp."""
+    return fingerprint(
+        hbar_data.price_usd,
+        hbar_data.market_cap,
+        hbar_data.volume_24h,
+        hbar_data.price_change_24h,
+        hbar_data.circulating_supply,
+        hbar_data.market_cap_rank,
+    )
 
 
-async def fetch_and_save_hbar_data():
+async def fetch_and_save_hbar_data() -> JobOutcome:
     """Scheduled task to fetch and save HBAR data."""
-    try:
-        logger.info("Starting scheduled HBAR data fetch")
+    logger.info("Starting scheduled HBAR data fetch")
+    
+    async with CoinGeckoFetcher() as fetcher:
+        hbar_data = await fetcher.fetch_hbar_data()
+        if not hbar_data:
+            raise JobFailed("No HBAR data received from API")
+        if not await fetcher.save_hbar_data(hbar_data):
+            raise JobFailed("Failed to save HBAR data to database")
         
-        async with CoinGeckoFetcher() as fetcher:
-            hbar_data = await fetcher.fetch_hbar_data()
-            if hbar_data:
-                success = await fetcher.save_hbar_data(hbar_data)
-                if success:
-                    logger.info(f"HBAR data saved: ${hbar_data.price_usd:.4f} USD")
-                else:
-                    logger.error("Failed to save HBAR data to database")
-            else:
-                logger.warning("No HBAR data received from API")
-                
-    except Exception as e:
-        logger.error(f"Scheduled HBAR data fetch failed: {e}")
+        logger.info(f"HBAR data saved: ${hbar_data.price_usd:.4f} USD")
+        return JobOutcome(_hbar_fingerprint(hbar_data), hbar_data.price_usd, rows_written=1)
 
 
-async def fetch_and_save_token_data():
-    """Scheduled task to fetch and save Hedera token data."""
-    try:
-        logger.info("Starting scheduled token data fetch")
+async def fetch_and_save_token_data() -> JobOutcome:
+    """Scheduled task to fetch and save data for the tracked tokens due a refresh."""
+    logger.info("Starting scheduled token data fetch")
+    
+    token_universe.seed(hedera_token_fetcher.POPULAR_TOKENS)
+    token_ids = token_universe.due_tokens()
+    
+    async with hedera_token_fetcher:
+        tokens_data = await hedera_token_fetcher.fetch_data(token_ids)
+        token_universe.record_refresh(token_ids, tokens_data)
+        if not tokens_data:
+            raise JobFailed("No token data received from API")
+        if not await hedera_token_fetcher.save_token_data(tokens_data):
+            raise JobFailed("Failed to save token data to database")
         
-        async with hedera_token_fetcher:
-            tokens_data = await hedera_token_fetcher.fetch_data()
-            if tokens_data:
-                success = await hedera_token_fetcher.save_token_data(tokens_data)
-                if success:
-                    logger.info(f"Token data saved: {len(tokens_data)} tokens")
-                else:
-                    logger.error("Failed to save token data to database")
-            else:
-                logger.warning("No token data received from API")
-                
-    except Exception as e:
-        logger.error(f"Scheduled token data fetch failed: {e}")
+        logger.info(f"Token data saved: {len(tokens_data)} tokens")
+        saved = sum(not deleted for deleted in tokens_data.columns["deleted"])
+        return JobOutcome(fingerprint(sorted(tokens_data.columns.items())), rows_written=saved)
+
+
+async def discover_new_tokens() -> JobOutcome:
+    """Scheduled task to add tokens created since the last scan to the tracked set."""
+    logger.info("Starting token discovery")
+    
+    async with HederaTokenFetcher() as fetcher:
+        cursor = token_universe.get_cursor() or settings.hedera.discovery_start_id
+        if not cursor:
+            # First run: start from the newest token rather than the whole history
+            cursor = await fetcher.fetch_latest_token_id()
+            if cursor is None:
+                raise JobFailed("No tokens returned by the mirror node")
+        
+        token_ids, cursor = await fetcher.discover_tokens(
+            cursor, settings.hedera.discovery_max_pages
+        )
+        discovered = token_universe.add_discovered(token_ids, cursor)
+        logger.info(f"Discovered {discovered} new tokens, cursor at {cursor}")
+        return JobOutcome(fingerprint(cursor), rows_written=discovered)
+
+
+async def fetch_and_save_market_data() -> JobOutcome:
+    """Scheduled task to fetch and save global market and trending data.
+    
+    HBAR snapshots are left to ``hbar_data_fetch`` so the CoinGecko budget
+    isn't spent on them twice.
+    """
+    logger.info("Starting scheduled market data fetch")
+    
+    async with CoinGeckoFetcher() as fetcher:
+        market_data = await fetcher.fetch_market_snapshots()
+        timestamp = market_data["timestamp"]
+        
+        # Each part is saved on its own so one failed upstream call doesn't drop the other
+        rows_written = 0
+        if market_data["global"] and await fetcher.save_global_data(market_data["global"], timestamp):
+            rows_written += 1
+        if market_data["trending"] and await fetcher.save_trending_data(market_data["trending"], timestamp):
+            rows_written += len(market_data["trending"])
+        
+        missing = [key for key in ("global", "trending") if not market_data[key]]
+        if len(missing) == 2:
+            raise JobFailed("No market data received from API")
+        if missing:
+            logger.warning(f"Market data fetch incomplete, missing: {', '.join(missing)}")
+        else:
+            logger.info("Market data saved")
+        
+        global_data = {
+            key: value for key, value in (market_data["global"] or {}).items() if key != "updated_at"
+        }
+        return JobOutcome(
+            fingerprint(sorted(global_data.items()), market_data["trending"]),
+            rows_written=rows_written,
+        )
+
+
+async def scan_and_repair_hbar_gaps() -> JobOutcome:
+    """Scheduled task to find new gaps in the HBAR history and refill open ones."""
+    logger.info("Starting HBAR gap scan")
+    
+    found = hbar_gaps.scan()
+    async with CoinGeckoFetcher() as fetcher:
+        inserted = await hbar_gaps.repair(fetcher)
+    
+    open_gaps = len(hbar_gaps.open_gaps(settings.coingecko.gap_repair_max_gaps))
+    logger.info(f"HBAR gaps: {found} found, {inserted} rows refilled, {open_gaps} still open")
+    return JobOutcome(fingerprint(found, inserted, open_gaps), rows_written=inserted)
 
 
 async def log_scheduler_status():
@@ -58,35 +143,51 @@ async def log_scheduler_status():
     logger.info(f"Scheduler status check - {datetime.utcnow()}")
 
 
-async def start_schedulers():
-    """Start all background schedulers."""
+async def start_schedulers(background_initial_fetch: bool = False):
+    """Start all background schedulers.
+    
+    The initial HBAR fetch is awaited unless ``background_initial_fetch`` is
+    set, in which case it runs as a one-off scheduler job.
+    """
     global scheduler
     
     if scheduler is not None:
         logger.warning("Schedulers already running")
         return
     
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    
     scheduler = AsyncIOScheduler()
     
-    # Add HBAR data fetching job
-    scheduler.add_job(
-        fetch_and_save_hbar_data,
-        "interval",
-        seconds=settings.updates.hbar_interval,
-        id="hbar_data_fetch",
-        max_instances=1,
-        coalesce=True,
-    )
+    # Data jobs in priority order; market data only refreshes global/trending
+    # snapshots, so it is the first to give way when the CoinGecko budget runs low
+    jobs = [
+        AdaptiveJob("hbar_data_fetch", fetch_and_save_hbar_data, settings.updates.hbar_interval),
+        AdaptiveJob("token_data_fetch", fetch_and_save_token_data, settings.updates.tokens_interval),
+        AdaptiveJob("token_discovery", discover_new_tokens, settings.hedera.discovery_interval),
+        AdaptiveJob(
+            "market_data_fetch", fetch_and_save_market_data, settings.updates.market_interval, low_priority=True
+        ),
+        AdaptiveJob(
+            "hbar_gap_repair", scan_and_repair_hbar_gaps, settings.coingecko.gap_scan_interval, low_priority=True
+        ),
+    ]
     
-    # Add token data fetching job
-    scheduler.add_job(
-        fetch_and_save_token_data,
-        "interval",
-        seconds=settings.updates.tokens_interval,
-        id="token_data_fetch",
-        max_instances=1,
-        coalesce=True,
-    )
+    # Stagger first runs so jobs don't hit the shared rate budget in lockstep;
+    # jitter keeps them apart after interval changes
+    now = datetime.now()
+    for index, job in enumerate(jobs):
+        job.scheduler = scheduler
+        start_date = now + timedelta(seconds=job.interval + index * settings.updates.stagger_seconds)
+        scheduler.add_job(
+            job.run,
+            trigger=job.trigger(start_date),
+            id=job.job_id,
+            name=job.func.__name__,
+            max_instances=1,
+            coalesce=True,
+        )
+        adaptive_jobs[job.job_id] = job
     
     # Add status logging job (every 30 minutes)
     scheduler.add_job(
@@ -102,8 +203,16 @@ async def start_schedulers():
     logger.info("Background schedulers started successfully")
     
     # Run initial data fetch
+    if background_initial_fetch:
+        scheduler.add_job(
+            adaptive_jobs["hbar_data_fetch"].run,
+            id="initial_hbar_data_fetch",
+            name="fetch_and_save_hbar_data",
+        )
+        return
+    
     try:
-        await fetch_and_save_hbar_data()
+        await adaptive_jobs["hbar_data_fetch"].run()
     except Exception as e:
         logger.error(f"Initial data fetch failed: {e}")
 
@@ -115,6 +224,7 @@ async def stop_schedulers():
     if scheduler is not None:
         scheduler.shutdown(wait=True)
         scheduler = None
+        adaptive_jobs.clear()
         logger.info("Background schedulers stopped")
     else:
         logger.info("No schedulers running")
@@ -129,12 +239,15 @@ def get_scheduler_status() -> dict:
     
     jobs = []
     for job in scheduler.get_jobs():
-        jobs.append({
+        status = {
             "id": job.id,
             "name": job.name,
             "next_run": job.next_run_time,
             "func": job.func.__name__,
-        })
+        }
+        if job.id in adaptive_jobs:
+            status.update(adaptive_jobs[job.id].status())
+        jobs.append(status)
     
     return {
         "running": scheduler.running,
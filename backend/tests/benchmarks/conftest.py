@@ -0,0 +1,143 @@
+import asyncio
+import os
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src.database.connection import db_manager
+from src.mock_upstream.app import MockUpstreamConfig, create_mock_upstream_app
+from src.mock_upstream.server import MockUpstreamServer
+
+# Dataset sizes are opt-in above 10k rows; the full matrix is
+# CHAINMETRICS_BENCH_ROWS=10000,1000000,10000000.
+BENCH_ROWS = [
+    int(size) for size in os.getenv("CHAINMETRICS_BENCH_ROWS", "10000").split(",") if size.strip()
+]
+
+# Number of distinct tokens the synthetic hedera_tokens rows are spread over.
+SYNTHETIC_TOKENS = 1000
+
+
+def populate_synthetic_data(conn, rows: int) -> None:
+    """Fill hbar_metrics and hedera_tokens with ``rows`` synthetic rows each,
+    plus a tokens metadata row and a token_state row per synthetic token.
+
+    HBAR samples are spaced 5 minutes apart and token snapshots 10 minutes
+    apart, both ending at the current time, mirroring the scheduler cadence.
+    Every row is a single-sample run, as if each fetch had changed.
+    """
+    conn.execute(
+        """
+        INSERT INTO hbar_metrics
+        SELECT
+            date_trunc('minute', now()::TIMESTAMP) - to_minutes(CAST(5 * i AS BIGINT)),
+            0.05 + 0.01 * sin(i / 288.0),
+            2.0e9 + 1.0e7 * sin(i / 100.0),
+            5.0e7 + 1.0e6 * cos(i / 50.0),
+            sin(i / 288.0) * 5,
+            3.5e10,
+            30,
+            date_trunc('minute', now()::TIMESTAMP) - to_minutes(CAST(5 * i AS BIGINT)),
+            1
+        FROM range(?) t(i)
+        """,
+        (rows,),
+    )
+    conn.execute(
+        """
+        INSERT INTO tokens (token_id, name, symbol, decimals, token_type, updated_at)
+        SELECT '0.0.' || (100000 + i), 'Token ' || i, 'TK' || i, 8,
+               CASE WHEN i % 10 = 0 THEN 'NON_FUNGIBLE_UNIQUE' ELSE 'FUNGIBLE_COMMON' END,
+               now()::TIMESTAMP
+        FROM range(?) t(i)
+        """,
+        (SYNTHETIC_TOKENS,),
+    )
+    conn.execute(
+        """
+        INSERT INTO hedera_tokens
+        SELECT
+            date_trunc('minute', now()::TIMESTAMP)
+                - to_minutes(CAST(10 * (i // ?) AS BIGINT)),
+            '0.0.' || (100000 + i % ?),
+            NULL, NULL, NULL, NULL,
+            1000000000 + i % 7919,
+            (i * 7) % 5000,
+            NULL,
+            date_trunc('minute', now()::TIMESTAMP)
+                - to_minutes(CAST(10 * (i // ?) AS BIGINT)),
+            1
+        FROM range(?) t(i)
+        """,
+        (SYNTHETIC_TOKENS, SYNTHETIC_TOKENS, SYNTHETIC_TOKENS, rows),
+    )
+    conn.execute(
+        """
+        INSERT INTO token_state
+        SELECT s.token_id, CAST(split_part(s.token_id, '.', 3) AS BIGINT), t.symbol, t.token_type,
+               s.price_usd, s.market_cap, s.volume_24h, s.price_change_24h,
+               s.total_supply, s.holders_count, s.transfers_24h, s.valid_to
+        FROM (SELECT DISTINCT ON (token_id) * FROM hedera_tokens ORDER BY token_id, timestamp DESC) s
+        JOIN tokens t ON t.token_id = s.token_id
+        """
+    )
+
+
+@pytest.fixture(scope="session")
+def dataset_dir(tmp_path_factory) -> Path:
+    return tmp_path_factory.mktemp("bench-datasets")
+
+
+@pytest.fixture(scope="session", params=BENCH_ROWS, ids=lambda rows: f"{rows}rows")
+def synthetic_db(request, dataset_dir):
+    """Point the global ``db_manager`` at a synthetic dataset of the given size.
+
+    Datasets are built once per session and reused by every benchmark.
+    """
+    rows = request.param
+    db_path = dataset_dir / f"synthetic_{rows}.db"
+    original_path = db_manager.db_path
+
+    db_manager.close()
+    db_manager.db_path = str(db_path)
+    conn = db_manager.connect()
+    if conn.execute("SELECT COUNT(*) FROM hbar_metrics").fetchone()[0] == 0:
+        populate_synthetic_data(conn, rows)
+        conn.execute("CHECKPOINT")
+
+    yield rows
+
+    db_manager.close()
+    db_manager.db_path = original_path
+
+
+@pytest.fixture
+def run_async():
+    """Run a coroutine to completion on a dedicated event loop."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def mock_upstream():
+    """Local mock CoinGecko/mirror-node server shared by the whole session."""
+    server = MockUpstreamServer(create_mock_upstream_app())
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def upstream_config(mock_upstream):
+    """Apply a MockUpstreamConfig for one benchmark and reset it afterwards."""
+
+    def apply(**overrides) -> MockUpstreamConfig:
+        config = MockUpstreamConfig(**overrides)
+        httpx.post(f"{mock_upstream.url}/__mock__/config", json=config.model_dump()).raise_for_status()
+        httpx.post(f"{mock_upstream.url}/__mock__/reset").raise_for_status()
+        return config
+
+    yield apply
+    apply()
@@ -0,0 +1,181 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+import pytest
+
+from main import app
+from src.api.admission import admission_control
+from src.api.cache import result_cache
+from src.data_fetchers.hedera import hedera_token_fetcher
+
+HOT_ENDPOINTS = [
+    "/api/v1/health",
+    "/api/v1/hbar/current",
+    "/api/v1/hbar/history?days=7",
+    "/api/v1/hbar/stats",
+    "/api/v1/tokens/top?limit=10",
+]
+
+CONCURRENCY = 20
+REQUESTS_PER_ENDPOINT = 50
+
+
+@pytest.fixture(autouse=True)
+def no_client_rate_limit(monkeypatch):
+    # Every request through the ASGI transport comes from the same client address
+    monkeypatch.setattr(admission_control, "client_rate", 0)
+
+
+def _summarise(latencies: list[float]) -> dict:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+    }
+
+
+async def _load(path: str) -> dict:
+    """Fire REQUESTS_PER_ENDPOINT requests at ``path`` with CONCURRENCY in flight."""
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    # The ASGI transport bypasses the lifespan, so no schedulers start.
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+
+        async def one_request():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(REQUESTS_PER_ENDPOINT)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        **_summarise(latencies),
+        "statuses": statuses,
+    }
+
+
+@pytest.fixture(params=["uncached", "cached"])
+def cache_mode(request, monkeypatch):
+    """Run with the result cache bypassed (zero TTL) or warm."""
+    result_cache.clear()
+    if request.param == "uncached":
+        monkeypatch.setattr(result_cache, "ttl", 0)
+    yield request.param
+    result_cache.clear()
+
+
+@pytest.mark.parametrize("path", HOT_ENDPOINTS)
+def test_hot_endpoint_load(benchmark, synthetic_db, run_async, cache_mode, path):
+    results = []
+
+    benchmark.pedantic(lambda: results.append(run_async(_load(path))), rounds=3, iterations=1)
+
+    benchmark.extra_info["rows"] = synthetic_db
+    benchmark.extra_info["cache"] = cache_mode
+    benchmark.extra_info.update(results[-1])
+    if cache_mode == "cached":
+        benchmark.extra_info["cache_stats"] = result_cache.get_stats()
+    assert set(results[-1]["statuses"]) == {200}
+
+
+async def _refresh_and_wait(path: str) -> dict:
+    """POST a refresh, then poll its job until it finishes."""
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        start = time.perf_counter()
+        response = await client.post(path)
+        accepted = time.perf_counter() - start
+
+        job = response.json()["job"]
+        while job["status"] in ("queued", "running"):
+            await asyncio.sleep(0.01)
+            job = (await client.get(response.headers["location"])).json()
+        finished = time.perf_counter() - start
+
+    return {
+        "status_code": response.status_code,
+        "accepted_ms": round(accepted * 1000, 3),
+        "finished_ms": round(finished * 1000, 3),
+        "job_status": job["status"],
+        "progress": job["progress"],
+    }
+
+
+def test_token_refresh_accepted_before_fetch(benchmark, synthetic_db, mock_upstream, upstream_config,
+                                             run_async, monkeypatch):
+    upstream_config(latency_ms=20)
+    monkeypatch.setattr(hedera_token_fetcher, "base_url", mock_upstream.mirror_node_url)
+    monkeypatch.setattr(hedera_token_fetcher, "coingecko_base_url", mock_upstream.coingecko_url)
+    results = []
+
+    benchmark.pedantic(
+        lambda: results.append(run_async(_refresh_and_wait("/api/v1/tokens/refresh"))), rounds=3, iterations=1
+    )
+
+    benchmark.extra_info.update(results[-1])
+    # The request returns once the job is queued, well before the serial fetch ends
+    assert results[-1]["status_code"] == 202
+    assert results[-1]["job_status"] == "succeeded"
+    assert results[-1]["accepted_ms"] < results[-1]["finished_ms"] / 2
+
+
+OVERLOAD_CHEAP_PATH = "/api/v1/hbar/current"
+# Past the in-memory buffer, so every read goes to DuckDB
+OVERLOAD_BULK_PATH = "/api/v1/hbar/history?days=30"
+OVERLOAD_BULK_CLIENTS = 20
+
+
+async def _overload() -> dict:
+    """Time cheap requests while OVERLOAD_BULK_CLIENTS clients keep long history reads in flight."""
+    latencies: list[float] = []
+    statuses: dict[str, dict[int, int]] = {"cheap": {}, "bulk": {}}
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=60) as client:
+
+        async def bulk_client():
+            while not stop.is_set():
+                response = await client.get(OVERLOAD_BULK_PATH)
+                statuses["bulk"][response.status_code] = statuses["bulk"].get(response.status_code, 0) + 1
+                if response.status_code != 200:
+                    # An impatient client retrying well before Retry-After
+                    await asyncio.sleep(0.01)
+
+        async def cheap_client():
+            for _ in range(3):
+                start = time.perf_counter()
+                response = await client.get(OVERLOAD_CHEAP_PATH)
+                latencies.append(time.perf_counter() - start)
+                statuses["cheap"][response.status_code] = statuses["cheap"].get(response.status_code, 0) + 1
+
+        flood = [asyncio.create_task(bulk_client()) for _ in range(OVERLOAD_BULK_CLIENTS)]
+        await asyncio.sleep(0.05)
+        await asyncio.gather(*(cheap_client() for _ in range(5)))
+        stop.set()
+        await asyncio.gather(*flood)
+
+    return {**_summarise(latencies), "statuses": statuses}
+
+
+@pytest.mark.parametrize("admission", ["off", "on"])
+def test_cheap_endpoint_latency_under_overload(benchmark, synthetic_db, run_async, monkeypatch, admission):
+    monkeypatch.setattr(result_cache, "ttl", 0)
+    monkeypatch.setattr(admission_control, "enabled", admission == "on")
+    results = []
+
+    benchmark.pedantic(lambda: results.append(run_async(_overload())), rounds=1, iterations=1)
+
+    benchmark.extra_info["rows"] = synthetic_db
+    benchmark.extra_info.update(results[-1])
+    benchmark.extra_info["admission_stats"] = admission_control.get_stats()["classes"]
+    assert set(results[-1]["statuses"]["cheap"]) == {200}
+    assert set(results[-1]["statuses"]["bulk"]) <= {200, 503}
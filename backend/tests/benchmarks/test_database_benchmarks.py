@@ -0,0 +1,245 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.config import settings
+from src.data_fetchers.coingecko import CoinGeckoFetcher
+from src.data_fetchers.gaps import hbar_gaps
+from src.data_fetchers.hedera import hedera_token_fetcher
+from src.data_fetchers.recent import hbar_recent
+from src.database.connection import db_manager
+from src.database.models import HBARMetrics, HederaTokenBatch, HederaTokenMetrics
+from src.database.queries import QUERIES, TOKEN_SORT_KEYS
+
+
+def _token_batch(size: int) -> HederaTokenBatch:
+    return HederaTokenBatch.from_records([
+        HederaTokenMetrics(
+            token_id=f"0.0.{900000 + i}",
+            name=f"Bench Token {i}",
+            symbol=f"BT{i}",
+            decimals=8,
+            total_supply=1_000_000_000 + i,
+            holders_count=i,
+        )
+        for i in range(size)
+    ])
+
+
+@pytest.mark.parametrize("source", ["database", "buffer"])
+@pytest.mark.parametrize("days", [1, 7, 365])
+def test_get_hbar_price_history(benchmark, synthetic_db, run_async, monkeypatch, days, source):
+    fetcher = CoinGeckoFetcher()
+    benchmark.extra_info["rows"] = synthetic_db
+    if source == "database":
+        monkeypatch.setattr(hbar_recent, "history", lambda since: None)
+
+    history = benchmark(lambda: run_async(fetcher.get_hbar_price_history(days)))
+
+    assert history
+
+
+@pytest.mark.parametrize("limit", [10, 50])
+def test_get_top_tokens(benchmark, synthetic_db, run_async, limit):
+    benchmark.extra_info["rows"] = synthetic_db
+
+    tokens = benchmark(lambda: run_async(hedera_token_fetcher.get_top_tokens(limit)))
+
+    expected = db_manager.fetchall(
+        """
+        SELECT token_id FROM token_state
+        ORDER BY holders_count DESC NULLS LAST, total_supply DESC NULLS LAST, token_num
+        LIMIT ?
+        """,
+        (limit,),
+    )
+    assert [token["token_id"] for token in tokens] == [row[0] for row in expected]
+
+
+def _token_pages(sort: str, order: str, limit: int, **filters):
+    """Yield every page of a listing, following cursors."""
+    cursor = None
+    while True:
+        page = asyncio.run(hedera_token_fetcher.get_token_page(sort, order, limit, cursor, **filters))
+        yield page
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return
+
+
+@pytest.mark.parametrize("page", [1, 15])
+def test_get_token_page(benchmark, synthetic_db, run_async, page):
+    # Deep pages should cost the same as the first one
+    cursor = None
+    for _ in range(page - 1):
+        cursor = run_async(hedera_token_fetcher.get_token_page("holders", "desc", 50, cursor))["next_cursor"]
+    benchmark.extra_info["rows"] = synthetic_db
+
+    result = benchmark(lambda: run_async(hedera_token_fetcher.get_token_page("holders", "desc", 50, cursor)))
+
+    assert len(result["tokens"]) == 50
+
+
+@pytest.mark.parametrize(
+    "sort, order, filters",
+    [
+        ("holders", "desc", {}),
+        ("supply", "asc", {"min_holders": 2500}),
+        ("market_cap", "desc", {}),
+        ("symbol", "asc", {"token_type": "NON_FUNGIBLE_UNIQUE"}),
+    ],
+)
+def test_token_page_walk(synthetic_db, sort, order, filters):
+    pages = list(_token_pages(sort, order, 37, **filters))
+    seen = [token["token_id"] for page in pages for token in page["tokens"]]
+
+    key, _ = TOKEN_SORT_KEYS[sort]
+    expected = db_manager.fetchall(
+        f"""
+        SELECT token_id FROM token_state
+        WHERE (? IS NULL OR token_type = ?) AND holders_count >= ?
+        ORDER BY {key} {order}, token_num {order}
+        """,
+        (filters.get("token_type"), filters.get("token_type"), filters.get("min_holders", 0)),
+    )
+    assert seen == [row[0] for row in expected]
+    assert all(len(page["tokens"]) == 37 for page in pages[:-1])
+    with pytest.raises(ValueError):
+        asyncio.run(hedera_token_fetcher.get_token_page("supply" if sort != "supply" else "holders",
+                                                        order, 37, pages[0]["next_cursor"]))
+
+
+@pytest.mark.parametrize("batch_size", [10, 1000])
+def test_save_token_data(benchmark, synthetic_db, run_async, batch_size):
+    tokens = _token_batch(batch_size)
+    benchmark.extra_info["rows"] = synthetic_db
+
+    saved = benchmark(lambda: run_async(hedera_token_fetcher.save_token_data(tokens)))
+
+    assert saved
+
+
+@pytest.mark.parametrize("tokens", [1, 20])
+def test_get_token_history(benchmark, synthetic_db, run_async, tokens):
+    token_ids = [f"0.0.{100000 + i}" for i in range(tokens)]
+    end = datetime.utcnow()
+    start = end - timedelta(days=7)
+    benchmark.extra_info["rows"] = synthetic_db
+
+    history = benchmark(lambda: run_async(hedera_token_fetcher.get_token_history(token_ids, start, end, "hour")))
+
+    assert all(history[token_id] for token_id in token_ids)
+
+
+@pytest.mark.parametrize("mode", ["adhoc", "prepared"])
+def test_registered_query_overhead(benchmark, synthetic_db, mode):
+    benchmark.extra_info["rows"] = synthetic_db
+
+    if mode == "prepared":
+        row = benchmark(db_manager.query_one, "hbar_latest")
+    else:
+        row = benchmark(db_manager.fetchone, QUERIES["hbar_latest"].sql)
+
+    assert row
+
+
+def test_hbar_gap_scan(benchmark, synthetic_db):
+    benchmark.extra_info["rows"] = synthetic_db
+
+    found = benchmark(hbar_gaps.scan, full=True)
+
+    # Synthetic rows are evenly spaced
+    assert found == 0
+
+
+@pytest.fixture
+def gappy_db(tmp_path):
+    """Two days of 5-minute HBAR rows with a recent and an older hole."""
+    original_path = db_manager.db_path
+    db_manager.close()
+    db_manager.db_path = str(tmp_path / "gaps.db")
+
+    # Hour-aligned so the older hole holds a fixed number of hourly points
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    holes = [
+        (now - timedelta(hours=3), now - timedelta(hours=2)),
+        (now - timedelta(hours=36), now - timedelta(hours=30)),
+    ]
+    timestamps = [
+        now - timedelta(minutes=5 * i) for i in range(2 * 288)
+        if not any(start < now - timedelta(minutes=5 * i) < end for start, end in holes)
+    ]
+    db_manager.execute_many(
+        "INSERT INTO hbar_metrics VALUES (?, 0.06, 2.1e9, 4.5e7, 0.0, 3.5e10, 30, ?, 1)",
+        [(timestamp, timestamp) for timestamp in timestamps],
+    )
+
+    yield holes
+
+    db_manager.close()
+    db_manager.db_path = original_path
+
+
+def test_hbar_gap_repair(gappy_db, mock_upstream, upstream_config, run_async, monkeypatch):
+    monkeypatch.setattr(settings.coingecko, "requests_per_minute", 1_000_000)
+    upstream_config()
+
+    assert hbar_gaps.scan() == 2
+    assert sorted(hbar_gaps.open_gaps(10)) == sorted(gappy_db)
+
+    async def repair():
+        async with CoinGeckoFetcher(base_url=mock_upstream.coingecko_url) as fetcher:
+            return await hbar_gaps.repair(fetcher)
+
+    inserted = run_async(repair())
+
+    # The recent hole comes back at 5-minute resolution, the older one hourly
+    counts = [
+        db_manager.fetchone(
+            "SELECT COUNT(*) FROM hbar_metrics WHERE timestamp > ? AND timestamp < ?", gap
+        )[0]
+        for gap in gappy_db
+    ]
+    assert counts == [11, 5]
+    assert inserted == sum(counts)
+    assert hbar_gaps.open_gaps(10) == []
+    assert hbar_gaps.summary()["statuses"]["filled"]["gaps"] == 2
+
+    # Later scans neither revisit old rows nor report the hourly remainder
+    assert hbar_gaps.scan() == 0
+    assert hbar_gaps.scan(full=True) == 0
+
+
+def _history_rows(since: datetime) -> list:
+    return [
+        {"timestamp": row[0], "price_usd": row[1], "volume_24h": row[2]}
+        for row in db_manager.query_all("hbar_price_history", since=since)
+    ]
+
+
+def test_recent_buffer_follows_saves(gappy_db, run_async):
+    fetcher = CoinGeckoFetcher()
+    since = datetime.utcnow() - timedelta(days=1)
+    assert hbar_recent.history(since) == _history_rows(since)
+
+    def snapshot(price: float, minutes: int) -> HBARMetrics:
+        return HBARMetrics(
+            timestamp=datetime.utcnow() + timedelta(minutes=minutes),
+            price_usd=price,
+            market_cap=2.1e9,
+            volume_24h=4.5e7,
+            price_change_24h=0.0,
+            circulating_supply=3.5e10,
+            market_cap_rank=30,
+        )
+
+    # A new run, an extension of it and another new run are applied in place
+    for price, minutes in [(0.07, 1), (0.07, 2), (0.08, 3)]:
+        assert run_async(fetcher.save_hbar_data(snapshot(price, minutes)))
+    loads = hbar_recent.stats["loads"]
+    assert hbar_recent.history(since) == _history_rows(since)
+    assert hbar_recent.stats["loads"] == loads
+
+    # Windows older than the buffer are left to the database
+    assert hbar_recent.history(since - timedelta(days=30)) is None
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import tracemalloc
+
+import httpx
+import pytest
+
+from src.config import settings
+from src.data_fetchers.base_fetcher import decode_json
+from src.data_fetchers.coingecko import CoinGeckoFetcher
+from src.data_fetchers.hedera import HederaTokenFetcher
+from src.data_fetchers.token_metadata import token_metadata
+from src.mock_upstream.app import MockUpstreamConfig, load_fixture
+
+
+@pytest.fixture(autouse=True)
+def unlimited_coingecko_budget(monkeypatch):
+    # The real rate budget would turn these into sleep benchmarks.
+    monkeypatch.setattr(settings.coingecko, "requests_per_minute", 1_000_000)
+
+
+def _upstream_requests(mock_upstream) -> int:
+    return httpx.get(f"{mock_upstream.url}/__mock__/stats").json().get("requests", 0)
+
+
+def test_coingecko_fetch_hbar_data(benchmark, mock_upstream, upstream_config, run_async):
+    upstream_config()
+    fetcher = CoinGeckoFetcher(base_url=mock_upstream.coingecko_url)
+
+    async def fetch():
+        async with fetcher:
+            return await fetcher.fetch_hbar_data()
+
+    hbar = benchmark(lambda: run_async(fetch()))
+
+    assert hbar is not None
+    assert hbar.price_usd == pytest.approx(0.0612)
+
+
+@pytest.mark.parametrize("metadata", ["cold", "cached"])
+@pytest.mark.parametrize("latency_ms", [0, 20])
+def test_hedera_token_fetch_data(benchmark, mock_upstream, upstream_config, run_async, latency_ms, metadata):
+    upstream_config(latency_ms=latency_ms)
+    token_metadata.invalidate()
+    fetcher = HederaTokenFetcher(
+        base_url=mock_upstream.mirror_node_url,
+        coingecko_base_url=mock_upstream.coingecko_url,
+    )
+
+    async def fetch():
+        async with fetcher:
+            return await fetcher.fetch_data()
+
+    if metadata == "cached":
+        run_async(fetch())
+        httpx.post(f"{mock_upstream.url}/__mock__/reset").raise_for_status()
+    setup = token_metadata.invalidate if metadata == "cold" else None
+
+    tokens = benchmark.pedantic(lambda: run_async(fetch()), setup=setup, rounds=5, iterations=1)
+
+    benchmark.extra_info["tokens"] = len(tokens)
+    benchmark.extra_info["upstream_requests_per_round"] = _upstream_requests(mock_upstream) / 5
+    assert len(tokens) == len(fetcher.POPULAR_TOKENS)
+    assert any(price is not None for price in tokens.columns["price_usd"])
+
+
+@pytest.mark.parametrize("coins", [10, 1000])
+def test_coingecko_fetch_market_data(benchmark, mock_upstream, upstream_config, run_async, coins):
+    upstream_config()
+    fetcher = CoinGeckoFetcher(base_url=mock_upstream.coingecko_url)
+    coin_ids = [f"mock-coin-{i}" for i in range(coins)]
+
+    async def fetch():
+        async with fetcher:
+            return await fetcher.fetch_market_data(coin_ids)
+
+    market_data = benchmark(lambda: run_async(fetch()))
+
+    benchmark.extra_info["upstream_requests_per_round"] = -(-coins // fetcher.MARKETS_BATCH_SIZE)
+    assert len(market_data) == coins
+
+
+@pytest.mark.parametrize("token_count", [250, 1000])
+def test_hedera_token_discovery(benchmark, mock_upstream, upstream_config, run_async, token_count):
+    upstream_config(token_count=token_count)
+    fetcher = HederaTokenFetcher(base_url=mock_upstream.mirror_node_url)
+    first = f"0.0.{MockUpstreamConfig().first_token_num - 1}"
+
+    async def discover():
+        async with fetcher:
+            return await fetcher.discover_tokens(first, max_pages=100)
+
+    token_ids, cursor = benchmark(lambda: run_async(discover()))
+
+    benchmark.extra_info["pages"] = -(-token_count // fetcher.LIST_PAGE_SIZE)
+    assert len(token_ids) == token_count
+    assert cursor == token_ids[-1]
+
+
+@pytest.mark.parametrize("prefetch", [False, True], ids=["serial", "prefetch"])
+def test_mirror_node_page_walk(benchmark, mock_upstream, upstream_config, run_async, prefetch):
+    upstream_config(token_count=1000, latency_ms=20)
+    fetcher = HederaTokenFetcher(base_url=mock_upstream.mirror_node_url)
+    params = {"order": "asc", "limit": fetcher.LIST_PAGE_SIZE}
+
+    async def walk():
+        pages = 0
+        async with fetcher:
+            async for _ in fetcher.iter_pages("/api/v1/tokens", params, "tokens", prefetch=prefetch):
+                pages += 1
+                # Stand-in for per-page work such as a database write
+                await asyncio.sleep(0.02)
+        return pages
+
+    pages = benchmark.pedantic(lambda: run_async(walk()), rounds=3, iterations=1)
+
+    benchmark.extra_info["pages"] = pages
+    assert pages == 1000 // fetcher.LIST_PAGE_SIZE
+
+
+def test_mirror_node_page_walk_resumes(mock_upstream, upstream_config, run_async):
+    upstream_config(token_count=250)
+    fetcher = HederaTokenFetcher(base_url=mock_upstream.mirror_node_url)
+
+    async def walk():
+        async with fetcher:
+            first = [page async for page in fetcher.iter_pages(
+                "/api/v1/tokens", {"order": "asc", "limit": 100}, "tokens", max_pages=1
+            )]
+            rest = [token async for token in fetcher.iter_items(first[-1].next, "tokens")]
+        return first[-1].items, rest
+
+    first, rest = run_async(walk())
+
+    ids = [token["token_id"] for token in first + rest]
+    assert len(ids) == len(set(ids)) == 250
+
+
+def _recorded_payload(name: str) -> bytes:
+    """Recorded upstream response as raw bytes; balances are widened to a 1000-entry page."""
+    if name == "coin":
+        return json.dumps(load_fixture("coin_hedera-hashgraph.json")).encode()
+    fixture = load_fixture("token_balances.json")
+    template = fixture["balances"]
+    balances = [dict(template[i % len(template)], account=f"0.0.{1000 + i}") for i in range(1000)]
+    return json.dumps({**fixture, "balances": balances, "links": {"next": None}}).encode()
+
+
+@pytest.mark.parametrize("decoder", ["stdlib", "orjson"])
+@pytest.mark.parametrize("payload", ["coin", "balances_1000"])
+def test_decode_upstream_payload(benchmark, payload, decoder):
+    content = _recorded_payload(payload)
+    # stdlib mirrors the previous response.json(): bytes -> text -> objects
+    decode = decode_json if decoder == "orjson" else lambda body: json.loads(body.decode())
+
+    data = benchmark(decode, content)
+
+    tracemalloc.start()
+    try:
+        decode(content)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["bytes"] = len(content)
+    benchmark.extra_info["peak_alloc_bytes"] = peak
+    assert data == json.loads(content)
@@ -0,0 +1,86 @@
+import tracemalloc
+
+import pytest
+
+from src.database.models import HederaTokenBatch, HederaTokenMetrics
+
+TOKENS = 100_000
+
+
+def _token_fields(i: int) -> dict:
+    return {
+        "token_id": f"0.0.{100000 + i}",
+        "name": f"Token {i}",
+        "symbol": f"TK{i}",
+        "price_usd": 0.01 * (i % 100),
+        "market_cap": 1.0e6 + i,
+        "volume_24h": 1.0e4 + i,
+        "price_change_24h": 0.5,
+        "decimals": 8,
+        "total_supply": 1_000_000_000 + i,
+        "holders_count": i % 5000,
+        "transfers_24h": None,
+        "token_type": "FUNGIBLE_COMMON",
+        "memo": "",
+        "deleted": False,
+        "treasury_account": "0.0.2",
+        "created_timestamp": "1650000000.000000000",
+    }
+
+
+def _build_dicts(fields: list) -> list:
+    # The pre-record token path: one wide dict per token
+    return [dict(f) for f in fields]
+
+
+def _build_records(fields: list) -> list:
+    return [HederaTokenMetrics(**f) for f in fields]
+
+
+def _build_batch(fields: list) -> HederaTokenBatch:
+    batch = HederaTokenBatch()
+    for f in fields:
+        batch.append(HederaTokenMetrics(**f))
+    return batch
+
+
+def _build_arrow(fields: list):
+    return _build_batch(fields).to_arrow()
+
+
+def _traced_peak(build, fields) -> int:
+    # tracemalloc only sees Python allocations; Arrow buffers live in Arrow's
+    # own memory pool and are reported separately via Table.nbytes.
+    tracemalloc.start()
+    try:
+        result = build(fields)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+@pytest.fixture(scope="module")
+def token_fields() -> list:
+    return [_token_fields(i) for i in range(TOKENS)]
+
+
+@pytest.mark.parametrize(
+    "build",
+    [_build_dicts, _build_records, _build_batch, _build_arrow],
+    ids=["dicts", "slotted_records", "columnar_batch", "arrow_table"],
+)
+def test_token_container_memory(benchmark, token_fields, build):
+    peak = _traced_peak(build, token_fields)
+    benchmark.extra_info["tokens"] = TOKENS
+    benchmark.extra_info["peak_bytes"] = peak
+    benchmark.extra_info["bytes_per_token"] = round(peak / TOKENS, 1)
+    if build is _build_arrow:
+        benchmark.extra_info["arrow_nbytes"] = build(token_fields).nbytes
+
+    benchmark.pedantic(build, args=(token_fields,), rounds=3, iterations=1)
+
+
+def test_slotted_records_smaller_than_dicts(token_fields):
+    assert _traced_peak(_build_records, token_fields) < _traced_peak(_build_dicts, token_fields)
@@ -0,0 +1,79 @@
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.database.connection import db_manager
+from src.database.migrations import LATEST_VERSION, get_schema_version
+from src.database.queries import QUERIES, render_execute, render_literal
+
+# Operator names rendered in DuckDB's EXPLAIN ANALYZE boxes
+OPERATOR_PATTERN = re.compile(r"│\s*([A-Z][A-Z_]+)\s*│")
+
+
+def _explain(query: str) -> str:
+    # EXPLAIN ANALYZE does not take bound parameters, so values are inlined.
+    return db_manager.fetchall(f"EXPLAIN ANALYZE {query}")[0][1]
+
+
+def _operators(plan: str) -> list:
+    return OPERATOR_PATTERN.findall(plan)
+
+
+@pytest.fixture
+def plan_check(benchmark, synthetic_db):
+    """Benchmark a registered query and return its EXPLAIN ANALYZE plan."""
+
+    def run(name: str, **arguments) -> str:
+        benchmark.extra_info["rows"] = synthetic_db
+        benchmark(db_manager.query_all, name, **arguments)
+        plan = _explain(render_execute(QUERIES[name], arguments))
+        benchmark.extra_info["operators"] = _operators(plan)
+        return plan
+
+    return run
+
+
+def test_schema_at_latest_version(synthetic_db):
+    assert get_schema_version(db_manager.connect()) == LATEST_VERSION
+
+
+def test_hbar_range_restricts_scan(plan_check):
+    cutoff = datetime.utcnow() - timedelta(days=1)
+    plan = plan_check("hbar_price_history", since=cutoff)
+
+    # The cutoff must restrict the scan itself: either a primary key range
+    # scan on small selective ranges, or a sequential scan with the filter
+    # pushed down so row groups outside the range are skipped. A full scan
+    # followed by a FILTER means the cutoff was not a constant. Runs are
+    # selected by the end of their validity interval.
+    operators = _operators(plan)
+    assert "INDEX_SCAN" in operators or "Filters: valid_to>=" in plan
+
+
+def test_latest_token_snapshot_lookup(plan_check):
+    plan = plan_check("token_latest", token_id="0.0.100005")
+
+    # An ART index on token_id is slower here than a pushed-down scan.
+    assert "INDEX_SCAN" not in _operators(plan)
+    assert "TOP_N" in _operators(plan)
+    assert "Filters: token_id=" in plan
+
+
+def test_hbar_point_lookup_uses_primary_key(synthetic_db):
+    row = db_manager.fetchone("SELECT MAX(timestamp) FROM hbar_metrics")
+    plan = _explain(f"SELECT price_usd FROM hbar_metrics WHERE timestamp = {render_literal(row[0], 'TIMESTAMP')}")
+
+    assert "INDEX_SCAN" in _operators(plan)
+
+
+def test_token_page_is_top_n_over_state(plan_check):
+    plan = plan_check(
+        "tokens_page_holders_desc",
+        token_type="", min_holders=0, has_cursor=1, after_key=2500, after_num=100500, limit=51,
+    )
+
+    # Pages come from the one-row-per-token table as a top-N after the keyset
+    # filter; only the page itself is sorted again after the metadata join
+    assert "TOP_N" in _operators(plan)
+    assert "hedera_tokens" not in plan
@@ -0,0 +1,68 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Latency the mock upstream adds to every response, roughly a real CoinGecko round trip
+UPSTREAM_LATENCY_MS = 300
+
+STARTUP_TIMEOUT = 60
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _time_to_first_request(env: dict) -> float:
+    """Start the API in a fresh process and time it until /api/v1/health answers."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/v1/health"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < STARTUP_TIMEOUT:
+            if process.poll() is not None:
+                raise RuntimeError(f"API process exited with code {process.returncode}")
+            try:
+                if httpx.get(url, timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError("API did not answer within the startup timeout")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.mark.parametrize("fast_start", [False, True], ids=["blocking", "fast_start"])
+def test_time_to_first_request(benchmark, mock_upstream, upstream_config, tmp_path, fast_start):
+    upstream_config(latency_ms=UPSTREAM_LATENCY_MS)
+    env = {
+        **os.environ,
+        "DATABASE_PATH": str(tmp_path / "startup.db"),
+        "FAST_START": str(fast_start).lower(),
+        "COINGECKO_BASE_URL": mock_upstream.coingecko_url,
+        "HEDERA_MIRROR_NODE_URL": mock_upstream.mirror_node_url,
+    }
+
+    # The warmup round creates the schema, so measured rounds start from an existing database
+    seconds = benchmark.pedantic(_time_to_first_request, args=(env,), rounds=3, iterations=1, warmup_rounds=1)
+
+    benchmark.extra_info["upstream_latency_ms"] = UPSTREAM_LATENCY_MS
+    assert seconds < STARTUP_TIMEOUT
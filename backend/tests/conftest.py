@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# Point the global settings at a throwaway database and keep request logging
+# quiet before any ``src`` module is imported.
+_TMP_DIR = tempfile.mkdtemp(prefix="chainmetrics-tests-")
+os.environ.setdefault("DATABASE_PATH", os.path.join(_TMP_DIR, "test.db"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_FORMAT", "text")
@@ -0,0 +1,35 @@
+import httpx
+import pytest
+
+from main import app
+from src.api.admission import admission_control
+from src.api.cache import result_cache
+from src.database.connection import db_manager
+
+
+@pytest.fixture
+def fresh_db(tmp_path):
+    """Point the global ``db_manager`` at an empty, migrated database."""
+    original_path = db_manager.db_path
+    db_manager.close()
+    db_manager.db_path = str(tmp_path / "unit.db")
+    db_manager.connect()
+
+    yield db_manager
+
+    db_manager.close()
+    db_manager.db_path = original_path
+
+
+@pytest.fixture
+async def api_client(fresh_db, monkeypatch):
+    """HTTP client for the app on a fresh database, with an empty result cache."""
+    # Every request through the ASGI transport comes from the same client address
+    monkeypatch.setattr(admission_control, "client_rate", 0)
+    result_cache.clear()
+
+    # The ASGI transport bypasses the lifespan, so no schedulers start.
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+    result_cache.clear()
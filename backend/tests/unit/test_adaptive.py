@@ -0,0 +1,116 @@
+import pytest
+
+from src.config import settings
+from src.database.connection import db_manager
+from src.schedulers import adaptive
+from src.schedulers.adaptive import AdaptiveJob, JobOutcome
+
+BASE_INTERVAL = 300
+
+
+class StubScheduler:
+    """Records reschedules instead of running anything."""
+
+    def __init__(self):
+        self.rescheduled = []
+
+    def reschedule_job(self, job_id, trigger):
+        self.rescheduled.append((job_id, trigger.interval.total_seconds()))
+
+
+@pytest.fixture(autouse=True)
+def adaptive_settings(monkeypatch):
+    monkeypatch.setattr(settings.updates, "adaptive", True)
+    monkeypatch.setattr(settings.updates, "max_backoff", 4)
+    monkeypatch.setattr(settings.updates, "min_interval_factor", 0.5)
+    monkeypatch.setattr(settings.updates, "volatility_threshold_pct", 1.0)
+    monkeypatch.setattr(settings.updates, "jitter_fraction", 0.1)
+    monkeypatch.setattr(settings.updates, "low_budget_threshold", 5)
+
+
+def _job(outcomes, low_priority=False):
+    """AdaptiveJob whose runs return ``outcomes`` in turn."""
+    outcomes = iter(outcomes)
+
+    async def fetch():
+        return next(outcomes)
+
+    job = AdaptiveJob("test_job", fetch, BASE_INTERVAL, low_priority=low_priority)
+    job.scheduler = StubScheduler()
+    return job
+
+
+async def test_interval_backs_off_while_unchanged(fresh_db):
+    job = _job([JobOutcome("same", 0.05)] * 5)
+
+    intervals = []
+    for _ in range(5):
+        await job.run()
+        intervals.append(job.interval)
+
+    # The first run has nothing to compare with; then doubling up to max_backoff
+    assert intervals == [300, 600, 1200, 1200, 1200]
+    assert job.stats["unchanged_runs"] == 4
+    assert job.scheduler.rescheduled == [("test_job", 600), ("test_job", 1200)]
+
+
+async def test_changed_payload_resets_to_base_interval(fresh_db):
+    job = _job([JobOutcome("a", 0.05), JobOutcome("a", 0.05), JobOutcome("a", 0.05), JobOutcome("b", 0.0501)])
+
+    for _ in range(3):
+        await job.run()
+    assert job.interval == 1200
+
+    # A 0.2% move changes the payload but stays under the volatility threshold
+    await job.run()
+    assert job.interval == BASE_INTERVAL
+    assert job.stats["unchanged_runs"] == 0
+
+
+async def test_price_move_speeds_up(fresh_db):
+    job = _job([JobOutcome("a", 0.05), JobOutcome("a", 0.05), JobOutcome("b", 0.052), JobOutcome("c", 0.049)])
+
+    await job.run()
+    await job.run()
+    assert job.interval == 600
+
+    # 4% and 5.8% moves: straight to the minimum interval, never below it
+    await job.run()
+    assert job.interval == BASE_INTERVAL * 0.5
+    await job.run()
+    assert job.interval == BASE_INTERVAL * 0.5
+
+
+async def test_static_mode_keeps_base_interval(fresh_db, monkeypatch):
+    monkeypatch.setattr(settings.updates, "adaptive", False)
+    job = _job([JobOutcome("same", 0.05)] * 3)
+
+    for _ in range(3):
+        await job.run()
+
+    assert job.interval == BASE_INTERVAL
+    assert job.scheduler.rescheduled == []
+
+
+def test_trigger_jitter_scales_with_interval():
+    job = _job([])
+    job.interval = 1200
+
+    trigger = job.trigger()
+
+    assert trigger.interval.total_seconds() == 1200
+    assert trigger.jitter == 120
+
+
+@pytest.mark.parametrize("low_priority, remaining, runs", [(True, 2, 0), (True, 5, 1), (False, 0, 1)])
+async def test_low_priority_jobs_skip_on_low_budget(fresh_db, monkeypatch, low_priority, remaining, runs):
+    monkeypatch.setattr(adaptive, "coingecko_budget_remaining", lambda: remaining)
+    job = _job([JobOutcome("a", 0.05)], low_priority=low_priority)
+
+    outcome = await job.run()
+
+    assert (outcome is not None) == bool(runs)
+    assert job.stats["runs"] == runs
+    assert job.stats["skipped"] == 1 - runs
+    statuses = db_manager.fetchall("SELECT status, error FROM scheduler_runs WHERE job_id = 'test_job'")
+    assert statuses == ([("ok", None)] if runs else [("skipped", "CoinGecko budget low")])
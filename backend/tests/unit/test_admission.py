@@ -0,0 +1,105 @@
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+from src.api.admission import AdmissionController, admission_control
+
+ORIGIN = "http://localhost:3000"
+
+
+@pytest.fixture
+def controller():
+    # Two slots held back for critical requests
+    return AdmissionController(
+        enabled=True, max_concurrency=4, standard_concurrency=2, bulk_concurrency=1, max_queue=4,
+        queue_timeout=0.05, retry_after=1, client_rate=0, client_burst=1, bulk_cost=1, max_clients=10,
+    )
+
+
+@pytest.mark.parametrize(("path", "expected"), [
+    ("/api/v1/tokens/history", "bulk"),
+    ("/api/v1/tokens/0.0.456858/history", "bulk"),
+    ("/api/v1/hbar/history", "bulk"),
+    ("/api/v1/tokens/0.0.456858", "critical"),
+    ("/api/v1/tokens/top", "critical"),
+    ("/api/v1/tokens", "standard"),
+    ("/api/v1/readyz", None),
+])
+def test_routes_are_classed_by_first_matching_pattern(controller, path, expected):
+    assert controller.classify(path) == expected
+
+
+async def test_critical_in_flight_does_not_block_lower_classes(controller):
+    assert await controller.acquire("critical", "a") is None
+    await controller.acquire("critical", "a")
+
+    assert await controller.acquire("standard", "a") is None
+    assert await controller.acquire("bulk", "a") is None
+    assert controller.get_stats()["in_flight"] == 4
+
+
+async def test_lower_classes_leave_reserved_slots_for_critical(controller):
+    assert await controller.acquire("standard", "a") is None
+    assert await controller.acquire("standard", "a") is None
+
+    # Standard is at its cap and bulk would eat into the reserve
+    rejection = await controller.acquire("bulk", "a")
+    assert rejection is not None and rejection.status_code == 503
+    assert controller.classes["bulk"].stats["timed_out"] == 1
+
+    assert await controller.acquire("critical", "a") is None
+    assert await controller.acquire("critical", "a") is None
+    assert controller.get_stats()["in_flight"] == 4
+
+
+async def test_freed_slots_go_to_critical_first(controller):
+    for name in ("standard", "standard", "critical", "critical"):
+        await controller.acquire(name, "a")
+    controller.queue_timeout = 1
+
+    standard = asyncio.create_task(controller.acquire("standard", "a"))
+    critical = asyncio.create_task(controller.acquire("critical", "a"))
+    await asyncio.sleep(0)
+    assert controller.get_stats()["classes"]["critical"]["waiting"] == 1
+
+    controller.release("standard")
+    assert await critical is None
+    assert not standard.done()
+
+    controller.release("critical")
+    assert await standard is None
+
+
+@pytest.fixture
+def one_request_budget(api_client, monkeypatch):
+    """Admission on, with every client allowed a single request."""
+    monkeypatch.setattr(admission_control, "enabled", True)
+    monkeypatch.setattr(admission_control, "client_rate", 0.001)
+    monkeypatch.setattr(admission_control, "client_burst", 1)
+    monkeypatch.setattr(admission_control, "_buckets", OrderedDict())
+    return api_client
+
+
+async def test_rejections_carry_cors_headers(one_request_budget):
+    await one_request_budget.get("/api/v1/health", headers={"Origin": ORIGIN})
+    response = await one_request_budget.get("/api/v1/health", headers={"Origin": ORIGIN})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"]
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+
+
+async def test_options_requests_are_not_limited(one_request_budget):
+    await one_request_budget.get("/api/v1/health")
+    rate_limited = admission_control.classes["bulk"].stats["rate_limited"]
+
+    for _ in range(3):
+        preflight = await one_request_budget.options(
+            "/api/v1/hbar/history", headers={"Origin": ORIGIN, "Access-Control-Request-Method": "GET"}
+        )
+        assert preflight.status_code == 200
+        assert preflight.headers["access-control-allow-origin"] == ORIGIN
+        assert (await one_request_budget.options("/api/v1/hbar/history")).status_code != 429
+
+    assert admission_control.classes["bulk"].stats["rate_limited"] == rate_limited
@@ -0,0 +1,83 @@
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.api.analytics import _ema
+from src.database.connection import db_manager
+
+HOURS = 72
+WINDOW = 6
+
+
+def _reference_ema(values, window):
+    alpha = 2.0 / (window + 1)
+    ema = [values[0]]
+    for value in values[1:]:
+        ema.append(alpha * value + (1 - alpha) * ema[-1])
+    return ema
+
+
+@pytest.fixture
+def hourly_prices(fresh_db):
+    """Three days of hourly single-sample HBAR runs, one per bucket."""
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=HOURS - 1)
+    prices = [0.05 + 0.01 * math.sin(i / 5) + 0.0001 * i for i in range(HOURS)]
+    db_manager.execute_many(
+        "INSERT INTO hbar_metrics VALUES (?, ?, 2.0e9, 4.0e7, 0.0, 3.5e10, 30, ?, 1)",
+        [(start + timedelta(hours=i), price, start + timedelta(hours=i)) for i, price in enumerate(prices)],
+    )
+    return prices
+
+
+@pytest.mark.parametrize("window", [2, 24, 1000])
+@pytest.mark.parametrize("size", [0, 1, 5, 3000])
+def test_ema_matches_recurrence(window, size):
+    values = 0.06 + np.cumsum(np.random.default_rng(size).normal(0, 0.001, size))
+
+    assert _ema(values, window) == pytest.approx(_reference_ema(list(values), window) if size else [], abs=1e-12)
+
+
+async def test_analytics_series(api_client, hourly_prices):
+    async def series(metric):
+        response = await api_client.get(
+            "/api/v1/hbar/analytics", params={"metric": metric, "window": WINDOW, "days": 7}
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert [point["price_usd"] for point in body["points"]] == pytest.approx(hourly_prices)
+        return body, [point["value"] for point in body["points"]]
+
+    returns = [None] + [b / a - 1 for a, b in zip(hourly_prices, hourly_prices[1:], strict=False)]
+    body, values = await series("returns")
+    assert values[0] is None and values[1:] == pytest.approx(returns[1:])
+    assert body["summary"]["latest"] == pytest.approx(returns[-1])
+
+    # Leading buckets without a full window have no value
+    _, values = await series("sma")
+    assert values[: WINDOW - 1] == [None] * (WINDOW - 1)
+    assert values[WINDOW - 1:] == pytest.approx(
+        [np.mean(hourly_prices[i - WINDOW + 1:i + 1]) for i in range(WINDOW - 1, HOURS)]
+    )
+
+    _, values = await series("ema")
+    assert values[: WINDOW - 1] == [None] * (WINDOW - 1)
+    assert values[WINDOW - 1:] == pytest.approx(_reference_ema(hourly_prices, WINDOW)[WINDOW - 1:])
+
+    _, values = await series("volatility")
+    windows = [returns[max(1, i - WINDOW + 1):i + 1] for i in range(WINDOW - 1, HOURS)]
+    assert values[WINDOW - 1:] == pytest.approx(
+        [np.std(window, ddof=1) * math.sqrt(24 * 365) for window in windows]
+    )
+
+    body, values = await series("drawdown")
+    peaks = np.maximum.accumulate(hourly_prices)
+    assert values == pytest.approx(list(np.asarray(hourly_prices) / peaks - 1))
+    assert body["summary"]["min"] == pytest.approx(min(values))
+
+
+async def test_analytics_rejects_unknown_metric(api_client):
+    response = await api_client.get("/api/v1/hbar/analytics", params={"metric": "rsi"})
+
+    assert response.status_code == 422
@@ -0,0 +1,114 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import Optional
+
+import pytest
+
+from src.data_fetchers.coingecko import CoinGeckoFetcher
+from src.database.connection import db_manager
+from src.database.models import HBARMetrics
+
+NOW = datetime(2024, 3, 15, 12, 30)
+
+
+class StubFetcher(CoinGeckoFetcher):
+    """CoinGecko fetcher answering market_chart/range with hourly points and no network."""
+
+    def __init__(self, delay: float = 0.0, fail_before: Optional[datetime] = None):
+        super().__init__(api_key="", base_url="http://coingecko.invalid")
+        self.delay = delay
+        self.fail_before = fail_before
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _get_current_timestamp(self) -> datetime:
+        return NOW
+
+    async def fetch_hbar_market_chart_range(self, start, end):
+        self.requests.append((start, end))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail_before and start < self.fail_before:
+                raise RuntimeError("upstream unavailable")
+        finally:
+            self.in_flight -= 1
+
+        first = int(start.replace(tzinfo=UTC).timestamp()) // 3600 + 1
+        last = int(end.replace(tzinfo=UTC).timestamp()) // 3600
+        hours = range(first, last + 1)
+        return {
+            "prices": [[hour * 3_600_000, 0.05 + hour % 10 / 1000] for hour in hours],
+            "market_caps": [[hour * 3_600_000, 2.0e9] for hour in hours],
+            "total_volumes": [[hour * 3_600_000, 4.0e7] for hour in hours],
+        }
+
+
+def test_backfill_windows_are_epoch_aligned():
+    fetcher = StubFetcher()
+    start = datetime(2024, 1, 20, 7, 15)
+    end = datetime(2024, 3, 15, 12, 30)
+
+    windows = fetcher._backfill_windows(start, end, 30)
+
+    # Inner boundaries fall on multiples of 30 days since the epoch, whatever the start
+    epoch = datetime(1970, 1, 1)
+    assert windows[0][0] == start and windows[-1][1] == end
+    assert all(left[1] == right[0] for left, right in zip(windows, windows[1:], strict=False))
+    assert all((window[1] - epoch) % timedelta(days=30) == timedelta(0) for window in windows[:-1])
+    assert fetcher._backfill_windows(start + timedelta(days=3), end, 30)[1:] == windows[1:]
+
+
+async def test_backfill_resumes_after_completed_chunks(fresh_db):
+    failing = StubFetcher(fail_before=NOW - timedelta(days=30))
+    first = await failing.backfill_hbar_history(days=90, chunk_days=30, max_concurrency=2)
+
+    completed = db_manager.fetchall("SELECT chunk_start, chunk_end FROM hbar_backfill_chunks ORDER BY chunk_start")
+    windows = failing._backfill_windows(NOW - timedelta(days=90), NOW, 30)
+    assert first > 0
+    assert 0 < len(completed) < len(windows)
+
+    resumed = StubFetcher()
+    second = await resumed.backfill_hbar_history(days=90, chunk_days=30, max_concurrency=2)
+
+    # Only the windows that failed are fetched again
+    assert sorted(start + timedelta(days=1) for start, _ in resumed.requests) == [
+        window[0] for window in windows if window not in completed
+    ]
+    assert second > 0
+    assert db_manager.fetchone("SELECT COUNT(*) FROM hbar_backfill_chunks")[0] == len(windows)
+    assert db_manager.fetchone("SELECT COUNT(*) FROM hbar_metrics")[0] == first + second
+
+    assert await StubFetcher().backfill_hbar_history(days=90, chunk_days=30, max_concurrency=2) == 0
+
+
+async def test_backfill_stops_at_the_first_live_snapshot(fresh_db):
+    live = NOW - timedelta(days=2, minutes=15)
+    fetcher = StubFetcher()
+    for minutes in (0, 5, 10):
+        await fetcher.save_hbar_data(HBARMetrics(
+            timestamp=live + timedelta(minutes=minutes), price_usd=0.07, market_cap=2.0e9, volume_24h=4.0e7,
+            price_change_24h=0.0, circulating_supply=3.5e10, market_cap_rank=30,
+        ))
+
+    inserted = await fetcher.backfill_hbar_history(days=10, chunk_days=30)
+
+    assert [end for _, end in fetcher.requests] == [live]
+    assert db_manager.fetchone("SELECT COUNT(*), MAX(timestamp) FROM hbar_metrics WHERE timestamp < ?", (live,)) == (
+        inserted, live - timedelta(minutes=15),
+    )
+    # The live rows are untouched and a re-run has nothing left to fetch
+    assert db_manager.fetchone("SELECT COUNT(*) FROM hbar_metrics WHERE timestamp >= ?", (live,))[0] > 0
+    assert await StubFetcher().backfill_hbar_history(days=10, chunk_days=30) == 0
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+async def test_backfill_respects_concurrency_cap(fresh_db, max_concurrency):
+    fetcher = StubFetcher(delay=0.02)
+
+    await fetcher.backfill_hbar_history(days=300, chunk_days=30, max_concurrency=max_concurrency)
+
+    assert len(fetcher.requests) >= 10
+    assert fetcher.max_in_flight == max_concurrency
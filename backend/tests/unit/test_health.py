@@ -0,0 +1,179 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.api.health import health_monitor
+from src.config import settings
+from src.data_fetchers import base_fetcher
+from src.data_fetchers.base_fetcher import (
+    CircuitBreaker,
+    CircuitOpenError,
+    get_circuit_breaker,
+)
+from src.data_fetchers.coingecko import CoinGeckoFetcher
+from src.database.connection import db_manager
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manual monotonic clock for the circuit breakers."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(base_fetcher, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def breakers(monkeypatch):
+    """Empty circuit breaker registry for one test."""
+    monkeypatch.setattr(base_fetcher, "_circuit_breakers", {})
+
+
+@pytest.fixture
+def no_snapshot(monkeypatch):
+    monkeypatch.setattr(health_monitor, "snapshot", None)
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+    assert breaker.status()["consecutive_failures"] == 3
+
+
+def test_breaker_half_open_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+
+    # Failures of requests sent before the circuit opened don't extend it
+    clock.value += 30
+    breaker.record_failure()
+    clock.value += 30
+    assert breaker.state == "half_open"
+
+    # One trial at a time; a failed trial reopens the circuit for a full timeout
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.value += 59
+    assert breaker.state == "open"
+    clock.value += 1
+
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+    assert breaker.allow_request() and breaker.allow_request()
+
+
+async def test_open_breaker_fails_fast(breakers, clock, monkeypatch):
+    fetcher = CoinGeckoFetcher(api_key="", base_url="http://coingecko.invalid")
+    calls = []
+
+    async def request_once(endpoint, params=None):
+        calls.append(endpoint)
+        return {}
+
+    monkeypatch.setattr(fetcher, "_request_once", request_once)
+    for _ in range(settings.breaker.failure_threshold):
+        fetcher.circuit_breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        await fetcher._make_request("ping")
+    assert calls == []
+
+    clock.value += settings.breaker.reset_timeout
+    assert await fetcher._make_request("ping") == {}
+    assert fetcher.circuit_breaker.state == "closed"
+
+
+async def test_cancelled_trial_frees_the_slot(breakers, clock, monkeypatch):
+    fetcher = CoinGeckoFetcher(api_key="", base_url="http://coingecko.invalid")
+    started = asyncio.Event()
+
+    async def hang(endpoint, params=None):
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(fetcher, "_request_once", hang)
+    for _ in range(settings.breaker.failure_threshold):
+        fetcher.circuit_breaker.record_failure()
+    clock.value += settings.breaker.reset_timeout
+
+    trial = asyncio.create_task(fetcher._make_request("ping"))
+    await started.wait()
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    # Neither outcome was recorded, and the next call is the new trial
+    assert fetcher.circuit_breaker.state == "half_open"
+    assert fetcher.circuit_breaker.allow_request()
+
+
+async def test_readyz_before_first_check(api_client, no_snapshot):
+    response = await api_client.get("/api/v1/readyz")
+
+    assert response.status_code == 503
+    assert response.json() == {"status": "starting", "ready": False}
+
+
+async def test_readyz_degraded_by_open_breaker(api_client, no_snapshot, breakers, clock):
+    get_circuit_breaker("http://mirror.invalid").record_success()
+    breaker = get_circuit_breaker("http://coingecko.invalid")
+    for _ in range(settings.breaker.failure_threshold):
+        breaker.record_failure()
+    await health_monitor.refresh()
+
+    response = await api_client.get("/api/v1/readyz")
+    body = response.json()
+
+    # An open upstream circuit degrades readiness without failing it
+    assert response.status_code == 200
+    assert (body["status"], body["ready"]) == ("degraded", True)
+    assert body["database"]["reachable"]
+    assert body["upstreams"]["http://coingecko.invalid"]["state"] == "open"
+    assert body["upstreams"]["http://mirror.invalid"]["state"] == "closed"
+
+
+async def test_readyz_unavailable_when_database_fails(api_client, no_snapshot, breakers, monkeypatch):
+    def broken_cursor():
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(db_manager, "cursor", broken_cursor)
+    await health_monitor.refresh()
+
+    response = await api_client.get("/api/v1/readyz")
+    body = response.json()
+
+    assert response.status_code == 503
+    assert (body["status"], body["ready"]) == ("unavailable", False)
+    assert body["database"] == {"reachable": False, "latency_ms": None, "error": "database is locked"}
+    assert all(dataset["stale"] for dataset in body["datasets"].values())
+
+
+async def test_readyz_unavailable_when_database_hangs(api_client, no_snapshot, breakers, monkeypatch):
+    def slow_check(cursor):
+        cursor.close()
+        time.sleep(0.5)
+        return {}
+
+    monkeypatch.setattr(settings.health, "db_timeout", 0.05)
+    monkeypatch.setattr(health_monitor, "_check_database", slow_check)
+    await health_monitor.refresh()
+
+    response = await api_client.get("/api/v1/readyz")
+
+    assert response.status_code == 503
+    assert response.json()["database"]["error"] == "No response within 0.05s"
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import orjson
+import pytest
+
+from src.data_fetchers.coingecko import CoinGeckoFetcher
+from src.database.connection import db_manager
+from src.database.models import HBARMetrics
+from src.mock_upstream.app import FIXTURES_DIR
+from src.schedulers import tasks
+from src.schedulers.adaptive import JobFailed
+
+GLOBAL = orjson.loads((FIXTURES_DIR / "global.json").read_bytes())["data"]
+TRENDING = orjson.loads((FIXTURES_DIR / "search_trending.json").read_bytes())["coins"]
+
+
+class StubFetcher(CoinGeckoFetcher):
+    """CoinGecko fetcher with canned upstream parts; ``failing`` parts raise."""
+
+    def __init__(self, failing=()):
+        super().__init__(api_key="", base_url="http://coingecko.invalid")
+        self.failing = set(failing)
+        self.calls = []
+
+    async def _part(self, name, value):
+        self.calls.append(name)
+        if name in self.failing:
+            raise RuntimeError(f"{name} unavailable")
+        return value
+
+    async def fetch_hbar_data(self):
+        return await self._part("hbar", HBARMetrics(
+            timestamp=datetime.utcnow(), price_usd=0.06, market_cap=2.1e9, volume_24h=4.5e7,
+            price_change_24h=1.2, circulating_supply=3.5e10, market_cap_rank=30,
+        ))
+
+    async def fetch_global_crypto_data(self):
+        return await self._part("global", GLOBAL)
+
+    async def fetch_trending_coins(self):
+        return await self._part("trending", TRENDING)
+
+
+@pytest.mark.parametrize("failing", ["hbar", "global", "trending"])
+async def test_fetch_data_returns_the_parts_that_succeeded(failing):
+    data = await StubFetcher(failing={failing}).fetch_data()
+
+    assert data[failing] is None
+    assert all(data[part] is not None for part in {"hbar", "global", "trending"} - {failing})
+    assert isinstance(data["timestamp"], datetime)
+
+
+async def test_fetch_market_snapshots_skips_hbar():
+    fetcher = StubFetcher()
+
+    data = await fetcher.fetch_market_snapshots()
+
+    assert sorted(fetcher.calls) == ["global", "trending"]
+    assert data["global"] == GLOBAL and data["trending"] == TRENDING
+
+
+@pytest.mark.parametrize("failing, rows", [((), 1 + len(TRENDING)), (("trending",), 1), (("global",), len(TRENDING))])
+async def test_market_job_saves_available_parts_without_hbar(fresh_db, monkeypatch, failing, rows):
+    monkeypatch.setattr(tasks, "CoinGeckoFetcher", lambda: StubFetcher(failing))
+
+    outcome = await tasks.fetch_and_save_market_data()
+
+    assert outcome.rows_written == rows
+    assert db_manager.fetchone("SELECT COUNT(*) FROM hbar_metrics")[0] == 0
+    assert db_manager.fetchone("SELECT COUNT(*) FROM market_global")[0] == (0 if "global" in failing else 1)
+
+
+async def test_market_job_fails_without_any_part(fresh_db, monkeypatch):
+    monkeypatch.setattr(tasks, "CoinGeckoFetcher", lambda: StubFetcher({"global", "trending"}))
+
+    with pytest.raises(JobFailed, match="No market data"):
+        await tasks.fetch_and_save_market_data()
+
+
+async def test_market_endpoints_serve_latest_snapshots(api_client):
+    assert (await api_client.get("/api/v1/market/global")).json() is None
+    assert (await api_client.get("/api/v1/market/trending")).json() == []
+
+    fetcher = StubFetcher()
+    await fetcher.save_global_data(GLOBAL, datetime(2024, 1, 1))
+    await fetcher.save_trending_data(TRENDING[:2], datetime(2024, 1, 1))
+    await fetcher.save_global_data({**GLOBAL, "markets": 1300}, datetime(2024, 1, 2))
+    await fetcher.save_trending_data(TRENDING, datetime(2024, 1, 2))
+
+    global_data = (await api_client.get("/api/v1/market/global")).json()
+    trending = (await api_client.get("/api/v1/market/trending")).json()
+
+    assert global_data["markets"] == 1300
+    assert global_data["btc_dominance"] == pytest.approx(GLOBAL["market_cap_percentage"]["btc"])
+    assert [coin["coin_id"] for coin in trending] == [coin["item"]["id"] for coin in TRENDING]
+    assert [coin["rank"] for coin in trending] == list(range(1, len(TRENDING) + 1))
@@ -0,0 +1,134 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import settings
+from src.schedulers import refresh
+from src.schedulers.adaptive import AdaptiveJob, JobOutcome
+from src.schedulers.refresh import RefreshJobManager
+
+INTERVAL = 300
+
+
+class StubScheduler:
+    """Holds one job's next run time and records changes to it."""
+
+    timezone = UTC
+
+    def __init__(self, next_run_time):
+        self.job = SimpleNamespace(next_run_time=next_run_time)
+        self.modified = []
+
+    def get_job(self, job_id):
+        return self.job
+
+    def modify_job(self, job_id, next_run_time):
+        self.modified.append(job_id)
+        self.job.next_run_time = next_run_time
+
+
+@pytest.fixture
+def hbar_job(fresh_db, monkeypatch):
+    """Scheduled HBAR job whose runs wait for ``job.release`` and count ``job.calls``."""
+    monkeypatch.setattr(settings.updates, "adaptive", False)
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return JobOutcome("digest", 0.05, rows_written=1)
+
+    job = AdaptiveJob("hbar_data_fetch", fetch, INTERVAL)
+    job.release, job.calls = release, calls
+    job.scheduler = StubScheduler(datetime.now(UTC) + timedelta(seconds=10))
+    monkeypatch.setitem(refresh.adaptive_jobs, "hbar_data_fetch", job)
+    return job
+
+
+async def _finish(manager: RefreshJobManager, job: AdaptiveJob) -> None:
+    job.release.set()
+    await asyncio.gather(*manager._tasks)
+
+
+async def test_concurrent_refreshes_share_one_job(hbar_job):
+    manager = RefreshJobManager()
+
+    first, created = manager.submit("hbar")
+    second, created_again = manager.submit("hbar")
+    await asyncio.sleep(0)
+    assert (created, created_again) == (True, False)
+    assert second is first
+    assert first.status == "running"
+
+    await _finish(manager, hbar_job)
+
+    assert hbar_job.calls == [1]
+    assert (first.status, first.rows_written, first.value) == ("succeeded", 1, 0.05)
+    assert manager.recent() == [first]
+
+    # Once finished, the next request starts a new job
+    third, created = manager.submit("hbar")
+    assert created and third is not first
+    await asyncio.gather(*manager._tasks)
+
+
+async def test_refresh_joins_a_scheduled_run_in_progress(hbar_job):
+    manager = RefreshJobManager()
+    scheduled = asyncio.ensure_future(hbar_job.run())
+    await asyncio.sleep(0)
+
+    job, _ = manager.submit("hbar")
+    await asyncio.sleep(0)
+    await _finish(manager, hbar_job)
+    await scheduled
+
+    assert job.joined_run and job.status == "succeeded"
+    assert hbar_job.calls == [1]
+    # The scheduled run keeps its slot
+    assert hbar_job.scheduler.modified == []
+
+
+async def test_manual_refresh_defers_the_next_scheduled_run(hbar_job):
+    manager = RefreshJobManager()
+    before = datetime.now(UTC)
+
+    manager.submit("hbar")
+    await _finish(manager, hbar_job)
+
+    assert hbar_job.scheduler.modified == ["hbar_data_fetch"]
+    assert hbar_job.scheduler.job.next_run_time >= before + timedelta(seconds=INTERVAL)
+
+
+async def test_failed_refresh_does_not_defer(hbar_job, monkeypatch):
+    async def fail():
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(hbar_job, "func", fail)
+    manager = RefreshJobManager()
+
+    job, _ = manager.submit("hbar")
+    await asyncio.gather(*manager._tasks)
+
+    assert job.status == "failed"
+    assert job.error == "RuntimeError: upstream down"
+    assert hbar_job.scheduler.modified == []
+
+
+def test_defer_next_run_never_brings_a_run_forward(hbar_job):
+    later = datetime.now(UTC) + timedelta(seconds=2 * INTERVAL)
+    hbar_job.scheduler.job.next_run_time = later
+
+    hbar_job.defer_next_run()
+
+    assert hbar_job.scheduler.modified == []
+    assert hbar_job.scheduler.job.next_run_time == later
+
+    # Paused jobs and standalone jobs are left alone
+    hbar_job.scheduler.job.next_run_time = None
+    hbar_job.defer_next_run()
+    hbar_job.scheduler = None
+    hbar_job.defer_next_run()
+    assert hbar_job.scheduler is None
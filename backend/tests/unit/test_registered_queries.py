@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from src.database.connection import db_manager
+from src.database.queries import QUERIES
+
+
+def _adhoc(name: str, **arguments) -> list:
+    query = QUERIES[name]
+    return db_manager.fetchall(query.sql, tuple(arguments[param] for param, _ in query.params) or None)
+
+
+def test_prepared_queries_see_rows_written_after_planning(fresh_db):
+    trending = "INSERT INTO market_trending VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    db_manager.execute(trending, (datetime(2024, 1, 1), 1, "bitcoin", "Bitcoin", "BTC", 1, 1.0, None))
+    db_manager.execute(
+        "INSERT INTO hbar_metrics VALUES (?, 0.05, 2.0e9, 4.0e7, 0.0, 3.5e10, 30, ?, 1)",
+        (datetime(2024, 1, 1), datetime(2024, 1, 1)),
+    )
+    since = datetime(2024, 1, 2)
+    assert db_manager.query_all("market_trending_latest")
+    assert db_manager.query_all("hbar_price_history", since=since) == []
+
+    # Wider values and newer timestamps than the statistics the plans were made with
+    db_manager.execute_many(trending, [
+        (datetime(2024, 1, 2), 1, "saucerswap", "SaucerSwap", "SAUCE", 402, 1.1e-06, None),
+        (datetime(2024, 1, 2), 2, "hedera-hashgraph", "Hedera", "HBAR", 31, 9.3e-07, None),
+    ])
+    db_manager.execute(
+        "INSERT INTO hbar_metrics VALUES (?, 0.06, 2.1e9, 4.5e7, 1.0, 3.5e10, 30, ?, 1)",
+        (datetime(2024, 1, 3), datetime(2024, 1, 3)),
+    )
+
+    latest = db_manager.query_all("market_trending_latest")
+    assert [(row[3], row[5]) for row in latest] == [("SaucerSwap", 402), ("Hedera", 31)]
+    assert latest == _adhoc("market_trending_latest")
+    assert db_manager.query_all("hbar_price_history", since=since) == _adhoc("hbar_price_history", since=since) != []
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.api import cache
+from src.api.cache import ResultCache, estimate_size
+from src.database.connection import db_manager
+
+ROWS = [("0.0.1", 1.0), ("0.0.2", 2.0)]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manual monotonic clock for entry expiry."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def _compute(calls: list, value=ROWS):
+    def compute():
+        calls.append(1)
+        return value
+    return compute
+
+
+def test_write_to_a_read_table_invalidates(clock):
+    results = ResultCache(max_entries=10, max_bytes=1 << 20, ttl=60)
+    calls = []
+
+    assert results.get_or_compute("tokens", ["hedera_tokens", "tokens"], _compute(calls)) == ROWS
+    assert results.get_or_compute("tokens", ["hedera_tokens", "tokens"], _compute(calls)) == ROWS
+    assert len(calls) == 1
+
+    # A write to an unrelated table leaves the entry fresh
+    db_manager.bump_version("hbar_metrics")
+    results.get_or_compute("tokens", ["hedera_tokens", "tokens"], _compute(calls))
+    assert len(calls) == 1
+
+    db_manager.bump_version("tokens")
+    results.get_or_compute("tokens", ["hedera_tokens", "tokens"], _compute(calls))
+    assert len(calls) == 2
+    assert results.stats["invalidations"] == 1
+
+
+def test_entries_expire_after_the_ttl(clock):
+    results = ResultCache(max_entries=10, max_bytes=1 << 20, ttl=60)
+    results.put("key", (0,), ROWS)
+
+    clock.value += 59
+    assert results.get("key", (0,)) == ROWS
+
+    clock.value += 1
+    assert results.get("key", (0,)) is None
+    assert results.get_stats()["entries"] == 0
+
+
+def test_empty_results_are_not_cached(clock):
+    results = ResultCache(max_entries=10, max_bytes=1 << 20, ttl=60)
+    calls = []
+
+    results.get_or_compute("key", ["tokens"], _compute(calls, []))
+    results.get_or_compute("key", ["tokens"], _compute(calls, []))
+    assert len(calls) == 2
+
+
+def test_least_recently_used_entry_is_evicted_past_max_entries(clock):
+    results = ResultCache(max_entries=2, max_bytes=1 << 20, ttl=60)
+    results.put("a", (0,), ROWS)
+    results.put("b", (0,), ROWS)
+    results.get("a", (0,))
+
+    results.put("c", (0,), ROWS)
+
+    assert results.get("b", (0,)) is None
+    assert results.get("a", (0,)) == ROWS
+    assert results.get("c", (0,)) == ROWS
+    assert results.stats["evictions"] == 1
+
+
+def test_entries_are_evicted_past_max_bytes(clock):
+    size = estimate_size(ROWS)
+    results = ResultCache(max_entries=10, max_bytes=2 * size, ttl=60)
+    for key in "abc":
+        results.put(key, (0,), ROWS)
+
+    assert [key for key in "abc" if results.get(key, (0,)) is not None] == ["b", "c"]
+    assert results.get_stats()["bytes"] == 2 * size
+
+    # A result larger than the whole cache is never stored
+    results.put("big", (0,), ROWS * 10)
+    assert results.stats["oversized"] == 1
+    assert results.get("big", (0,)) is None
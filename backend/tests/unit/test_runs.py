@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.api.cache import result_cache
+from src.config import settings
+from src.data_fetchers.coingecko import CoinGeckoFetcher
+from src.data_fetchers.hedera import HederaTokenFetcher
+from src.data_fetchers.recent import hbar_recent
+from src.data_fetchers.token_metadata import token_metadata
+from src.database.connection import db_manager
+from src.database.models import HBARMetrics, HederaTokenBatch, HederaTokenMetrics
+
+MINUTE = timedelta(minutes=1)
+# HBAR (price, minutes after the start) snapshots: two repeats, a change, a
+# repeat, then a repeat after a gap longer than the 10 minute max_gap
+HBAR_SNAPSHOTS = [(0.05, 0), (0.05, 5), (0.05, 10), (0.06, 15), (0.06, 20), (0.06, 50)]
+
+
+@pytest.fixture(autouse=True)
+def intervals(monkeypatch):
+    """5 and 10 minute cadences with one backoff step, so runs break after 10 and 20 minutes."""
+    monkeypatch.setattr(settings.updates, "hbar_interval", 300)
+    monkeypatch.setattr(settings.updates, "tokens_interval", 600)
+    monkeypatch.setattr(settings.updates, "max_backoff", 1)
+    monkeypatch.setattr(settings.updates, "dedup", True)
+
+
+async def _save_hbar(start: datetime) -> None:
+    fetcher = CoinGeckoFetcher(api_key="", base_url="http://coingecko.invalid")
+    for price, minutes in HBAR_SNAPSHOTS:
+        assert await fetcher.save_hbar_data(HBARMetrics(
+            timestamp=start + minutes * MINUTE, price_usd=price, market_cap=2.0e9, volume_24h=4.0e7,
+            price_change_24h=0.0, circulating_supply=3.5e10, market_cap_rank=30,
+        ))
+
+
+async def test_hbar_runs_extend_break_on_change_and_on_gaps(fresh_db):
+    start = datetime(2024, 1, 1)
+    await _save_hbar(start)
+
+    assert db_manager.fetchall(
+        "SELECT timestamp, valid_to, samples, price_usd FROM hbar_metrics ORDER BY timestamp"
+    ) == [
+        (start, start + 10 * MINUTE, 3, 0.05),
+        (start + 15 * MINUTE, start + 20 * MINUTE, 2, 0.06),
+        (start + 50 * MINUTE, start + 50 * MINUTE, 1, 0.06),
+    ]
+
+
+async def test_hbar_runs_not_extended_without_dedup(fresh_db, monkeypatch):
+    monkeypatch.setattr(settings.updates, "dedup", False)
+    await _save_hbar(datetime(2024, 1, 1))
+
+    assert db_manager.fetchall("SELECT SUM(samples), COUNT(*) FROM hbar_metrics") == [(6, 6)]
+
+
+async def test_hbar_price_history_returns_run_endpoints(fresh_db):
+    start = datetime(2024, 1, 1)
+    await _save_hbar(start)
+
+    # Each run gives its first point inside the window and its last
+    # confirmation; single-sample runs give one point
+    assert db_manager.query_all("hbar_price_history", since=start + 5 * MINUTE) == [
+        (start + 5 * MINUTE, 0.05, 4.0e7),
+        (start + 10 * MINUTE, 0.05, 4.0e7),
+        (start + 15 * MINUTE, 0.06, 4.0e7),
+        (start + 20 * MINUTE, 0.06, 4.0e7),
+        (start + 50 * MINUTE, 0.06, 4.0e7),
+    ]
+
+
+async def test_hbar_history_endpoint_same_from_buffer_and_database(api_client, monkeypatch):
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+    await _save_hbar(start)
+    expected = [
+        (start + minutes * MINUTE, price)
+        for price, minutes in [(0.05, 0), (0.05, 10), (0.06, 15), (0.06, 20), (0.06, 50)]
+    ]
+
+    async def history():
+        response = await api_client.get("/api/v1/hbar/history", params={"days": 1})
+        assert response.status_code == 200
+        return [(datetime.fromisoformat(point["timestamp"]), point["price_usd"]) for point in response.json()]
+
+    hits = hbar_recent.stats["hits"]
+    assert await history() == expected
+    assert hbar_recent.stats["hits"] == hits + 1
+
+    result_cache.clear()
+    monkeypatch.setattr(hbar_recent, "history", lambda since: None)
+    assert await history() == expected
+
+
+@pytest.fixture
+def token_fetcher(fresh_db, monkeypatch):
+    """Mirror node fetcher whose saves are stamped with the times in ``fetcher.now``."""
+    fetcher = HederaTokenFetcher(base_url="http://mirror.invalid")
+    fetcher.now = None
+    monkeypatch.setattr(fetcher, "_get_current_timestamp", lambda: fetcher.now)
+    return fetcher
+
+
+async def _save_tokens(fetcher: HederaTokenFetcher, when: datetime, holders: dict) -> None:
+    for token_id in holders:
+        token_metadata.update({"token_id": token_id, "name": token_id, "symbol": token_id})
+    fetcher.now = when
+    assert await fetcher.save_token_data(HederaTokenBatch.from_records([
+        HederaTokenMetrics(token_id=token_id, name=token_id, symbol=token_id, decimals=0,
+                           total_supply=1000, holders_count=count)
+        for token_id, count in holders.items()
+    ]))
+
+
+@pytest.fixture
+async def token_runs(token_fetcher):
+    """Token A repeats, changes, then repeats after a gap longer than 20 minutes; B changes."""
+    start = datetime(2024, 1, 1)
+    await _save_tokens(token_fetcher, start, {"0.0.1": 5, "0.0.2": 1})
+    await _save_tokens(token_fetcher, start + 10 * MINUTE, {"0.0.1": 5, "0.0.2": 2})
+    await _save_tokens(token_fetcher, start + 20 * MINUTE, {"0.0.1": 6})
+    await _save_tokens(token_fetcher, start + 130 * MINUTE, {"0.0.1": 6})
+    return start
+
+
+async def test_token_runs_extend_break_on_change_and_on_gaps(token_runs):
+    start = token_runs
+
+    assert db_manager.fetchall(
+        "SELECT token_id, timestamp, valid_to, samples, holders_count FROM hedera_tokens ORDER BY token_id, timestamp"
+    ) == [
+        ("0.0.1", start, start + 10 * MINUTE, 2, 5),
+        ("0.0.1", start + 20 * MINUTE, start + 20 * MINUTE, 1, 6),
+        ("0.0.1", start + 130 * MINUTE, start + 130 * MINUTE, 1, 6),
+        ("0.0.2", start, start, 1, 1),
+        ("0.0.2", start + 10 * MINUTE, start + 10 * MINUTE, 1, 2),
+    ]
+
+
+async def test_raw_token_history_clips_runs_to_the_range(token_fetcher, token_runs):
+    start = token_runs
+
+    history = await token_fetcher.get_token_history(
+        ["0.0.1", "0.0.2", "0.0.3"], start + 5 * MINUTE, start + 30 * MINUTE
+    )
+
+    assert {
+        token_id: [(point["timestamp"], point["holders_count"]) for point in points]
+        for token_id, points in history.items()
+    } == {
+        "0.0.1": [(start + 5 * MINUTE, 5), (start + 10 * MINUTE, 5), (start + 20 * MINUTE, 6)],
+        "0.0.2": [(start + 10 * MINUTE, 2)],
+        "0.0.3": [],
+    }
+
+
+async def test_hourly_token_history_takes_last_snapshot_and_skips_gaps(token_fetcher, token_runs):
+    start = token_runs
+
+    history = await token_fetcher.get_token_history(["0.0.1", "0.0.2"], start, start + 3 * 60 * MINUTE, "hour")
+
+    # No run of 0.0.1 is valid during the second hour
+    assert {
+        token_id: [(point["timestamp"], point["holders_count"]) for point in points]
+        for token_id, points in history.items()
+    } == {
+        "0.0.1": [(start, 6), (start + 120 * MINUTE, 6)],
+        "0.0.2": [(start, 2)],
+    }
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import httpx
+
+from src.data_fetchers.coingecko import CoinGeckoFetcher
+from src.database.models import HBARMetrics
+from src.schedulers import tasks
+from src.schedulers.adaptive import AdaptiveJob
+
+
+class StubFetcher(CoinGeckoFetcher):
+    """CoinGecko fetcher whose HBAR fetches follow a script: an exception, None or a snapshot."""
+
+    script = []
+
+    def __init__(self):
+        super().__init__(api_key="", base_url="http://coingecko.invalid")
+
+    async def fetch_hbar_data(self):
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        return step
+
+
+SNAPSHOT = HBARMetrics(
+    timestamp=datetime.utcnow(), price_usd=0.06, market_cap=2.1e9, volume_24h=4.5e7,
+    price_change_24h=1.2, circulating_supply=3.5e10, market_cap_rank=30,
+)
+
+
+async def test_admin_scheduler_reports_failed_runs(api_client, monkeypatch):
+    monkeypatch.setattr(tasks, "CoinGeckoFetcher", StubFetcher)
+    monkeypatch.setattr(StubFetcher, "script", [SNAPSHOT, httpx.ConnectError("connection refused"), None])
+    job = AdaptiveJob("hbar_data_fetch", tasks.fetch_and_save_hbar_data, 300)
+
+    outcomes = [await job.run() for _ in range(3)]
+
+    assert [outcome is not None for outcome in outcomes] == [True, False, False]
+    assert job.last_error == "No HBAR data received from API"
+
+    body = (await api_client.get("/api/v1/admin/scheduler", params={"recent": 10})).json()
+
+    [stats] = body["jobs"]
+    assert (stats["job_id"], stats["runs"], stats["failures"], stats["rows_written"]) == ("hbar_data_fetch", 3, 2, 1)
+    assert stats["last_error"] == "No HBAR data received from API"
+    assert [(run["status"], run["error"]) for run in body["recent_runs"]] == [
+        ("failed", "No HBAR data received from API"),
+        ("failed", "ConnectError: connection refused"),
+        ("ok", None),
+    ]
+
+
+async def test_failed_save_is_reported(api_client, monkeypatch):
+    async def failing_save(self, hbar_data):
+        return False
+
+    monkeypatch.setattr(tasks, "CoinGeckoFetcher", StubFetcher)
+    monkeypatch.setattr(StubFetcher, "script", [SNAPSHOT])
+    monkeypatch.setattr(StubFetcher, "save_hbar_data", failing_save)
+    job = AdaptiveJob("hbar_data_fetch", tasks.fetch_and_save_hbar_data, 300)
+
+    assert await job.run() is None
+
+    body = (await api_client.get("/api/v1/admin/scheduler")).json()
+    assert body["jobs"][0]["last_error"] == "Failed to save HBAR data to database"
+    assert body["recent_runs"][0]["status"] == "failed"
@@ -0,0 +1,25 @@
+from src.data_fetchers.hedera import encode_token_cursor
+from src.database.connection import db_manager
+
+
+async def test_cursor_from_another_ordering_is_rejected(api_client):
+    cursor = encode_token_cursor("supply", "desc", 1000, 100)
+
+    response = await api_client.get("/api/v1/tokens", params={"sort": "holders", "cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid cursor")
+
+
+async def test_query_error_behind_a_valid_cursor_is_a_server_error(api_client, monkeypatch):
+    def failing_query(name, **arguments):
+        # ValueError, like pydantic's ValidationError, must not read as a bad cursor
+        raise ValueError("Conversion Error")
+
+    monkeypatch.setattr(db_manager, "query_all", failing_query)
+    cursor = encode_token_cursor("holders", "desc", 1000, 100)
+
+    response = await api_client.get("/api/v1/tokens", params={"cursor": cursor})
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Failed to list tokens"}
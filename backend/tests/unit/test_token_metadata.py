@@ -0,0 +1,25 @@
+import orjson
+
+from src.data_fetchers.token_metadata import TokenMetadata, TokenMetadataCache
+from src.database.connection import db_manager
+from src.mock_upstream.app import FIXTURES_DIR
+
+TOKEN_INFO = orjson.loads((FIXTURES_DIR / "token_info.json").read_bytes())
+
+
+def test_null_text_fields_get_defaults():
+    metadata = TokenMetadata.from_token_info({**TOKEN_INFO, "memo": None, "name": None, "deleted": None})
+
+    assert (metadata.memo, metadata.name, metadata.deleted) == ("", "Unknown", False)
+    assert metadata.symbol == "USDC"
+
+
+def test_null_memo_does_not_fail_the_flush(fresh_db):
+    cache = TokenMetadataCache()
+    cache.update({**TOKEN_INFO, "token_id": "0.0.100", "memo": None})
+    cache.update({**TOKEN_INFO, "token_id": "0.0.200", "memo": "wrapped"})
+
+    assert cache.flush() == 2
+    assert db_manager.fetchall("SELECT token_id, memo FROM tokens ORDER BY token_id") == [
+        ("0.0.100", ""), ("0.0.200", "wrapped"),
+    ]
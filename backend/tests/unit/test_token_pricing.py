@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import settings
+from src.data_fetchers import hedera
+from src.data_fetchers.coingecko import CoinGeckoFetcher
+from src.data_fetchers.hedera import CoinIdMap, HederaTokenFetcher
+from src.database.models import HederaTokenBatch, HederaTokenMetrics
+
+COINS = [
+    {"id": "bitcoin", "platforms": {}},
+    {"id": "tether", "platforms": {"ethereum": "0xdac17f958d2ee523a2206206994597c13d831ec7"}},
+    {"id": "saucerswap", "platforms": {"hedera-hashgraph": "0.0.731861"}},
+    {"id": "hashpack", "platforms": {"hedera-hashgraph": "0.0.9900001 ", "ethereum": "0xabc"}},
+    {"id": "unlisted", "platforms": None},
+]
+
+
+class StubCoinGecko(CoinGeckoFetcher):
+    """CoinGecko fetcher answering coins/list and coins/markets from memory."""
+
+    def __init__(self, base_url=None, fail_list=False):
+        super().__init__(api_key="", base_url="http://coingecko.invalid")
+        self.fail_list = fail_list
+        self.calls = []
+
+    async def _make_request(self, endpoint, params=None):
+        self.calls.append(endpoint)
+        if endpoint == "coins/list":
+            if self.fail_list:
+                raise RuntimeError("coins/list unavailable")
+            return COINS
+        return [
+            {"id": coin_id, "current_price": 1.5, "market_cap": 1.5e6, "total_volume": 1e4,
+             "price_change_percentage_24h": 2.0}
+            for coin_id in params["ids"].split(",")
+        ]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manual monotonic clock for the coin ID map."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(hedera, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+async def test_platform_coin_ids_keep_hedera_addresses_only():
+    ids = await StubCoinGecko().fetch_platform_coin_ids("hedera-hashgraph")
+
+    assert ids == {"0.0.731861": "saucerswap", "0.0.9900001": "hashpack"}
+
+
+async def test_coin_id_map_is_cached_until_the_ttl_passes(clock):
+    coin_ids = CoinIdMap(fallback={})
+    coingecko = StubCoinGecko()
+
+    assert await coin_ids.get(coingecko) == {"0.0.731861": "saucerswap", "0.0.9900001": "hashpack"}
+    clock.value += settings.coingecko.coin_list_ttl - 1
+    await coin_ids.get(coingecko)
+    assert coingecko.calls == ["coins/list"]
+
+    clock.value += 1
+    await coin_ids.get(coingecko)
+    assert coingecko.calls == ["coins/list", "coins/list"]
+
+
+async def test_coin_id_map_falls_back_when_the_list_fails(clock):
+    coin_ids = CoinIdMap(fallback=HederaTokenFetcher.COINGECKO_IDS)
+
+    # Static map before the first successful fetch, the last fetched map after it
+    assert await coin_ids.get(StubCoinGecko(fail_list=True)) == HederaTokenFetcher.COINGECKO_IDS
+    fetched = await coin_ids.get(StubCoinGecko())
+    clock.value += settings.coingecko.coin_list_ttl
+    assert await coin_ids.get(StubCoinGecko(fail_list=True)) == fetched
+
+
+async def test_discovered_tokens_are_priced(clock, monkeypatch):
+    monkeypatch.setattr(hedera, "CoinGeckoFetcher", StubCoinGecko)
+    monkeypatch.setattr(hedera, "coingecko_ids", CoinIdMap(fallback={}))
+    tokens = HederaTokenBatch.from_records([
+        HederaTokenMetrics(token_id=token_id, name=token_id, symbol=token_id, decimals=0)
+        for token_id in ("0.0.9900001", "0.0.9900002")
+    ])
+
+    await HederaTokenFetcher(base_url="http://mirror.invalid")._enrich_market_data(tokens)
+
+    assert tokens.columns["price_usd"] == [1.5, None]
+    assert tokens.columns["market_cap"] == [1.5e6, None]
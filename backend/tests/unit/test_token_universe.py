@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.config import settings
+from src.data_fetchers.token_universe import DISCOVERY_SOURCE, TokenUniverse
+from src.database.connection import db_manager
+from src.database.models import HederaTokenBatch, HederaTokenMetrics
+
+PINNED = "0.0.1"
+DISCOVERED = ["0.0.10", "0.0.11", "0.0.12"]
+
+
+@pytest.fixture
+def universe(fresh_db, monkeypatch):
+    """One pinned token and three discovered ones, with room for two unpinned hot tokens."""
+    monkeypatch.setattr(settings.hedera, "hot_set_size", 2)
+    monkeypatch.setattr(settings.hedera, "cold_batch_size", 2)
+    monkeypatch.setattr(settings.hedera, "cold_refresh_interval", 3600)
+    universe = TokenUniverse()
+    universe.seed([PINNED])
+    universe.add_discovered(DISCOVERED, DISCOVERED[-1])
+    return universe
+
+
+def _batch(holders: dict, deleted=(), created=None) -> HederaTokenBatch:
+    return HederaTokenBatch.from_records([
+        HederaTokenMetrics(
+            token_id=token_id, name=token_id, symbol=token_id, decimals=0, holders_count=count,
+            deleted=token_id in deleted, created_timestamp=(created or {}).get(token_id),
+        )
+        for token_id, count in holders.items()
+    ])
+
+
+def _tracked() -> dict:
+    rows = db_manager.fetchall("SELECT token_id, tier, activity_score FROM tracked_tokens ORDER BY token_num")
+    return {token_id: (tier, score) for token_id, tier, score in rows}
+
+
+def test_discovered_tokens_start_cold(universe):
+    assert _tracked() == {
+        PINNED: ("hot", None), "0.0.10": ("cold", None), "0.0.11": ("cold", None), "0.0.12": ("cold", None),
+    }
+    # Hot tokens every run, then the cold ones up to the batch size
+    assert universe.due_tokens() == [PINNED, "0.0.12", "0.0.11"]
+
+
+def test_refresh_promotes_the_most_active_tokens(universe):
+    requested = [PINNED, *DISCOVERED]
+    universe.record_refresh(requested, _batch({PINNED: 1, "0.0.10": 100, "0.0.11": 50, "0.0.12": 60}))
+
+    # The pinned token stays hot whatever its score
+    assert _tracked() == {
+        PINNED: ("hot", 1.0), "0.0.10": ("hot", 100.0), "0.0.11": ("cold", 50.0), "0.0.12": ("hot", 60.0),
+    }
+
+    # A change in holders outweighs a larger but static holder count
+    universe.record_refresh(requested, _batch({PINNED: 1, "0.0.10": 100, "0.0.11": 58, "0.0.12": 60}))
+
+    assert _tracked() == {
+        PINNED: ("hot", 1.0), "0.0.10": ("hot", 100.0), "0.0.11": ("hot", 138.0), "0.0.12": ("cold", 60.0),
+    }
+
+
+def test_failed_tokens_keep_their_score_and_wait(universe, monkeypatch):
+    monkeypatch.setattr(settings.hedera, "hot_set_size", 1)
+    universe.record_refresh(["0.0.10", "0.0.11"], _batch({"0.0.10": 100, "0.0.11": 50}))
+    before = datetime.utcnow()
+
+    universe.record_refresh(["0.0.10", "0.0.11"], _batch({"0.0.10": 100}))
+
+    score, last_refreshed, next_refresh = db_manager.fetchone(
+        "SELECT activity_score, last_refreshed_at, next_refresh_at FROM tracked_tokens WHERE token_id = '0.0.11'"
+    )
+    assert score == 50.0
+    assert last_refreshed < before
+    assert next_refresh >= before + timedelta(seconds=3600)
+    # Neither is due again: 0.0.10 is hot, 0.0.11 waits out the cold interval
+    assert universe.due_tokens() == [PINNED, "0.0.10", "0.0.12"]
+
+
+def test_deleted_tokens_are_dropped_unless_pinned(universe):
+    universe.record_refresh(
+        [PINNED, "0.0.10", "0.0.11"], _batch({PINNED: 1, "0.0.10": 5, "0.0.11": 7}, deleted={PINNED, "0.0.10"})
+    )
+
+    assert _tracked() == {PINNED: ("hot", None), "0.0.11": ("hot", 7.0), "0.0.12": ("cold", None)}
+
+
+def test_refresh_advances_the_newest_created_timestamp(universe):
+    universe.record_refresh(DISCOVERED, _batch(
+        {"0.0.10": 1, "0.0.11": 1, "0.0.12": 1},
+        created={"0.0.10": "1700000002.000000000", "0.0.11": "1700000001.000000000"},
+    ))
+    universe.record_refresh(["0.0.12"], _batch({"0.0.12": 1}, created={"0.0.12": "1700000000.000000000"}))
+
+    assert db_manager.fetchone(
+        "SELECT last_created_timestamp FROM token_discovery_state WHERE source = ?", (DISCOVERY_SOURCE,)
+    ) == ("1700000002.000000000",)
+
+
+def test_rerank_follows_hot_set_size(universe, monkeypatch):
+    universe.record_refresh(DISCOVERED, _batch({"0.0.10": 100, "0.0.11": 50, "0.0.12": 60}))
+
+    monkeypatch.setattr(settings.hedera, "hot_set_size", 0)
+    universe.rerank()
+    assert [token_id for token_id, (tier, _) in _tracked().items() if tier == "hot"] == [PINNED]
+
+    monkeypatch.setattr(settings.hedera, "hot_set_size", 3)
+    universe.rerank()
+    assert all(tier == "hot" for tier, _ in _tracked().values())
@@ -0,0 +1,43 @@
+from src.data_fetchers.hedera import hedera_token_fetcher
+from src.data_fetchers.token_metadata import token_metadata
+from src.database.models import HederaTokenBatch, HederaTokenMetrics
+
+
+def _batch(holders: dict) -> HederaTokenBatch:
+    """Snapshots with the given holder counts, their metadata queued for the save."""
+    for token_id in holders:
+        token_metadata.update({"token_id": token_id, "name": f"Token {token_id}", "symbol": token_id, "decimals": 8})
+    return HederaTokenBatch.from_records([
+        HederaTokenMetrics(
+            token_id=token_id,
+            name=f"Token {token_id}",
+            symbol=token_id,
+            decimals=8,
+            total_supply=1_000_000,
+            holders_count=count,
+        )
+        for token_id, count in holders.items()
+    ])
+
+
+async def test_top_tokens_rank_latest_snapshots(api_client):
+    await hedera_token_fetcher.save_token_data(_batch({f"0.0.{100 + i}": 10 * i for i in range(6)}))
+    # The token with the most holders loses them and the lowest-numbered one overtakes it
+    await hedera_token_fetcher.save_token_data(_batch({"0.0.100": 1000, "0.0.105": 1}))
+
+    response = await api_client.get("/api/v1/tokens/top", params={"limit": 3})
+
+    assert response.status_code == 200
+    assert [(token["token_id"], token["holders_count"]) for token in response.json()] == [
+        ("0.0.100", 1000), ("0.0.104", 40), ("0.0.103", 30),
+    ]
+
+
+async def test_top_tokens_break_ties_by_supply_then_number(api_client):
+    batch = _batch({"0.0.300": 5, "0.0.200": 5, "0.0.250": 5})
+    batch.columns["total_supply"] = [10, 10, 20]
+    await hedera_token_fetcher.save_token_data(batch)
+
+    tokens = await hedera_token_fetcher.get_top_tokens(3)
+
+    assert [token["token_id"] for token in tokens] == ["0.0.250", "0.0.200", "0.0.300"]